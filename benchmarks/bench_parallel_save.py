@@ -0,0 +1,89 @@
+"""DataLoader.save_data with the group arrays written by a pool of threads.
+
+Saves a DataFrame of [ --num-rows ] rows spread over [ --num-groups ] groups, with
+[ --num-cols ] float32 columns, once per thread count (1, 2, 4, ... up to the core count)
+and prints the time and the speedup over a single thread. With [ --hmf-close ] the
+default path, HMF close with its writer subprocesses, is timed as well.
+
+    python -m benchmarks.bench_parallel_save --num-rows 2000000 --num-groups 2000 --num-cols 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from evaluation_framework.evaluation_engine_core.data_loader import DataLoader
+from evaluation_framework import constants
+
+
+def make_data(num_rows, num_groups, num_cols):
+
+    rng = np.random.RandomState(0)
+
+    pdf = pd.DataFrame(rng.rand(num_rows, num_cols).astype(np.float32),
+                       columns=['col_{}'.format(i) for i in range(num_cols)])
+    pdf['group'] = rng.randint(num_groups, size=num_rows)
+    pdf['date'] = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.randint(365, size=num_rows), unit='D')
+    pdf[constants.EF_UUID_NAME] = np.arange(num_rows, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = (pdf['date'] - pdf['date'].min()).dt.days.astype(np.int32)
+
+    return pdf
+
+
+def time_save_data(pdf, numeric_columns, num_write_threads):
+
+    missing_keys = {'datetime_types': ['date'], 'str_types': []}
+
+    with tempfile.TemporaryDirectory() as dirpath:
+
+        data_loader = DataLoader(os.path.join(dirpath, 'store'), overwrite=True)
+
+        start_time = time.time()
+        # from_pandas adds columns to the DataFrame it is given
+        data_loader.save_data(pdf.copy(), 'date', 'group', numeric_columns, missing_keys,
+                              num_write_threads=num_write_threads)
+
+        return time.time() - start_time
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-rows', type=int, default=1000000)
+    parser.add_argument('--num-groups', type=int, default=1000)
+    parser.add_argument('--num-cols', type=int, default=50)
+    parser.add_argument('--hmf-close', action='store_true')
+    args = parser.parse_args()
+
+    pdf = make_data(args.num_rows, args.num_groups, args.num_cols)
+    numeric_columns = ['col_{}'.format(i) for i in range(args.num_cols)]
+
+    num_cores = os.cpu_count()
+    thread_counts = sorted(set([2**i for i in range(int(np.log2(num_cores)) + 1)] + [num_cores]))
+
+    print('{} rows x {} cols in {} groups, {} cores\n'.format(args.num_rows, args.num_cols,
+                                                              args.num_groups, num_cores))
+    print('{:<24}{:>12}{:>12}'.format('writer', 'time (s)', 'speedup'))
+
+    single_thread_time = None
+
+    for num_write_threads in thread_counts:
+
+        duration = time_save_data(pdf, numeric_columns, num_write_threads)
+        single_thread_time = single_thread_time or duration
+
+        print('{:<24}{:>12.3f}{:>12.2f}'.format('{} threads'.format(num_write_threads), duration,
+                                                 single_thread_time / duration))
+
+    if args.hmf_close:
+
+        duration = time_save_data(pdf, numeric_columns, None)
+
+        print('{:<24}{:>12.3f}{:>12.2f}'.format('HMF close', duration, single_thread_time / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Row-major vs column-major numeric storage, as read by the task graph.
+
+Saves one group of [ --num-rows ] x [ --num-cols ] float32 columns in both layouts with
+DataLoader.save_data, then times DataLoader.load_data (the fold DataFrame) and
+DataLoader.load_arrays (the fold ArrayData of the "array" pipeline mode) over
+[ --num-folds ] slice folds, with all the columns and with [ --num-used-cols ] projected
+columns.
+
+    python -m benchmarks.bench_storage_layout --num-rows 200000 --num-cols 400 --num-used-cols 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from evaluation_framework.evaluation_engine_core.data_loader import DataLoader
+from evaluation_framework import constants
+
+
+GROUP_KEY = 'group'
+TARGET_NAME = 'target'
+
+
+def make_data(num_rows, num_cols):
+
+    rng = np.random.RandomState(0)
+
+    pdf = pd.DataFrame(rng.rand(num_rows, num_cols).astype(np.float32),
+                       columns=['col_{}'.format(i) for i in range(num_cols)])
+    pdf[TARGET_NAME] = rng.rand(num_rows).astype(np.float32)
+    pdf['group'] = GROUP_KEY
+    pdf['date'] = pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(num_rows) // 100, unit='D')
+    pdf[constants.EF_UUID_NAME] = np.arange(num_rows, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = (pdf['date'] - pdf['date'].min()).dt.days.astype(np.int32)
+
+    return pdf
+
+
+def save_data(dirpath, pdf, numeric_columns, storage_layout):
+
+    data_loader = DataLoader(os.path.join(dirpath, storage_layout), overwrite=True)
+    # from_pandas adds columns to the DataFrame it is given
+    data_loader.save_data(pdf.copy(), 'date', 'group', numeric_columns, {'datetime_types': [], 'str_types': []},
+                          storage_layout=storage_layout, num_write_threads=os.cpu_count())
+
+    return DataLoader(os.path.join(dirpath, storage_layout))
+
+
+def time_load_data(data_loader, folds, col_idx):
+
+    start_time = time.time()
+
+    for idx in folds:
+        # touch the data so that lazy views are paid for as well
+        data_loader.load_data(GROUP_KEY, idx, col_idx=col_idx).sum().sum()
+
+    return (time.time() - start_time) / len(folds)
+
+
+def time_load_arrays(data_loader, folds, feature_names):
+
+    start_time = time.time()
+
+    for idx in folds:
+        array_data = data_loader.load_arrays(GROUP_KEY, idx, feature_names, TARGET_NAME, [])
+        array_data.X.sum() + array_data.y.sum()
+
+    return (time.time() - start_time) / len(folds)
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-rows', type=int, default=200000)
+    parser.add_argument('--num-cols', type=int, default=400)
+    parser.add_argument('--num-used-cols', type=int, default=20)
+    parser.add_argument('--num-folds', type=int, default=20)
+    args = parser.parse_args()
+
+    pdf = make_data(args.num_rows, args.num_cols)
+    feature_names = ['col_{}'.format(i) for i in range(args.num_cols)]
+    numeric_columns = feature_names + [TARGET_NAME]
+
+    fold_size = args.num_rows // 2
+    fold_starts = np.linspace(0, args.num_rows - fold_size, args.num_folds).astype(int)
+    folds = [slice(int(elem), int(elem) + fold_size) for elem in fold_starts]
+
+    rng = np.random.RandomState(0)
+    used_col_idx = sorted(rng.choice(args.num_cols, args.num_used_cols, replace=False).tolist())
+
+    with tempfile.TemporaryDirectory() as dirpath:
+
+        data_loaders = [save_data(dirpath, pdf, numeric_columns, elem) for elem in ['row_major', 'column_major']]
+
+        print('{} rows x {} cols, folds of {} rows\n'.format(args.num_rows, args.num_cols, fold_size))
+        print('{:<36}{:>18}{:>18}'.format('read', 'row_major (s)', 'column_major (s)'))
+
+        for label, col_idx in [('all {}'.format(args.num_cols + 1), None),
+                               ('projected {}'.format(args.num_used_cols), used_col_idx)]:
+
+            print('{:<36}{:>18.4f}{:>18.4f}'.format('load_data, {}'.format(label),
+                                                   *[time_load_data(elem, folds, col_idx) for elem in data_loaders]))
+
+        for label, used_feature_names in [('all {}'.format(args.num_cols), feature_names),
+                                          ('projected {}'.format(args.num_used_cols),
+                                           [feature_names[i] for i in used_col_idx])]:
+
+            print('{:<36}{:>18.4f}{:>18.4f}'.format('load_arrays, {}'.format(label),
+                                                   *[time_load_arrays(elem, folds, used_feature_names)
+                                                     for elem in data_loaders]))
+
+
+if __name__ == '__main__':
+    main()
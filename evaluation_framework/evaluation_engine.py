@@ -6,6 +6,19 @@ from .evaluation_engine_core.parallel.dask_resource_configurer import DaskResour
 from .evaluation_engine_core.parallel.dask_client import DaskClient
 
 from .evaluation_engine_core.data_loader import DataLoader
+from .evaluation_engine_core.data_loader import GLOBAL_ORDERBY_ARRAY_NAME
+from .evaluation_engine_core.data_loader import get_scattered_read_stats
+from .evaluation_engine_core.store_cache import get_store_key
+from .evaluation_engine_core.store_cache import is_verified_store
+from .evaluation_engine_core.store_cache import commit_store
+from .evaluation_engine_core.store_cache import download_store
+from .evaluation_engine_core.fold_batching import get_fold_batch_size
+from .evaluation_engine_core.fold_batching import get_fold_batches
+from .evaluation_engine_core.fold_batching import get_mean_fold_duration
+from .evaluation_engine_core.fold_scheduling import get_fold_work
+from .evaluation_engine_core.fold_scheduling import get_fold_costs
+from .evaluation_engine_core.fold_scheduling import get_largest_first_schedule
+from .evaluation_engine_core.fold_scheduling import get_group_affinity
 
 # from .evaluation_engine_core.data_loader import load_local_data
 
@@ -18,10 +31,9 @@ from evaluation_framework.utils.objectIO_utils import save_obj
 from evaluation_framework.utils.objectIO_utils import load_obj
 from evaluation_framework.utils.memmap_utils import write_memmap
 from evaluation_framework.utils.memmap_utils import read_memmap
-from evaluation_framework.utils.fileIO_utils import clean_dir
 
-from .task_graph.cross_validation_split import get_cv_splitter
 from .task_graph.task_graph import TaskGraph
+from .evaluation_manager_core.config_setter import ORDERED_CV_SCHEMES
 from evaluation_framework import constants
 
 import HMF
@@ -34,6 +46,7 @@ import psutil
 import shutil
 import time
 import copy
+import threading
 
 
 
@@ -60,12 +73,21 @@ TASK_REQUIRED_KEYWORDS = [
     'train_window',
     'min_train_window',
     'test_window',
+    'gap_window',
+    'num_folds',
+    'preprocess_numeric_keys',
+    'pipeline_mode',
+    'array_extra_keys',
     'evaluation_task_dirname', 
     'evaluation_task_dirpath',
-    'job_uuid']
+    'job_uuid',
+    'store_key']
 
 DEBUG_MODE_MAXITER = 10
 
+RESULT_COLUMNS = ['group_key', 'test_idx', 'eval_result', 'train_size', 'test_size', 'test_dates', 'duration', 
+                  'cache_hits', 'cache_misses']
+
 
 TaskManager = namedtuple('TaskManager', TASK_REQUIRED_KEYWORDS)
 
@@ -75,10 +97,47 @@ class EvaluationEngine():
     def __init__(self, local_client_n_workers=None, local_client_threads_per_worker=None, 
                  yarn_container_n_workers=None, yarn_container_worker_vcores=None, yarn_container_worker_memory=None,
                  n_worker_nodes=None, use_yarn_cluster=None, use_ec2_instance=None, use_auto_config=None, instance_type=None,
-                 verbose=False, use_dashboard=True):
+                 verbose=False, use_dashboard=True, group_cache_bytes=None, num_write_threads=None, 
+                 fold_batch_size=None, use_cost_scheduling=False, use_group_affinity=False):
         
         self.verbose = verbose
 
+        if group_cache_bytes is not None and (not isinstance(group_cache_bytes, int) or group_cache_bytes < 0):
+            raise ValueError('[ group_cache_bytes ] must be a non-negative integer or None.')
+        # byte budget of the decoded group arrays each worker keeps between folds
+        self.group_cache_bytes = group_cache_bytes
+
+        if num_write_threads is not None and (not isinstance(num_write_threads, int) or num_write_threads < 1):
+            raise ValueError('[ num_write_threads ] must be a positive integer or None.')
+        # threads writing the group arrays of an in-memory DataFrame, None for HMF's writer subprocesses
+        self.num_write_threads = num_write_threads
+
+        if fold_batch_size is not None and fold_batch_size!='auto' and (
+                not isinstance(fold_batch_size, int) or fold_batch_size < 1):
+            raise ValueError('[ fold_batch_size ] must be a positive integer, "auto" or None.')
+        # folds run back to back by one task, None for one task per fold. "auto" tunes it 
+        # from the measured fold duration, see _submit_folds
+        self.fold_batch_size = fold_batch_size
+        self.tuned_fold_batch_size = None
+        # thread submitting the batches sized from the pilot folds, see _submit_folds
+        self.fold_submission = None
+        self.fold_submission_error = None
+
+        if not isinstance(use_cost_scheduling, bool):
+            raise TypeError('[ use_cost_scheduling ] must be boolean but instead got {}.'.format(
+                type(use_cost_scheduling)))
+        # submit the costliest folds first, see _schedule_fold_batches
+        self.use_cost_scheduling = use_cost_scheduling
+        self.predicted_makespan = None
+        self.run_futures = dict()
+
+        if not isinstance(use_group_affinity, bool):
+            raise TypeError('[ use_group_affinity ] must be boolean but instead got {}.'.format(
+                type(use_group_affinity)))
+        # run the folds of a group on the same worker, see _get_group_affinity
+        self.use_group_affinity = use_group_affinity
+        self.group_affinity = None
+
         self.resource_config = DaskResourceConfigurer()
         self.resource_config.validate_dask_resource_configs(
         	local_client_n_workers, local_client_threads_per_worker, 
@@ -88,14 +147,25 @@ class EvaluationEngine():
         self.has_dask_client = False
         self.has_prediction = False
         self.has_data_loader_scatter = False
+        self.has_appended_data = False
+
+        # (fold_manifest_name, group_key, cv_split_index): future of the fold's last run
+        self.fold_futures = dict()
+        # (fold_manifest_name, result row) of the folds whose futures iter_results released
+        self.consumed_fold_results = []
 
         self.use_dashboard = use_dashboard
         
     def run_evaluation(self, evaluation_manager, debug_mode=False):
 
+        self._wait_fold_submission()
+
         self.has_prediction = False
 
         self.data = evaluation_manager.data
+        # a Parquet [ data ] is streamed into the store, self.data is then only its sample
+        self.data_path = evaluation_manager.data_path
+        self.orderby_first_date = evaluation_manager.orderby_first_date
 
         # if self.use_yarn_cluster and evaluation_manager.S3_path is None:
         #     raise ValueError('if [ use_yarn_cluster ] is set to True, you must provide [ S3_path ] to EvaluationManager object.')
@@ -120,7 +190,8 @@ class EvaluationEngine():
             # the change of directory is required for sharing methods across yarn and local clients
             # also, need to start dask AFTER the change in directory 
 
-        if evaluation_manager.return_predictions:
+        # after append_data, the folds that are not run again keep their prediction records
+        if evaluation_manager.return_predictions and not self._has_appended_folds(evaluation_manager):
 
             prediction_records_dirpath = os.path.join(os.getcwd(), evaluation_manager.prediction_records_dirname)
             try:
@@ -135,7 +206,7 @@ class EvaluationEngine():
             if not self.has_dask_client:
                 # self.start_dask_client()
 
-                self.dask_client = DaskClient()
+                self.dask_client = DaskClient(yarn_cluster=self.resource_config.use_yarn_cluster)
                 self.dask_client.start_dask_client(local_client_n_workers=self.resource_config.local_client_n_workers,
                               local_client_threads_per_worker=self.resource_config.local_client_threads_per_worker,
                               yarn_client_n_workers=self.resource_config.yarn_client_n_workers,
@@ -151,21 +222,69 @@ class EvaluationEngine():
                 # self.start_dask_client()
                 # self.has_dask_client = True
 
-        if not evaluation_manager.local_data_saved:
+        if not evaluation_manager.local_data_saved and evaluation_manager.use_store_cache:
+
+            # the stored columns are only known after the method checks, hence the key is too
+            self._set_store_key(evaluation_manager, get_store_key(evaluation_manager))
+            has_cached_store = self._open_cached_store(evaluation_manager)
+
+        else:
+            has_cached_store = False
+
+        if not evaluation_manager.local_data_saved and not has_cached_store:
                     
             print("\u2714 Preparing local data...            ", end="", flush=True)
             print()
             # self.memmap_map = load_local_data(evaluation_manager)
 
+            if evaluation_manager.use_store_cache:
+                # built aside and moved to the cache once complete, see commit_store
+                store_dirpath = '{}__{}'.format(evaluation_manager.memmap_root_dirpath, evaluation_manager.job_uuid)
+                os.makedirs(os.path.dirname(store_dirpath), exist_ok=True)
+            else:
+                store_dirpath = os.path.join(os.getcwd(), evaluation_manager.memmap_root_dirname)
+
+            self.data_loader = DataLoader(store_dirpath, True, self.group_cache_bytes)
+            if self.data_path is not None:
+
+                self.data_loader.save_parquet_data(
+                    self.data_path,
+                    evaluation_manager.orderby,
+                    evaluation_manager.groupby,
+                    evaluation_manager.numeric_types,
+                    evaluation_manager.missing_keys,
+                    self.orderby_first_date,
+                    evaluation_manager.cross_validation_scheme,
+                    evaluation_manager.train_window,
+                    evaluation_manager.test_window,
+                    evaluation_manager.min_train_window,
+                    evaluation_manager.gap_window,
+                    evaluation_manager.num_folds,
+                    evaluation_manager.target_name,
+                    evaluation_manager.storage_layout)
+
+            else:
 
-            self.data_loader = DataLoader(os.path.join(os.getcwd(), evaluation_manager.memmap_root_dirname), True)
-            self.data_loader.save_data(
+                self.data_loader.save_data(
 			    evaluation_manager.data,
 			    evaluation_manager.orderby,
 			    evaluation_manager.groupby,
 			    evaluation_manager.numeric_types,
-			    evaluation_manager.missing_keys)
+			    evaluation_manager.missing_keys,
+			    evaluation_manager.cross_validation_scheme,
+			    evaluation_manager.train_window,
+			    evaluation_manager.test_window,
+			    evaluation_manager.min_train_window,
+			    evaluation_manager.gap_window,
+			    evaluation_manager.num_folds,
+			    evaluation_manager.target_name,
+			    evaluation_manager.storage_layout,
+			    self.num_write_threads)
 
+            if evaluation_manager.use_store_cache:
+
+                commit_store(store_dirpath, evaluation_manager.memmap_root_dirpath, evaluation_manager.store_key)
+                self.data_loader = DataLoader(evaluation_manager.memmap_root_dirpath, False, self.group_cache_bytes)
 
 
         else:
@@ -185,6 +304,30 @@ class EvaluationEngine():
         # root_dirpath = os.path.join(os.getcwd(), evaluation_manager.memmap_root_dirname)
         # self.f = HMF.open_file(root_dirpath, mode='r+')
         
+        # the cv parameters may have changed through update_setup since the data was saved
+        fold_manifest_name = self.data_loader.get_fold_manifest_name(
+            evaluation_manager.cross_validation_scheme, 
+            evaluation_manager.train_window, 
+            evaluation_manager.test_window,
+            evaluation_manager.min_train_window,
+            evaluation_manager.gap_window,
+            evaluation_manager.num_folds,
+            evaluation_manager.target_name)
+
+        if not self.data_loader.has_fold_manifest(fold_manifest_name):
+
+            self.data_loader.save_fold_manifest(
+                evaluation_manager.cross_validation_scheme, 
+                evaluation_manager.train_window, 
+                evaluation_manager.test_window,
+                evaluation_manager.min_train_window,
+                evaluation_manager.gap_window,
+                evaluation_manager.num_folds,
+                evaluation_manager.target_name)
+
+            # the scattered data loader holds the old memmap_map
+            self.has_data_loader_scatter = False
+
         # evaluation_manager is too bulky to travel across network
         self.task_manager = TaskManager(
             **{k: v for k, v in evaluation_manager.__dict__.items() 
@@ -213,61 +356,23 @@ class EvaluationEngine():
 
             iter_count = 0
 
-            start_time = time.time()
-
-            # total_splits = 0
-            # for group_key in self.f.get_node_attr('/', key='sorted_group_keys'):
-
-            #     if self.task_manager.orderby:
-
-            #         group_orderby_array = self.get_group_orderby_array(group_key)
-
-            #         cv = get_cv_splitter(
-            #             self.task_manager.cross_validation_scheme, 
-            #             self.task_manager.train_window, 
-            #             self.task_manager.test_window,
-            #             self.task_manager.min_train_window,
-            #             group_orderby_array)
-            #         total_splits += cv.get_n_splits()
-
-
-            # print(total_splits)
-            print(time.time() - start_time)
-
+            task_graph = TaskGraph(self.task_manager, verbose=self.verbose)
 
             for group_key in self.data_loader.f.get_sorted_group_names():
 
                 print(group_key)
 
-                
-
-                if self.task_manager.orderby:
+                n_splits = self.data_loader.get_n_splits(group_key, fold_manifest_name)
 
-                    group_orderby_array = self.data_loader.f.get_array('/{}/orderby_array'.format(group_key))
-
-                    cv = get_cv_splitter(
-                        self.task_manager.cross_validation_scheme, 
-                        self.task_manager.train_window, 
-                        self.task_manager.test_window,
-                        self.task_manager.min_train_window,
-                        group_orderby_array)
-                    n_splits = cv.get_n_splits()
-
-                    task_graph = TaskGraph(self.task_manager, cv, verbose=self.verbose)
-
-                    for i in range(n_splits):
-
-                        task_graph.run(group_key, i, self.data_loader)
-
-                        iter_count += 1
+                for i in range(n_splits):
 
-                        if(iter_count == DEBUG_MODE_MAXITER):
-                            print('\nReached DEBUG_MODE_MAXITER stopping')
-                            return
+                    task_graph.run(group_key, i, self.data_loader)
 
+                    iter_count += 1
 
-                else:
-                    pass
+                    if(iter_count == DEBUG_MODE_MAXITER):
+                        print('\nReached DEBUG_MODE_MAXITER stopping')
+                        return
 
             ###################################################################################################################
             ###################################################### DEBUG MODE #################################################
@@ -284,36 +389,415 @@ class EvaluationEngine():
             self.data_loader_scattered = self.dask_client.scatter(self.data_loader)[0]
             self.has_data_loader_scatter = True
         
-        for group_key in self.data_loader.f.get_sorted_group_names():
+        # folds are looked up from the fold manifest on the workers, so one task graph
+        # serves every group
+        task_graph = TaskGraph(self.task_manager)
 
-            if self.task_manager.orderby:
+        # after append_data only the new or changed folds are run again
+        appended_folds = self._get_appended_folds(fold_manifest_name)
 
-                group_orderby_array = self.data_loader.f.get_array('/{}/orderby_array'.format(group_key))
+        if appended_folds is not None:
+            appended_folds = self._drop_fold_results(fold_manifest_name, appended_folds)
 
-                cv = get_cv_splitter(
-                    self.task_manager.cross_validation_scheme, 
-                    self.task_manager.train_window, 
-                    self.task_manager.test_window,
-                    self.task_manager.min_train_window,
-                    group_orderby_array)
-                n_splits = cv.get_n_splits()
+        fold_keys = []
 
-                task_graph = TaskGraph(self.task_manager, cv)
+        # every scheme goes through the stored fold manifest, ordered or not
+        for group_key in self.data_loader.f.get_sorted_group_names():
 
-                for i in range(n_splits):
+            if appended_folds is None:
+                cv_split_indices = range(self.data_loader.get_n_splits(group_key, fold_manifest_name))
+            else:
+                cv_split_indices = appended_folds.get(group_key, [])
 
+            fold_keys.extend((group_key, i) for i in cv_split_indices)
 
-                    self.dask_client.submit(task_graph.run, group_key, i, self.data_loader_scattered)
+        self._submit_folds(task_graph, fold_manifest_name, fold_keys)
 
+        if self.data_loader.get_appended_folds(fold_manifest_name) is not None:
+            self.data_loader.clear_appended_folds(fold_manifest_name)
 
-                    # self.taskq.put_task(self.dask_client.submit, task_graph.run, group_key, i)
-                    
-            else:
-                pass  # normal cross validations
+        self.has_appended_data = False
 
         os.chdir(evaluation_manager.initial_dirpath)
         
 
+    def append_data(self, evaluation_manager, data):
+        """
+        Appends the rows of the new days in [ data ] to the evaluation data that 
+        [ evaluation_manager ] was last run on, without rebuilding its store: each group 
+        only grows by its new rows, and the fold manifests are planned again. The next 
+        run_evaluation then only evaluates the folds that are new or whose test window 
+        reached into the new days, and their results replace the earlier ones.
+
+        [ data ] must have the columns of the evaluation data, the stored groups only, and 
+        days after the last stored day of each group.
+        """
+        if not evaluation_manager.local_data_saved:
+            raise ValueError('[ evaluation_manager ] has no evaluation data to append to, run_evaluation first.')
+
+        self._wait_fold_submission()
+
+        appended_data = evaluation_manager.config_setter.prepare_appended_data(data, self.data_loader.get_num_rows())
+
+        # the running folds read the arrays and the fold manifests that are about to change
+        self.dask_client.wait()
+
+        if evaluation_manager.use_store_cache:
+
+            # the cached store is shared by every evaluation of the same data, so the rows are 
+            # appended to a copy of it, committed under the key of the appended data below
+            store_dirpath = '{}__{}'.format(evaluation_manager.memmap_root_dirpath, evaluation_manager.job_uuid)
+
+            if os.path.exists(store_dirpath):
+                shutil.rmtree(store_dirpath)
+
+            shutil.copytree(evaluation_manager.memmap_root_dirpath, store_dirpath)
+            self.data_loader = DataLoader(store_dirpath, False, self.group_cache_bytes)
+
+        print("\u2714 Appending local data...            ", end="", flush=True)
+        appended_folds = self.data_loader.append_data(appended_data, evaluation_manager.groupby)
+        print('Completed!')
+
+        if evaluation_manager.data_path is None:
+
+            # the predictions are joined on the rows of [ data ] by their uuid
+            evaluation_manager.data = pd.concat([evaluation_manager.data, appended_data], ignore_index=True)
+            evaluation_manager.config_setter.data = evaluation_manager.data
+
+        if evaluation_manager.use_store_cache:
+
+            self._set_store_key(evaluation_manager, get_store_key(evaluation_manager, appended_data))
+
+            commit_store(store_dirpath, evaluation_manager.memmap_root_dirpath, evaluation_manager.store_key)
+            self.data_loader = DataLoader(evaluation_manager.memmap_root_dirpath, False, self.group_cache_bytes)
+            # in case another evaluation had already cached the same store
+            self.data_loader.mark_appended_folds(appended_folds)
+
+        # the scattered data loader holds the old memmap_map
+        self.has_data_loader_scatter = False
+        self.has_appended_data = True
+
+        if self.resource_config.use_yarn_cluster:
+
+            print("\u2714 Uploading local data to S3 bucket...   ", end="", flush=True)
+            upload_local_data(self.task_manager)
+            print('Completed!')
+            
+            print("\u2714 Preparing data on remote workers...   ", end="", flush=True)
+            self.dask_client.submit_per_node(download_local_data, self.task_manager)
+            print('Completed!')
+
+        return appended_folds
+
+    def _set_store_key(self, evaluation_manager, store_key):
+
+        evaluation_manager.config_setter.set_store_key(store_key)
+
+        for k in ['store_key', 'memmap_root_dirname', 'memmap_root_dirpath', 'memmap_root_S3_object_name']:
+            setattr(evaluation_manager, k, getattr(evaluation_manager.config_setter, k))
+
+    def _open_cached_store(self, evaluation_manager):
+        """Opens the cached store of the evaluation data, downloading it from [ S3_path ] if 
+        this machine does not have it. False if neither has it."""
+
+        store_dirpath = evaluation_manager.memmap_root_dirpath
+
+        if not (is_verified_store(store_dirpath, evaluation_manager.store_key) or 
+                download_store(store_dirpath, evaluation_manager.store_key, evaluation_manager.S3_path, 
+                               evaluation_manager.memmap_root_S3_object_name, evaluation_manager.job_uuid)):
+            return False
+
+        print('\u2757 Reusing cached local data {}'.format(os.path.basename(store_dirpath)))
+
+        self.data_loader = DataLoader(store_dirpath, False, self.group_cache_bytes)
+        # folds marked by an append_data of an earlier evaluation, whose results this one does not have
+        self.data_loader.clear_appended_folds()
+
+        return True
+
+    def _has_appended_folds(self, evaluation_manager):
+        """Whether this run only evaluates the folds marked by append_data."""
+
+        if not self.has_appended_data:
+            return False
+
+        fold_manifest_name = self.data_loader.get_fold_manifest_name(
+            evaluation_manager.cross_validation_scheme, 
+            evaluation_manager.train_window, 
+            evaluation_manager.test_window,
+            evaluation_manager.min_train_window,
+            evaluation_manager.gap_window,
+            evaluation_manager.num_folds,
+            evaluation_manager.target_name)
+
+        return self._get_appended_folds(fold_manifest_name) is not None
+
+    def _get_appended_folds(self, fold_manifest_name):
+        """The folds of [ fold_manifest_name ] marked by append_data, None if all of them are 
+        to be run: nothing was appended, or this engine has no earlier results of the manifest 
+        to keep (i.e. marks left on a cached store by another evaluation)."""
+
+        appended_folds = self.data_loader.get_appended_folds(fold_manifest_name)
+
+        if not (any(elem[0]==fold_manifest_name for elem in self.fold_futures) or 
+                any(elem[0]==fold_manifest_name for elem in self.consumed_fold_results)):
+            return None
+
+        return appended_folds
+
+    def _submit_folds(self, task_graph, fold_manifest_name, fold_keys):
+        """Submits the (group_key, cv_split_index) [ fold_keys ], one task per fold or, with 
+        [ fold_batch_size ], one TaskGraph.run_batch task per batch of folds. 
+
+        With "auto" the batch size is tuned from the fold durations of the earlier results 
+        of the manifest. Without any, the first fold of each worker thread is run alone 
+        first and timed: the other folds are batched and submitted by a thread once the 
+        first of these pilot folds is done, so that run_evaluation does not wait for them. 
+        Everything reading the futures waits for that thread first, see 
+        _wait_fold_submission.
+
+        With [ use_cost_scheduling ] the tasks are given Dask priorities, costliest first 
+        (see _schedule_fold_batches). With [ use_group_affinity ] each task goes to the 
+        worker of its (first) group, see _get_group_affinity."""
+
+        self.run_start_time = time.time()
+        self.run_end_time = None
+        self.predicted_makespan = None
+        self.run_futures = dict()
+
+        fold_batch_size = self.fold_batch_size
+
+        if fold_batch_size!='auto':
+            self._submit_fold_batches(task_graph, fold_manifest_name, fold_keys, fold_batch_size)
+            return
+
+        num_threads = self.dask_client.get_num_threads()
+
+        if get_mean_fold_duration(self._get_fold_results(fold_manifest_name)) is not None:
+            self._submit_tuned_fold_batches(task_graph, fold_manifest_name, fold_keys, num_threads)
+            return
+
+        pilot_fold_keys, fold_keys = fold_keys[:num_threads], fold_keys[num_threads:]
+        pilot_futures = [self._submit_fold_batch(task_graph, fold_manifest_name, [elem]) for elem in pilot_fold_keys]
+
+        if len(fold_keys)==0:
+            return
+
+        self.fold_submission = threading.Thread(
+            target=self._run_fold_submission, 
+            args=(task_graph, fold_manifest_name, fold_keys, pilot_futures, num_threads), daemon=True)
+        self.fold_submission.start()
+
+    def _submit_tuned_fold_batches(self, task_graph, fold_manifest_name, fold_keys, num_threads):
+        """Submits the [ fold_keys ] in batches sized from the fold durations of the results 
+        of the manifest."""
+
+        # failed folds are left to raise in get_evaluation_results
+        fold_duration = get_mean_fold_duration(self._get_fold_results(fold_manifest_name))
+        fold_batch_size = get_fold_batch_size(fold_duration or 0, len(fold_keys), num_threads)
+
+        self.tuned_fold_batch_size = fold_batch_size
+
+        if self.verbose:
+            print('fold batch size: {}'.format(fold_batch_size))
+
+        self._submit_fold_batches(task_graph, fold_manifest_name, fold_keys, fold_batch_size)
+
+    def _run_fold_submission(self, task_graph, fold_manifest_name, fold_keys, pilot_futures, num_threads):
+        """The fold submission thread: submits the [ fold_keys ] once the first of the 
+        [ pilot_futures ] is done, and keeps what it raises for _wait_fold_submission."""
+
+        try:
+            self.dask_client.wait_first(pilot_futures)
+            self._submit_tuned_fold_batches(task_graph, fold_manifest_name, fold_keys, num_threads)
+
+        except Exception as e:
+            self.fold_submission_error = e
+
+    def _wait_fold_submission(self):
+        """Waits for the fold submission thread of _submit_folds, if any, and raises what it 
+        raised."""
+
+        if self.fold_submission is None:
+            return
+
+        self.fold_submission.join()
+        self.fold_submission = None
+
+        fold_submission_error, self.fold_submission_error = self.fold_submission_error, None
+
+        if fold_submission_error is not None:
+            raise fold_submission_error
+
+    def _submit_fold_batches(self, task_graph, fold_manifest_name, fold_keys, fold_batch_size):
+
+        if fold_batch_size is None:
+            fold_batches = [[elem] for elem in fold_keys]
+        else:
+            fold_batches = get_fold_batches(fold_keys, fold_batch_size)
+
+        if self.use_cost_scheduling:
+            fold_batches, priorities = self._schedule_fold_batches(fold_manifest_name, fold_batches)
+        else:
+            priorities = [0] * len(fold_batches)
+
+        if self.use_group_affinity:
+            group_affinity = self._get_group_affinity()
+
+        for elem, priority in zip(fold_batches, priorities):
+
+            if self.use_group_affinity:
+                # loose restrictions: the tasks queue on the worker of their group, and are 
+                # only stolen by the other workers once these run out of tasks
+                submit_kwargs = {'workers': [group_affinity[elem[0][0]]], 'allow_other_workers': True}
+            else:
+                submit_kwargs = dict()
+
+            if fold_batch_size is None:
+
+                group_key, i = elem[0]
+                future = self.dask_client.submit(task_graph.run, group_key, i, self.data_loader_scattered, 
+                                                 priority=priority, **submit_kwargs)
+                self._add_run_future(future)
+                self.fold_futures[(fold_manifest_name, group_key, i)] = future
+
+                # self.taskq.put_task(self.dask_client.submit, task_graph.run, group_key, i)
+
+            else:
+                self._submit_fold_batch(task_graph, fold_manifest_name, elem, priority, **submit_kwargs)
+
+    def _submit_fold_batch(self, task_graph, fold_manifest_name, fold_keys, priority=0, **submit_kwargs):
+
+        future = self.dask_client.submit(task_graph.run_batch, fold_keys, self.data_loader_scattered, 
+                                         priority=priority, **submit_kwargs)
+        self._add_run_future(future)
+
+        for group_key, i in fold_keys:
+            self.fold_futures[(fold_manifest_name, group_key, i)] = future
+
+        return future
+
+    def _add_run_future(self, future):
+
+        self.run_futures[future.key] = future
+
+        if self.use_cost_scheduling:
+            future.add_done_callback(self._record_run_end_time)
+
+    def _record_run_end_time(self, future):
+
+        self.run_end_time = max(self.run_end_time or 0, time.time())
+
+    def _schedule_fold_batches(self, fold_manifest_name, fold_batches):
+        """Orders the [ fold_batches ] costliest first and returns them with their Dask 
+        priorities, the first one highest. A fold costs what it took in an earlier run of 
+        the manifest, or else its train and test rows times its feature count (scaled to 
+        seconds by the recorded folds, see get_fold_costs). The predicted makespan is that 
+        of this largest-first order on the worker threads, if the costs are in seconds."""
+
+        fold_durations = {(elem[0], elem[1]): elem[6] for elem in self._get_fold_results(fold_manifest_name)}
+
+        fold_work = dict()
+
+        for group_key in dict.fromkeys(elem[0] for fold_batch in fold_batches for elem in fold_batch):
+
+            train_sizes, test_sizes = self.data_loader.get_fold_sizes(group_key, fold_manifest_name)
+            group_fold_work = get_fold_work(train_sizes, test_sizes, len(self.task_manager.feature_names[group_key]))
+
+            fold_work.update({(group_key, i): elem for i, elem in enumerate(group_fold_work)})
+
+        fold_costs, in_seconds = get_fold_costs(fold_work, fold_durations)
+        batch_costs = [sum(fold_costs[elem] for elem in fold_batch) for fold_batch in fold_batches]
+
+        order, makespan = get_largest_first_schedule(batch_costs, self.dask_client.get_num_threads())
+
+        if in_seconds:
+            self.predicted_makespan = makespan
+            print('\u2757 Predicted makespan: {:.2f}s'.format(makespan))
+
+        return [fold_batches[i] for i in order], list(range(len(order), 0, -1))
+
+    def _get_group_affinity(self):
+        """{group_key: worker address}, each worker getting a shard of the groups of about 
+        the same number of rows (see get_group_affinity). It is kept while the workers do 
+        not change, so the later runs read the same groups on the same workers, whose page 
+        cache (and group cache) still holds them."""
+
+        worker_addresses = self.dask_client.get_worker_addresses()
+        group_sizes = dict(zip(self.data_loader.f.get_group_names(), self.data_loader.f.get_group_sizes()))
+
+        if (self.group_affinity is None or set(self.group_affinity.values()) - set(worker_addresses) 
+                or set(group_sizes) - set(self.group_affinity)):
+            self.group_affinity = get_group_affinity(group_sizes, worker_addresses)
+
+        return self.group_affinity
+
+    def get_worker_read_stats(self):
+        """The bytes each worker read from the group arrays since the data loader was last 
+        sent to the workers, and its working set (the total size of the distinct group 
+        arrays it read), as a DataFrame indexed by worker address."""
+
+        self._wait_fold_submission()
+        self.dask_client.wait(list(self.run_futures.values()))
+
+        read_stats = self.dask_client.run(get_scattered_read_stats, self.data_loader_scattered.key)
+
+        return pd.DataFrame.from_dict(read_stats, orient='index', columns=['bytes_read', 'working_set_bytes'])
+
+    def get_makespan(self):
+        """The predicted makespan of the last run_evaluation (None without recorded fold 
+        durations to predict it from) and the actual one, in seconds, once its tasks are 
+        done. Requires [ use_cost_scheduling ]."""
+
+        if not self.use_cost_scheduling:
+            raise ValueError('get_makespan requires the [ use_cost_scheduling ] argument.')
+
+        self._wait_fold_submission()
+        self.dask_client.wait(list(self.run_futures.values()))
+
+        return {'predicted_makespan': self.predicted_makespan, 
+                'actual_makespan': self.run_end_time - self.run_start_time}
+
+    def _get_fold_results(self, fold_manifest_name):
+        """The run results of the finished folds of [ fold_manifest_name ]."""
+
+        fold_results = [row for k, row in self.consumed_fold_results if k==fold_manifest_name]
+        # a batch task is the future of each of its folds
+        futures = {v.key: v for k, v in self.fold_futures.items() if k[0]==fold_manifest_name}
+
+        for future in futures.values():
+
+            if future.status!='finished':
+                continue
+
+            result = future.result()
+            fold_results.extend(result if isinstance(result, list) else [result])
+
+        return fold_results
+
+    def _drop_fold_results(self, fold_manifest_name, appended_folds):
+        """Forgets the earlier results of the folds about to be run again. A batch task 
+        holds the results of other folds as well, which are then run again with them, so 
+        returns the {group_key: fold indices} to run."""
+
+        stale_futures = [self.fold_futures.get((fold_manifest_name, group_key, i)) 
+                         for group_key, cv_split_indices in appended_folds.items() for i in cv_split_indices]
+        stale_future_keys = set(elem.key for elem in stale_futures if elem is not None)
+
+        rerun_folds = {group_key: set(cv_split_indices) for group_key, cv_split_indices in appended_folds.items()}
+
+        for k, v in list(self.fold_futures.items()):
+            if k[0]==fold_manifest_name and v.key in stale_future_keys:
+                rerun_folds.setdefault(k[1], set()).add(k[2])
+                del self.fold_futures[k]
+
+        for elem in stale_future_keys:
+            self.dask_client.futures.pop(elem, None)
+        self.consumed_fold_results = [(k, row) for k, row in self.consumed_fold_results 
+                                      if k!=fold_manifest_name or row[1] not in rerun_folds.get(row[0], ())]
+
+        return {k: sorted(v) for k, v in rerun_folds.items()}
+
     # def start_dask_client(self):
         
     #     if self.use_yarn_cluster:
@@ -366,19 +850,79 @@ class EvaluationEngine():
     def get_evaluation_results(self):
 
         # self.taskq.join()
+        self._wait_fold_submission()
+
+        # the rows are fresh lists, _format_result_row does not touch the future results
+        res = [row for _, row in self.consumed_fold_results] + self.dask_client.get_results()
+
+        date_names = self._get_date_names()
+        res = [self._format_result_row(elem, date_names) for elem in res]
+
+        res_pdf = pd.DataFrame(res, columns=RESULT_COLUMNS)
+        return res_pdf.sort_values(by=['group_key', 'test_idx']).reset_index(drop=True)
+
+    def iter_results(self):
+        """
+        Yields the result row of each fold, as a dict of the get_evaluation_results columns, 
+        as soon as its task finishes rather than in submission order. Each task is released 
+        once its rows are yielded, so the client does not keep every task alive until the end 
+        of a long run. The rows themselves are kept, get_evaluation_results still has them.
+        """
+        self._wait_fold_submission()
+
+        date_names = self._get_date_names()
+
+        # the folds of each task, a batch task being the future of each of its folds
+        future_fold_keys = dict()
+        for k, v in self.fold_futures.items():
+            future_fold_keys.setdefault(v.key, []).append(k)
 
-        res = copy.deepcopy(self.dask_client.get_results())
+        for future in self.dask_client.iter_completed():
+
+            result = future.result()
+            rows = result if isinstance(result, list) else [result]
+
+            fold_keys = future_fold_keys.get(future.key, [])
+            fold_manifest_name = fold_keys[0][0] if len(fold_keys)>0 else None
+
+            self.consumed_fold_results.extend((fold_manifest_name, list(elem)) for elem in rows)
+
+            for k in fold_keys:
+                if self.fold_futures.get(k) is future:
+                    del self.fold_futures[k]
+
+            self.run_futures.pop(future.key, None)
+            self.dask_client.release(future)
+
+            for elem in rows:
+                yield dict(zip(RESULT_COLUMNS, self._format_result_row(list(elem), date_names)))
+
+    def _get_date_names(self):
+        """{day index: "YYYY-MM-DD"} of the ordered schemes, None for the others."""
+
+        if self.task_manager.cross_validation_scheme not in ORDERED_CV_SCHEMES:
+            return None
+
+        if self.data_path is not None:
+
+            # only a sample of the Parquet data is in memory, so the dates of the stored day 
+            # indices are counted from the first date
+            orderby_days = np.unique(self.data_loader.get_array('/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME)))
+            return {day: str((self.orderby_first_date + pd.Timedelta(days=int(day))).date()) for day in orderby_days}
 
         tmp = self.data[[self.task_manager.orderby, constants.EF_ORDERBY_NAME]]
         tmp.set_index(constants.EF_ORDERBY_NAME, inplace=True)
         tmp_dict = tmp.to_dict()[self.task_manager.orderby]
-        tmp_dict = {k: str(v.date()) for k, v in tmp_dict.items()}
 
-        for idx, elem in enumerate(res):
-            res[idx][-2] = [tmp_dict[_elem] for _elem in elem[-2] if _elem in tmp_dict]
+        return {k: str(v.date()) for k, v in tmp_dict.items()}
 
-        res_pdf = pd.DataFrame(res, columns=['group_key', 'test_idx', 'eval_result', 'train_size', 'test_size', 'test_dates', 'duration'])
-        return res_pdf.sort_values(by=['group_key', 'test_idx']).reset_index(drop=True)
+    def _format_result_row(self, row, date_names):
+        """The result [ row ] (a list) with its test day indices as dates."""
+
+        if date_names is not None:
+            row[5] = [date_names[elem] for elem in row[5] if elem in date_names]
+
+        return row
 
         
         # res_pdf = pd.DataFrame(res, columns=['group_key', 'test_idx', 'eval_result', 'train_size', 'test_size', 'duration'])
@@ -401,6 +945,7 @@ class EvaluationEngine():
 
         if not self.has_prediction:
 
+            self._wait_fold_submission()
             self.dask_client.get_results()
 
             if self.resource_config.use_yarn_cluster:
@@ -423,12 +968,23 @@ class EvaluationEngine():
             prediction_array = prediction_array[prediction_array[:, 0].argsort()]
 
             prediction_pdf = pd.DataFrame(prediction_array, columns=[constants.EF_UUID_NAME, constants.EF_PREDICTION_NAME])
+            prediction_pdf[constants.EF_UUID_NAME] = prediction_pdf[constants.EF_UUID_NAME].astype(np.int64)
             prediction_pdf.set_index(constants.EF_UUID_NAME, inplace=True)
-            prediction_pdf = prediction_pdf.reindex(range(0, len(self.data)), fill_value=np.nan)
-            self.data[constants.EF_PREDICTION_NAME] = prediction_pdf[constants.EF_PREDICTION_NAME]
 
+            # the records are kept until the next run_evaluation, whose unchanged folds 
+            # still need them after append_data
             self.has_prediction = True
-            clean_dir(prediction_dirpath)
+
+            if self.data_path is not None:
+
+                # there is no Parquet data in memory to join them to, the uuid index is the 
+                # row position in the dataset
+                self.prediction_pdf = prediction_pdf
+
+                return self.prediction_pdf
+
+            prediction_pdf = prediction_pdf.reindex(range(0, len(self.data)), fill_value=np.nan)
+            self.data[constants.EF_PREDICTION_NAME] = prediction_pdf[constants.EF_PREDICTION_NAME]
             
             return self.data.drop(labels=[
                 constants.EF_UUID_NAME, 
@@ -436,6 +992,10 @@ class EvaluationEngine():
                 constants.HMF_MEMMAP_MAP_NAME,
                 constants.HMF_GROUPBY_NAME], axis=1, inplace=False, errors='ignore')
 
+        elif self.data_path is not None:
+
+            return self.prediction_pdf
+
         else:
 
             return self.data.drop(labels=[
@@ -2,6 +2,11 @@ from evaluation_framework.utils.pandas_utils import cast_datetime2int64
 from evaluation_framework.utils.pandas_utils import cast_int64_2datetime
 from evaluation_framework.utils.pandas_utils import encode_str2bytes
 from evaluation_framework.utils.pandas_utils import encode_date_sequence
+from evaluation_framework.utils.pandas_utils import encode_datetime2int64
+from evaluation_framework.utils.pandas_utils import view_int64_as_datetime
+from evaluation_framework.utils.pandas_utils import get_str_categories
+from evaluation_framework.utils.pandas_utils import encode_str2codes
+from evaluation_framework.utils.pandas_utils import decode_codes2categorical
 from evaluation_framework.utils.s3_utils import s3_upload_object
 from evaluation_framework.utils.s3_utils import s3_download_object
 from evaluation_framework.utils.s3_utils import s3_upload_zip_dir
@@ -11,13 +16,32 @@ from evaluation_framework.utils.objectIO_utils import save_obj
 from evaluation_framework.utils.objectIO_utils import load_obj
 from evaluation_framework.utils.memmap_utils import write_memmap
 from evaluation_framework.utils.memmap_utils import read_memmap
+from evaluation_framework.utils.memmap_utils import get_2d_idx
+from evaluation_framework.utils.memmap_utils import create_memmap
+from evaluation_framework.utils.memmap_utils import write_memmap_rows
+from evaluation_framework.utils.memmap_utils import append_memmap_rows
+from evaluation_framework.utils.pandas_utils import is_datetime_type
+from evaluation_framework.utils.parquet_utils import iter_parquet_batches
 from evaluation_framework.utils.decorator_utils import failed_method_retry
+from evaluation_framework.task_graph.cross_validation_split import plan_splits
+from evaluation_framework.task_graph.cross_validation_split import assign_folds
+from evaluation_framework.task_graph.cross_validation_split import FOLD_PLAN_DTYPE
+from evaluation_framework.task_graph.array_data import ArrayData
+from evaluation_framework.task_graph.array_data import make_extra_array
+from evaluation_framework.evaluation_manager_core.config_setter import ORDERED_CV_SCHEMES
+from evaluation_framework.evaluation_manager_core.config_setter import UNORDERED_CV_SCHEMES
+from evaluation_framework.evaluation_engine_core.group_cache import GroupCache
 from evaluation_framework import constants
 
 import HMF
+from HMF.utils import stride_util
 
 import os
 import shutil
+import functools
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from collections import namedtuple
 import pickle
 import numpy as np
@@ -28,14 +52,68 @@ import time
 import HMF
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import copy
 
+FOLD_MANIFESTS_ATTR_NAME = 'fold_manifests'
+FOLD_MANIFEST_ITEMS_ATTR_NAME = 'fold_manifest_items'
+GROUP_OFFSETS_ATTR_NAME = 'group_offsets'
+GLOBAL_ORDERBY_ARRAY_NAME = 'global_orderby_array'
+UUID_ARRAY_NAME = 'uuid_array'
+STORAGE_LAYOUT_ATTR_NAME = 'storage_layout'
+STR_CATEGORIES_ATTR_NAME = 'str_categories'
+APPENDED_FOLDS_ATTR_NAME = 'appended_folds'
+
+
+def get_numeric_column_array_name(col_position):
+
+    return 'numeric_types__{}'.format(col_position)
+
+
+def get_missing_key_array_name(missing_key_type, col_position):
+
+    return '{}__{}'.format(missing_key_type, col_position)
+
+
+def get_group_names(group_keys, groupby):
+    """The group names of the store for the [ groupby ] values [ group_keys ], unique and in 
+    the order HMF from_pandas gives them, so that both writers name (and order) the group 
+    nodes the same way."""
+
+    tmp = pd.DataFrame(pd.unique(group_keys), columns=[groupby])
+    group_names = tmp.sort_values(by=groupby).reset_index(drop=True)[groupby].tolist()
+
+    invalid_group_names = [elem for elem in group_names if '/' in str(elem)]
+    if len(invalid_group_names) > 0:
+        raise ValueError('[ {} ] has groups "{}" with a "/", which separates the nodes of the evaluation '
+                         'store.'.format(groupby, ', '.join(map(str, invalid_group_names))))
+
+    return group_names
+
+
+def get_batch_encoder(columns, encoder):
+    """What register_array does to the [ columns ] of the whole DataFrame, for the batches 
+    of save_parquet_data."""
+
+    return lambda pdf: encoder(pdf[columns])
+
+
+def get_scattered_read_stats(data_loader_key, dask_worker=None):
+    """DataLoader.get_read_stats of the data loader scattered as [ data_loader_key ], run on 
+    each worker by Client.run."""
+
+    if data_loader_key not in dask_worker.data:
+        return {'bytes_read': 0, 'working_set_bytes': 0}
+
+    return dask_worker.data[data_loader_key].get_read_stats()
+
+
 class DataLoader():
     """
     This class holds the HMF object. 
     """
     
-    def __init__(self, dirpath, overwrite=False):
+    def __init__(self, dirpath, overwrite=False, group_cache_bytes=None):
         
         if overwrite:
             mode = 'w+'
@@ -44,6 +122,63 @@ class DataLoader():
                     
         self.f = HMF.open_file(dirpath, mode=mode)
         self.dirpath = dirpath
+
+        if not overwrite and self.f.memmap_map['dirpath'] != dirpath:
+            # the store was moved (store cache, download on a remote node), its arrays are 
+            # read relative to the memmap_map root
+            self.f.memmap_map['dirpath'] = dirpath
+            self._save_memmap_map()
+
+        self.group_cache_bytes = group_cache_bytes
+        self.group_cache = None
+
+        # bytes read from the group arrays, and the size of each array read at least once
+        self.bytes_read = 0
+        self.read_array_bytes = dict()
+        self.read_lock = threading.Lock()
+
+    def __getstate__(self):
+
+        # each worker builds its own cache (and read counters) from its own reads
+        state = self.__dict__.copy()
+        state['group_cache'] = None
+        state['bytes_read'] = 0
+        state['read_array_bytes'] = dict()
+        state['read_lock'] = None
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self.read_lock = threading.Lock()
+
+    def get_read_stats(self):
+        """The bytes read from the group arrays by this copy of the data loader (i.e. on 
+        one worker), and its working set: the total size of the distinct arrays it read."""
+
+        return {'bytes_read': self.bytes_read, 'working_set_bytes': sum(self.read_array_bytes.values())}
+
+    def _count_read(self, array_filepath, array):
+
+        # the worker threads share the data loader
+        with self.read_lock:
+
+            self.bytes_read += array.nbytes
+
+            if array_filepath not in self.read_array_bytes:
+
+                array_info = self.f.retrieve_memmap_map_pos_array(array_filepath)
+                self.read_array_bytes[array_filepath] = int(np.prod(array_info['shape'])) * np.dtype(array_info['dtype']).itemsize
+
+    def get_group_cache(self):
+        """The worker-local GroupCache, created on first use. None if caching is off 
+        ([ group_cache_bytes ] None or 0)."""
+
+        if self.group_cache is None and self.group_cache_bytes:
+            self.group_cache = GroupCache(self.group_cache_bytes)
+
+        return self.group_cache
         
 #     def create_dirpaths(self, memmap_root_dirname, return_predictions, prediction_records_dirname=None):
         
@@ -63,7 +198,10 @@ class DataLoader():
 #                 shutil.rmtree(prediction_records_dirpath)
 #                 os.makedirs(prediction_records_dirpath)
 
-    def save_data(self, pdf, orderby, groupby, numeric_columns, missing_keys):
+    def save_data(self, pdf, orderby, groupby, numeric_columns, missing_keys, 
+                  cross_validation_scheme=None, train_window=None, test_window=None, min_train_window=None,
+                  gap_window=0, num_folds=None, target_name=None, storage_layout='row_major',
+                  num_write_threads=None):
         """memmap mimicking hdf5 filesystem. 
         root_dirpath/
             memmap_map
@@ -75,49 +213,936 @@ class DataLoader():
         root_dirpath / group_dirpath / filepath
         memmap['groups'][group_key]['groups'][group_key_innder]['arrays'][filepath, dtype, shape]
 
+        With [ storage_layout ] "row_major" the numeric columns of a group are one 2d 
+        [ numeric_types ] array. With "column_major" every numeric column gets its own 1d 
+        [ numeric_types__i ] array, i being its position in [ numeric_columns ].
+
+        The datetime and str columns of [ missing_keys ] are stored one 1d array each, 
+        [ datetime_types__i ] as int64 and [ str_types__i ] as dictionary codes into the 
+        categories kept in the root [ str_categories ] attribute.
+
+        The helper columns have their own typed 1d arrays as well, the uuid [ uuid_array ] 
+        as int64 and the day index [ orderby_array ] as int32, so the numeric block keeps 
+        the float32 of the features. load_data puts the uuid column back on read.
+
+        By default the group arrays are written by HMF close, one subprocess per group 
+        array. With [ num_write_threads ] they are written by a pool of that many threads 
+        instead (see _write_registered_arrays), which scales much better with thousands 
+        of groups.
         """
+        # from_pandas names the groups like get_group_names, which checks the group keys
+        get_group_names(pdf[groupby], groupby)
         self.f.from_pandas(pdf, groupby=groupby, orderby=orderby)
-        self.f.register_array('numeric_types', numeric_columns)
-        self.f.register_array('orderby_array', constants.EF_ORDERBY_NAME)
+
+        if storage_layout=='column_major':
+            for i, colname in enumerate(numeric_columns):
+                self.f.register_array(get_numeric_column_array_name(i), colname)
+        else:
+            self.f.register_array('numeric_types', numeric_columns)
+
+        self.f.set_node_attr('/', key=STORAGE_LAYOUT_ATTR_NAME, value=storage_layout)
+
+        for i, colname in enumerate(missing_keys['datetime_types']):
+            self.f.register_array(get_missing_key_array_name('datetime_types', i), colname, 
+                                  encoder=encode_datetime2int64)
+
+        str_categories = dict()
+
+        for i, colname in enumerate(missing_keys['str_types']):
+            # one dictionary for all the groups, so the codes mean the same thing everywhere
+            str_categories[colname] = get_str_categories(pdf[colname])
+            self.f.register_array(get_missing_key_array_name('str_types', i), colname, 
+                                  encoder=functools.partial(encode_str2codes, categories=str_categories[colname]))
+
+        self.f.set_node_attr('/', key=STR_CATEGORIES_ATTR_NAME, value=str_categories)
+
+        self.f.register_array(UUID_ARRAY_NAME, constants.EF_UUID_NAME)
+
+        if orderby:
+            self.f.register_array('orderby_array', constants.EF_ORDERBY_NAME)
         
         for i in range(len(self.f.get_group_names())):
 
             self.f.set_node_attr('/{}'.format(self.f.get_group_names()[i]), 
-                                 key='numeric_keys', value=numeric_columns)
+                                 key='numeric_keys', value=list(numeric_columns))
             self.f.set_node_attr('/{}'.format(self.f.get_group_names()[i]), 
                                  key='missing_keys', value=missing_keys)
+
+        # from_pandas sorted the data by (groupby, orderby), so the groups are laid out 
+        # back to back in the order of get_group_names. Keep the group offsets (and the 
+        # whole orderby column) so fold plans never need per group reads.
+        group_offsets = np.concatenate(([0], np.cumsum(self.f.get_group_sizes()))).astype(np.int64)
+        self.f.set_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME, value=group_offsets)
+
+        if orderby:
+
+            sorted_pdf = self.f.pdfs[self.f.current_dataframe_name]
+            self.f.set_array('/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME), sorted_pdf[constants.EF_ORDERBY_NAME].values)
         
         # group_key_size_tuples = sorted(zip(self.f.get_group_names(), self.f.group_sizes), 
         #                                key=lambda x: x[1], reverse=True)
         # sorted_group_keys = [elem[0] for elem in group_key_size_tuples]
         # self.f.set_node_attr('/', key='sorted_group_keys', value=sorted_group_keys)
         
-        self.f.close()
+        if num_write_threads:
+            self._write_registered_arrays(num_write_threads)
+        else:
+            self.f.close()
+
+        if (orderby and cross_validation_scheme in ORDERED_CV_SCHEMES) or cross_validation_scheme in UNORDERED_CV_SCHEMES:
+            self.save_fold_manifest(cross_validation_scheme, train_window, test_window, min_train_window, 
+                                    gap_window, num_folds, target_name)
+
+    def save_parquet_data(self, data_path, orderby, groupby, numeric_columns, missing_keys, orderby_first_date=None,
+                          cross_validation_scheme=None, train_window=None, test_window=None, min_train_window=None,
+                          gap_window=0, num_folds=None, target_name=None, storage_layout='row_major',
+                          batch_size=2**17):
+        """Out-of-core save_data for the Parquet file or dataset directory at [ data_path ].
+        The store is the same as with save_data, but the rows are streamed [ batch_size ] at
+        a time instead of going through an in-memory DataFrame:
+
+        1. a first pass over the groupby (and str) columns gives the group sizes (and the
+           str categories), so that every group array is allocated at its final size
+        2. a second pass partitions each batch by group and appends its rows to the group
+           arrays, with the uuid being the row position in the dataset as with save_data
+        3. each group is then sorted by its orderby in place
+
+        The driver therefore holds one batch, or the largest group during the sort, at a
+        time. [ orderby_first_date ] is the first date of the whole dataset that the day
+        index counts from (ConfigSetter.orderby_first_date).
+        """
+        str_columns = missing_keys['str_types']
+        group_sizes = collections.Counter()
+        str_values = {colname: set() for colname in str_columns}
+
+        has_groupby_column = groupby != constants.EF_DUMMY_GROUP_COLUMN_NAME
+        count_columns = ([groupby] if has_groupby_column else []) + str_columns
+
+        for batch_pdf in iter_parquet_batches(data_path, columns=list(dict.fromkeys(count_columns)) or None,
+                                              batch_size=batch_size):
+
+            if has_groupby_column:
+                group_sizes.update(batch_pdf[groupby].value_counts().to_dict())
+            else:
+                group_sizes[groupby] += len(batch_pdf)
+
+            for colname in str_columns:
+                str_values[colname].update(batch_pdf[colname].dropna().unique())
+
+        group_names = get_group_names(pd.Series(list(group_sizes)), groupby)
+        group_sizes = np.array([group_sizes[elem] for elem in group_names], dtype=np.int64)
+        group_offsets = np.concatenate(([0], np.cumsum(group_sizes))).astype(np.int64)
+
+        str_categories = {colname: get_str_categories(pd.Series(sorted(str_values[colname]), dtype=object))
+                          for colname in str_columns}
+
+        # (array name, dtype, row shape, encoder of a batch) of every group array
+        array_specs = []
+
+        if storage_layout=='column_major':
+            for i, colname in enumerate(numeric_columns):
+                array_specs.append((get_numeric_column_array_name(i), np.float32, (), 
+                                    get_batch_encoder(colname, functools.partial(np.asarray, dtype=np.float32))))
+        else:
+            array_specs.append(('numeric_types', np.float32, (len(numeric_columns),), 
+                                get_batch_encoder(numeric_columns, functools.partial(np.asarray, dtype=np.float32))))
+
+        for i, colname in enumerate(missing_keys['datetime_types']):
+            array_specs.append((get_missing_key_array_name('datetime_types', i), np.int64, (), 
+                                get_batch_encoder(colname, encode_datetime2int64)))
+
+        for i, colname in enumerate(str_columns):
+            encoder = functools.partial(encode_str2codes, categories=str_categories[colname])
+            array_specs.append((get_missing_key_array_name('str_types', i), encoder(pd.Series([], dtype=object)).dtype, (), 
+                                get_batch_encoder(colname, encoder)))
+
+        array_specs.append((UUID_ARRAY_NAME, np.int64, (), 
+                            get_batch_encoder(constants.EF_UUID_NAME, functools.partial(np.asarray, dtype=np.int64))))
+
+        if orderby:
+            array_specs.append(('orderby_array', np.int32, (), 
+                                get_batch_encoder(constants.EF_ORDERBY_NAME, functools.partial(np.asarray, dtype=np.int32))))
+
+        for group_name, group_size in zip(group_names, group_sizes):
+            for array_name, dtype, row_shape, _ in array_specs:
+                self._create_array('/{}/{}'.format(group_name, array_name), dtype, (group_size,) + row_shape)
+
+        source_columns = list(numeric_columns) + missing_keys['datetime_types'] + str_columns
+        source_columns += [elem for elem in [groupby if has_groupby_column else None, orderby] if elem]
+
+        group_cursors = group_offsets[:-1].copy()
+        row_offset = 0
+
+        for batch_pdf in iter_parquet_batches(data_path, columns=list(dict.fromkeys(source_columns)),
+                                              batch_size=batch_size):
+
+            batch_pdf[constants.EF_UUID_NAME] = np.arange(row_offset, row_offset + len(batch_pdf), dtype=np.int64)
+            row_offset += len(batch_pdf)
+
+            if not has_groupby_column:
+                batch_pdf[groupby] = groupby
+
+            for colname in missing_keys['datetime_types'] + ([orderby] if orderby else []):
+                if not is_datetime_type(batch_pdf[colname]):
+                    batch_pdf[colname] = pd.to_datetime(batch_pdf[colname])
+
+            if orderby:
+                batch_pdf[constants.EF_ORDERBY_NAME] = encode_date_sequence(batch_pdf[orderby], orderby_first_date)
+
+            # partition the batch by group, keeping the dataset order within each group
+            group_codes = pd.Categorical(batch_pdf[groupby], categories=group_names).codes
+            order = np.argsort(group_codes, kind='stable')
+            batch_pdf = batch_pdf.iloc[order]
+            batch_borders = np.searchsorted(group_codes[order], np.arange(len(group_names) + 1))
+
+            for array_name, _, _, encoder in array_specs:
+
+                batch_array = encoder(batch_pdf)
+
+                for i in np.flatnonzero(np.diff(batch_borders)):
+
+                    group_array_rows = batch_array[batch_borders[i]:batch_borders[i + 1]]
+                    write_memmap_rows(self._get_array_filepath('/{}/{}'.format(group_names[i], array_name)),
+                                      group_array_rows, group_cursors[i] - group_offsets[i])
+
+            group_cursors += np.diff(batch_borders)
+
+        if orderby:
+
+            self._create_array('/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME), np.int32, (group_offsets[-1],))
+
+            for i, group_name in enumerate(group_names):
+
+                group_orderby_array = self._sort_group_arrays(group_name, [elem[0] for elem in array_specs])
+                write_memmap_rows(self._get_array_filepath('/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME)),
+                                  group_orderby_array, group_offsets[i])
+
+        # what from_pandas would have recorded about the groups
+        dataframe_name = '{}_{}'.format(HMF.constants.DATAFRAME_NAME, 0)
+        self.f.memmap_map['grouped'][dataframe_name] = True
+        self.f.memmap_map['group_sizes'][dataframe_name] = group_sizes
+        self.f.memmap_map['group_names'][dataframe_name] = group_names
+        self.f.memmap_map['group_items'][dataframe_name] = list(zip(group_names, stride_util(group_offsets, 2, 1, np.int32)))
+        self.f.memmap_map['multi_pdfs'] = False
+
+        for group_name in group_names:
+            self.f.set_node_attr('/{}'.format(group_name), key='numeric_keys', value=list(numeric_columns))
+            self.f.set_node_attr('/{}'.format(group_name), key='missing_keys', value=missing_keys)
+
+        self.f.set_node_attr('/', key=STORAGE_LAYOUT_ATTR_NAME, value=storage_layout)
+        self.f.set_node_attr('/', key=STR_CATEGORIES_ATTR_NAME, value=str_categories)
+        self.f.set_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME, value=group_offsets)
+
+        self._save_memmap_map()
+
+        if (orderby and cross_validation_scheme in ORDERED_CV_SCHEMES) or cross_validation_scheme in UNORDERED_CV_SCHEMES:
+            self.save_fold_manifest(cross_validation_scheme, train_window, test_window, min_train_window,
+                                    gap_window, num_folds, target_name)
+
+    def _write_registered_arrays(self, num_write_threads):
+        """What HMF close does with the registered arrays, with a pool of [ num_write_threads ] 
+        threads in place of a subprocess (and a read back) per group array. from_pandas 
+        already laid the groups out back to back, so every task is the copy of a contiguous 
+        slice into its own memmap file, and numpy releases the GIL for those copies."""
+
+        dataframe_name = self.f.current_dataframe_name
+        write_tasks = []
+
+        for array_name, data_array in self.f.arrays[dataframe_name]:
+            for group_name, (start_idx, end_idx) in self.f.memmap_map['group_items'][dataframe_name]:
+
+                array_filepath = '/{}/{}'.format(group_name, array_name)
+                group_array = data_array[start_idx:end_idx]
+
+                # the memmap_map is only updated from this thread
+                self.f.update_memmap_map_array(array_filepath, group_array)
+                write_tasks.append((self._get_array_filepath(array_filepath), group_array))
+
+        with ThreadPoolExecutor(max_workers=num_write_threads) as executor:
+            # list() so that a failed write raises here
+            list(executor.map(lambda task: write_memmap(task[0], task[1].dtype, task[1].shape, task[1]), 
+                              write_tasks))
+
+        self._save_memmap_map()
+
+        self.f.del_pdf()
+        self.f.del_arrays()
+
+    def _create_array(self, array_filepath, dtype, shape):
+        """Registers an array in the memmap_map and allocates its file, without the array."""
+
+        self.f.update_memmap_map_array(array_filepath, np.broadcast_to(np.zeros((), dtype=dtype), shape))
+        create_memmap(self._get_array_filepath(array_filepath), dtype, shape)
+
+    def _get_array_filepath(self, array_filepath):
+
+        return os.path.join(self.f.memmap_map['dirpath'],
+                            self.f.retrieve_memmap_map_pos_array(array_filepath)['dirpath'])
+
+    def _sort_group_arrays(self, group_name, array_names):
+        """Stable sorts the [ array_names ] arrays of a group by its orderby_array in place,
+        and returns the sorted orderby_array."""
+
+        memmaps = {elem: np.memmap(self._get_array_filepath('/{}/{}'.format(group_name, elem)), mode='r+',
+                                   **{k: self.f.retrieve_memmap_map_pos_array('/{}/{}'.format(group_name, elem))[k]
+                                      for k in ['dtype', 'shape']})
+                   for elem in array_names}
+
+        orderby_array = np.array(memmaps['orderby_array'])
+        order = np.argsort(orderby_array, kind='stable')
+
+        if np.any(np.diff(order) != 1):
+            for memmap in memmaps.values():
+                memmap[:] = memmap[order]
+                memmap.flush()
+
+        return orderby_array[order]
+
+    def append_data(self, pdf, groupby):
+        """Appends the rows of [ pdf ], new days of data prepared like the data of save_data 
+        (see ConfigSetter.prepare_appended_data), at the end of their groups. The group 
+        arrays only grow by the new rows, the str categories are extended with the new 
+        values, and the global orderby array and the fold manifests are planned again.
+
+        Returns {fold_manifest_name: {group_key: fold indices}} of the folds that are new or 
+        whose rows changed, which are kept in the root [ appended_folds ] attribute as well 
+        until clear_appended_folds.
+        """
+        group_names = list(self.f.get_group_names())
+
+        unknown_group_keys = set(pdf[groupby].unique()) - set(group_names)
+        if len(unknown_group_keys) > 0:
+            raise ValueError('[ data ] has groups "{}" that are not in the evaluation store, only new days of '
+                             'the stored groups can be appended.'.format(', '.join(map(str, unknown_group_keys))))
+
+        group_codes = np.asarray(pd.Categorical(pdf[groupby], categories=group_names).codes)
+        order = np.lexsort((pdf[constants.EF_ORDERBY_NAME].values, group_codes))
+        pdf = pdf.iloc[order]
+        group_borders = np.searchsorted(group_codes[order], np.arange(len(group_names) + 1))
+        appended_groups = np.flatnonzero(np.diff(group_borders))
+
+        orderby_array = pdf[constants.EF_ORDERBY_NAME].values
+
+        for i in appended_groups:
+
+            last_date_idx = self.get_array('/{}/orderby_array'.format(group_names[i]), idx=slice(-1, None))
+
+            if orderby_array[group_borders[i]] <= last_date_idx[0]:
+                raise ValueError('The appended rows of group "{}" must all be on days after its last stored '
+                                 'day.'.format(group_names[i]))
+
+        numeric_keys = self.f.get_node_attr('/{}'.format(group_names[0]), key='numeric_keys')
+        missing_keys = self.f.get_node_attr('/{}'.format(group_names[0]), key='missing_keys')
+        str_categories = self._get_node_attr('/', STR_CATEGORIES_ATTR_NAME, dict())
+
+        # (array name, new rows of all the groups) of every group array
+        appended_arrays = []
+
+        if self.get_storage_layout()=='column_major':
+            for i, colname in enumerate(numeric_keys):
+                appended_arrays.append((get_numeric_column_array_name(i), pdf[colname].values))
+        else:
+            appended_arrays.append(('numeric_types', pdf[numeric_keys].values))
+
+        for i, colname in enumerate(missing_keys['datetime_types']):
+            appended_arrays.append((get_missing_key_array_name('datetime_types', i), 
+                                    encode_datetime2int64(pdf[colname])))
+
+        for i, colname in enumerate(missing_keys['str_types']):
+            # new values go at the end, so that the stored codes keep their meaning
+            new_values = set(pdf[colname].dropna().unique()) - set(str_categories[colname])
+            str_categories[colname] = np.concatenate((str_categories[colname], 
+                                                      np.array(sorted(new_values), dtype=object)))
+            appended_arrays.append((get_missing_key_array_name('str_types', i), 
+                                    encode_str2codes(pdf[colname], str_categories[colname])))
+
+        appended_arrays.append((UUID_ARRAY_NAME, pdf[constants.EF_UUID_NAME].values.astype(np.int64)))
+        appended_arrays.append(('orderby_array', orderby_array))
+
+        for array_name, appended_array in appended_arrays:
+            for i in appended_groups:
+                self._append_group_array('/{}/{}'.format(group_names[i], array_name), 
+                                         appended_array[group_borders[i]:group_borders[i + 1]])
+
+        self.f.set_node_attr('/', key=STR_CATEGORIES_ATTR_NAME, value=str_categories)
+
+        old_group_offsets = self.f.get_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME)
+        group_sizes = np.diff(old_group_offsets) + np.diff(group_borders)
+        group_offsets = np.concatenate(([0], np.cumsum(group_sizes))).astype(np.int64)
+
+        self._append_global_orderby_array(old_group_offsets, group_offsets, orderby_array, group_borders)
+
+        dataframe_name = '{}_{}'.format(HMF.constants.DATAFRAME_NAME, 0)
+        self.f.memmap_map['group_sizes'][dataframe_name] = group_sizes
+        self.f.memmap_map['group_items'][dataframe_name] = list(zip(group_names, stride_util(group_offsets, 2, 1, np.int32)))
+        self.f.set_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME, value=group_offsets)
+
+        appended_folds = self._replan_fold_manifests([group_names[i] for i in appended_groups])
+
+        self._save_memmap_map()
+
+        if self.group_cache is not None:
+            self.group_cache.clear()
+
+        return appended_folds
+
+    def _append_group_array(self, array_filepath, appended_array):
+
+        memmap_map_array_pos = self.f.retrieve_memmap_map_pos_array(array_filepath)
+        dtype = np.dtype(memmap_map_array_pos['dtype'])
+        shape = memmap_map_array_pos['shape']
+
+        if dtype.kind in 'iu' and len(appended_array) > 0 and appended_array.max() > np.iinfo(dtype).max:
+
+            # i.e. str codes outgrowing int8 with the new categories. Rare, so the whole 
+            # array is rewritten at the wider dtype
+            dtype = np.promote_types(dtype, appended_array.dtype)
+            array = np.array(self.get_array(array_filepath)).astype(dtype)
+            write_memmap(self._get_array_filepath(array_filepath), dtype, shape, array)
+            memmap_map_array_pos['dtype'] = str(dtype)
+
+        append_memmap_rows(self._get_array_filepath(array_filepath), appended_array.astype(dtype, copy=False))
+        memmap_map_array_pos['shape'] = (shape[0] + len(appended_array),) + tuple(shape[1:])
+
+    def _append_global_orderby_array(self, old_group_offsets, group_offsets, orderby_array, group_borders):
+        """The global orderby array with the appended days at the end of each group. It is 
+        4 bytes a row, the only part of the store that is written whole."""
+
+        array_filepath = '/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME)
+        filepath = self._get_array_filepath(array_filepath)
+        old_global_orderby_array = self.get_array(array_filepath)
+
+        tmp_filepath = filepath + '.tmp'
+        create_memmap(tmp_filepath, np.int32, (group_offsets[-1],))
+
+        for i in range(len(group_offsets) - 1):
+
+            old_group_size = old_group_offsets[i + 1] - old_group_offsets[i]
+
+            write_memmap_rows(tmp_filepath, old_global_orderby_array[old_group_offsets[i]:old_group_offsets[i + 1]], 
+                              group_offsets[i])
+            write_memmap_rows(tmp_filepath, orderby_array[group_borders[i]:group_borders[i + 1]].astype(np.int32), 
+                              group_offsets[i] + old_group_size)
+
+        del old_global_orderby_array
+        os.replace(tmp_filepath, filepath)
+
+        self.f.retrieve_memmap_map_pos_array(array_filepath)['shape'] = (int(group_offsets[-1]),)
+
+    def _replan_fold_manifests(self, appended_group_keys):
+        """Plans every stored fold manifest again and marks, for the groups that were 
+        appended to, the folds that are new or changed. The ordered folds keep their 
+        indices, since new days only add windows at the end, so only those and the last 
+        ones whose test window reached into the new days are marked. Every fold of an 
+        appended group is marked for the unordered schemes."""
+
+        fold_manifests = self._get_node_attr('/', FOLD_MANIFESTS_ATTR_NAME, dict())
+
+        old_fold_manifests = dict()
+
+        for fold_manifest_name, fold_manifest_params in fold_manifests.items():
+
+            fold_manifest_items = {group_key: self.f.get_node_attr('/{}'.format(group_key), 
+                                       key=FOLD_MANIFEST_ITEMS_ATTR_NAME)[fold_manifest_name]
+                                   for group_key in appended_group_keys}
+
+            if (fold_manifest_params['cross_validation_scheme'] in ORDERED_CV_SCHEMES and 
+                    any(elem[1] > 0 for elem in fold_manifest_items.values())):
+                # a copy, the manifest file is rewritten below
+                fold_plan = np.array(self.get_array('/{}'.format(fold_manifest_name)))
+            else:
+                fold_plan = None
+
+            old_fold_manifests[fold_manifest_name] = (fold_manifest_items, fold_plan)
+
+        self.f.set_node_attr('/', key=FOLD_MANIFESTS_ATTR_NAME, value=dict())
+
+        appended_folds = dict()
+
+        for fold_manifest_name, fold_manifest_params in fold_manifests.items():
+
+            self.save_fold_manifest(**fold_manifest_params)
+
+            old_fold_manifest_items, old_fold_plan = old_fold_manifests[fold_manifest_name]
+            group_appended_folds = appended_folds.setdefault(fold_manifest_name, dict())
+
+            for group_key in appended_group_keys:
+
+                old_plan_start, old_n_splits = old_fold_manifest_items[group_key]
+                plan_start, n_splits = self.f.get_node_attr(
+                    '/{}'.format(group_key), key=FOLD_MANIFEST_ITEMS_ATTR_NAME)[fold_manifest_name]
+
+                if old_fold_plan is None or old_n_splits == 0:
+                    changed_folds = np.arange(n_splits)
+                else:
+                    num_kept_folds = min(old_n_splits, n_splits)
+                    # the row and date boundaries, past the group and fold columns
+                    old_fold_rows = old_fold_plan[old_plan_start:old_plan_start + num_kept_folds, 2:]
+                    fold_rows = self.get_array('/{}'.format(fold_manifest_name), 
+                                               idx=slice(plan_start, plan_start + num_kept_folds))[:, 2:]
+                    changed_folds = np.concatenate((np.flatnonzero((old_fold_rows != fold_rows).any(axis=1)), 
+                                                    np.arange(num_kept_folds, n_splits)))
+
+                group_appended_folds[group_key] = [int(elem) for elem in changed_folds]
+
+        return self.mark_appended_folds(appended_folds)
+
+    def get_num_rows(self):
+
+        return int(self.f.get_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME)[-1])
+
+    def mark_appended_folds(self, appended_folds):
+        """Adds the {fold_manifest_name: {group_key: fold indices}} of [ appended_folds ] to 
+        the marks not cleared yet, and returns the marks of those fold manifests."""
+
+        marked_folds = self._get_node_attr('/', APPENDED_FOLDS_ATTR_NAME, dict())
+
+        for fold_manifest_name, group_appended_folds in appended_folds.items():
+
+            group_marked_folds = marked_folds.setdefault(fold_manifest_name, dict())
+
+            for group_key, cv_split_indices in group_appended_folds.items():
+                group_marked_folds[group_key] = sorted(set(group_marked_folds.get(group_key, [])) | 
+                                                       set(cv_split_indices))
+
+        self.f.set_node_attr('/', key=APPENDED_FOLDS_ATTR_NAME, value=marked_folds)
+        self._save_memmap_map()
+
+        return {k: v for k, v in marked_folds.items() if k in appended_folds}
+
+    def get_appended_folds(self, fold_manifest_name):
+        """{group_key: fold indices} marked by append_data for [ fold_manifest_name ], None 
+        if nothing was appended since the manifest was last cleared."""
+
+        return self._get_node_attr('/', APPENDED_FOLDS_ATTR_NAME, dict()).get(fold_manifest_name)
+
+    def clear_appended_folds(self, fold_manifest_name=None):
+        """Clears the marks of [ fold_manifest_name ], of every fold manifest if None."""
+
+        appended_folds = self._get_node_attr('/', APPENDED_FOLDS_ATTR_NAME, dict())
+
+        if fold_manifest_name is None:
+            appended_folds.clear()
+        else:
+            appended_folds.pop(fold_manifest_name, None)
+        self.f.set_node_attr('/', key=APPENDED_FOLDS_ATTR_NAME, value=appended_folds)
+
+        self._save_memmap_map()
+
+    @staticmethod
+    def get_fold_manifest_name(cross_validation_scheme, train_window, test_window, min_train_window, 
+                               gap_window=0, num_folds=None, target_name=None):
+        """The stratified folds of binary_classification depend on [ target_name ] too, so 
+        that a new target after update_setup gets its own manifest."""
+
+        if cross_validation_scheme=='binary_classification':
+            return 'fold_manifest__{}__{}__{}'.format(cross_validation_scheme, num_folds, target_name)
+
+        if cross_validation_scheme in UNORDERED_CV_SCHEMES:
+            return 'fold_manifest__{}__{}'.format(cross_validation_scheme, num_folds)
+
+        return 'fold_manifest__{}__{}_{}_{}_{}'.format(
+            cross_validation_scheme, train_window, test_window, min_train_window, gap_window)
+
+    def has_fold_manifest(self, fold_manifest_name):
+
+        return fold_manifest_name in self._get_node_attr('/', FOLD_MANIFESTS_ATTR_NAME, dict())
+
+    def save_fold_manifest(self, cross_validation_scheme, train_window, test_window, min_train_window, 
+                           gap_window=0, num_folds=None, target_name=None):
+        """Plans the cv folds of all the groups in a single pass over the global orderby 
+        array and stores the plan as one [ /fold_manifest_name ] array (FOLD_PLAN_DTYPE 
+        fields as int64 columns). Each group keeps (plan_start, n_splits) of its folds as 
+        an attribute, so the workers only look up a single row per task.
+
+        For the unordered schemes the stored array instead holds the test fold id of 
+        every row, and plan_start is the first row of the group.
+        """
+
+        fold_manifest_name = self.get_fold_manifest_name(
+            cross_validation_scheme, train_window, test_window, min_train_window, gap_window, num_folds, target_name)
+
+        if self.has_fold_manifest(fold_manifest_name):
+            return fold_manifest_name
+
+        group_names = self.f.get_group_names()
+
+        if cross_validation_scheme in UNORDERED_CV_SCHEMES:
+
+            plan_starts, n_splits = self._save_fold_assignment(
+                fold_manifest_name, cross_validation_scheme, num_folds, target_name)
         
-    def load_data(self, group_key, data_idx):
+        else:
+
+            plan_starts, n_splits = self._save_fold_plan(
+                fold_manifest_name, cross_validation_scheme, train_window, test_window, min_train_window, gap_window)
+
+        for group_key, plan_start, group_n_splits in zip(group_names, plan_starts, n_splits):
+
+            fold_manifest_items = self._get_node_attr('/{}'.format(group_key), FOLD_MANIFEST_ITEMS_ATTR_NAME, dict())
+            fold_manifest_items[fold_manifest_name] = (int(plan_start), int(group_n_splits))
+            self.f.set_node_attr('/{}'.format(group_key), key=FOLD_MANIFEST_ITEMS_ATTR_NAME, value=fold_manifest_items)
+
+        fold_manifests = self._get_node_attr('/', FOLD_MANIFESTS_ATTR_NAME, dict())
+        fold_manifests[fold_manifest_name] = {
+            'cross_validation_scheme': cross_validation_scheme,
+            'train_window': train_window,
+            'test_window': test_window,
+            'min_train_window': min_train_window,
+            'gap_window': gap_window,
+            'num_folds': num_folds,
+            'target_name': target_name}
+        self.f.set_node_attr('/', key=FOLD_MANIFESTS_ATTR_NAME, value=fold_manifests)
+
+        self._save_memmap_map()
+
+        return fold_manifest_name
+
+    def _save_fold_plan(self, fold_manifest_name, cross_validation_scheme, train_window, test_window, 
+                        min_train_window, gap_window):
+
+        fold_plan = plan_splits(
+            cross_validation_scheme, 
+            self.f.get_array('/{}'.format(GLOBAL_ORDERBY_ARRAY_NAME)), 
+            self.f.get_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME),
+            train_window, 
+            test_window,
+            min_train_window,
+            gap_window)
+
+        # memmap cannot hold an empty array
+        if len(fold_plan)>0:
+            self.f.set_array('/{}'.format(fold_manifest_name), 
+                             fold_plan.view(np.int64).reshape(len(fold_plan), -1))
+
+        n_splits = np.bincount(fold_plan['group'], minlength=len(self.f.get_group_names()))
+        plan_starts = np.concatenate(([0], np.cumsum(n_splits)[:-1]))
+
+        return plan_starts, n_splits
+
+    def _save_fold_assignment(self, fold_manifest_name, cross_validation_scheme, num_folds, target_name):
+
+        group_offsets = self.f.get_node_attr('/', key=GROUP_OFFSETS_ATTR_NAME)
+
+        if cross_validation_scheme=='binary_classification':
+            y = np.concatenate([self._get_group_column(group_key, target_name) 
+                                for group_key in self.f.get_group_names()])
+        else:
+            y = None
+
+        fold_assignment, n_splits = assign_folds(cross_validation_scheme, group_offsets, num_folds, y)
+
+        self.f.set_array('/{}'.format(fold_manifest_name), fold_assignment)
+
+        return group_offsets[:-1], n_splits
+
+    def _get_group_column(self, group_key, colname):
+
+        numeric_keys = self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
+        col_position = numeric_keys.index(colname)
+
+        if self.get_storage_layout()=='column_major':
+            return self.get_numeric_columns(group_key, col_idx=[col_position])[colname]
+
+        return self.get_array('/{}/numeric_types'.format(group_key))[:, col_position]
+
+    def _get_group_size(self, group_key):
+
+        if self.get_storage_layout()=='column_major':
+            array_name = get_numeric_column_array_name(0)
+        else:
+            array_name = 'numeric_types'
+
+        return self.f.retrieve_memmap_map_pos_array('/{}/{}'.format(group_key, array_name))['shape'][0]
+
+    def get_storage_layout(self):
+
+        return self._get_node_attr('/', STORAGE_LAYOUT_ATTR_NAME, 'row_major')
+
+    def get_n_splits(self, group_key, fold_manifest_name):
+
+        plan_start, n_splits = self.f.get_node_attr(
+            '/{}'.format(group_key), key=FOLD_MANIFEST_ITEMS_ATTR_NAME)[fold_manifest_name]
+
+        return n_splits
+
+    def get_fold(self, group_key, fold_manifest_name, cv_split_index):
+        """Returns the (train, test, date_range) of the [ cv_split_index ]th fold of the
+        group from the stored manifest. train and test are slices of the group rows for the 
+        ordered schemes, and row index arrays (with an empty date_range) otherwise."""
+
+        plan_start, n_splits = self.f.get_node_attr(
+            '/{}'.format(group_key), key=FOLD_MANIFEST_ITEMS_ATTR_NAME)[fold_manifest_name]
+
+        if not 0 <= cv_split_index < n_splits:
+            raise IndexError('[ cv_split_index ] {} is out of range for group "{}" with {} '
+                             'splits.'.format(cv_split_index, group_key, n_splits))
+
+        cross_validation_scheme = self.f.get_node_attr(
+            '/', key=FOLD_MANIFESTS_ATTR_NAME)[fold_manifest_name]['cross_validation_scheme']
+
+        if cross_validation_scheme in UNORDERED_CV_SCHEMES:
+
+            group_size = self._get_group_size(group_key)
+            fold_assignment = self.get_array('/{}'.format(fold_manifest_name), 
+                                             idx=slice(plan_start, plan_start + group_size))
+            is_test = fold_assignment==cv_split_index
+
+            return np.flatnonzero(~is_test), np.flatnonzero(is_test), np.array([], dtype=np.int64)
+
+        fold_row = self.f.get_array('/{}'.format(fold_manifest_name), idx=plan_start + cv_split_index)
+        fold_row = fold_row.view(FOLD_PLAN_DTYPE)[0]
+
+        return (slice(int(fold_row['train_start']), int(fold_row['train_stop'])), 
+                slice(int(fold_row['test_start']), int(fold_row['test_stop'])), 
+                np.arange(fold_row['date_start'], fold_row['date_stop']))
+
+    def get_fold_sizes(self, group_key, fold_manifest_name):
+        """The (train sizes, test sizes) of all the folds of the group, read from the
+        stored manifest at once rather than fold by fold."""
+
+        plan_start, n_splits = self.f.get_node_attr(
+            '/{}'.format(group_key), key=FOLD_MANIFEST_ITEMS_ATTR_NAME)[fold_manifest_name]
+
+        cross_validation_scheme = self.f.get_node_attr(
+            '/', key=FOLD_MANIFESTS_ATTR_NAME)[fold_manifest_name]['cross_validation_scheme']
+
+        if cross_validation_scheme in UNORDERED_CV_SCHEMES:
+
+            group_size = self._get_group_size(group_key)
+            fold_assignment = self.get_array('/{}'.format(fold_manifest_name),
+                                             idx=slice(plan_start, plan_start + group_size))
+            test_sizes = np.bincount(fold_assignment, minlength=n_splits)[:n_splits]
+
+            return group_size - test_sizes, test_sizes
+
+        fold_rows = self.f.get_array('/{}'.format(fold_manifest_name), idx=slice(plan_start, plan_start + n_splits))
+        fold_rows = np.ascontiguousarray(fold_rows).view(FOLD_PLAN_DTYPE).ravel()
+
+        return (fold_rows['train_stop'] - fold_rows['train_start'],
+                fold_rows['test_stop'] - fold_rows['test_start'])
+
+    def _get_node_attr(self, attr_dirpath, key, default=None):
+
+        try:
+            return self.f.get_node_attr(attr_dirpath, key=key)
+        except KeyError:
+            return default
+
+    def _save_memmap_map(self):
+        """HMF only writes the memmap_map at close. Anything added afterwards must be 
+        saved explicitly so that copies of the store (i.e. on remote nodes) see it."""
+
+        memmap_map_filepath = os.path.join(self.dirpath, constants.HMF_MEMMAP_MAP_NAME)
+        HMF.hmf.fail_safe_save_obj(self.f.memmap_map, memmap_map_filepath)
         
-        missing_keys = self.f.get_node_attr('/{}'.format(group_key), key='missing_keys')
-        data_colnames = copy.copy(self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys'))
-        data_arrays = [self.f.get_array('/{}/numeric_types'.format(group_key), idx=data_idx)]
+    def get_array(self, array_filepath, idx=None, col_idx=None):
+        """Same as HMF get_array, except that the memmap is opened copy-on-write. 
+        A slice [ idx ] therefore returns a zero-copy view that the task graph methods
+        can still modify in place without touching the files on disk.
+
+        If [ col_idx ] (sorted column positions) is given, only those columns of the 2d 
+        array are read. Contiguous columns with slice rows still give a view.
+        """
+        if col_idx is not None:
+            idx = get_2d_idx(idx, col_idx)
+
+        memmap_map_array_pos = self.f.retrieve_memmap_map_pos_array(array_filepath)
+
+        dtype = memmap_map_array_pos['dtype']
+        shape = memmap_map_array_pos['shape']
+        filepath = os.path.join(
+            self.f.memmap_map['dirpath'],
+            memmap_map_array_pos['dirpath'])
+
+        return read_memmap(filepath, dtype, shape, idx, mode='c')
         
-        for colname in missing_keys['datetime_types']:
-            tmp_array = self.f.get_array('/{}/{}'.format(group_key, colname))
-            data_arrays.append(tmp_array.reshape(-1, 1))
-            data_colnames.append(colname)
-            
-        data_array = np.hstack(data_arrays)
+    def get_group_array(self, array_filepath, idx=None, col_idx=None, decoder=None, cache_stats=None):
+        """get_array followed by the optional [ decoder ], going through the group cache 
+        when it is on. A cached array holds the whole group (at [ col_idx ]), already 
+        decoded and read-only, so that [ idx ] is read from memory. The rows returned are 
+        a copy, which the task graph methods are free to modify in place.
+        """
+        group_cache = self.get_group_cache()
+
+        if group_cache is None:
+
+            array = self.get_array(array_filepath, idx=idx, col_idx=col_idx)
+            self._count_read(array_filepath, array)
+
+            return array if decoder is None else decoder(array)
+
+        def load():
+
+            array = np.array(self.get_array(array_filepath, col_idx=col_idx))
+            array.flags.writeable = False
+            self._count_read(array_filepath, array)
+
+            return array if decoder is None else decoder(array)
+
+        cache_key = (array_filepath, None if col_idx is None else tuple(col_idx))
+        array = group_cache.get(cache_key, load, cache_stats)
+
+        if idx is None or isinstance(idx, slice):
+            return array[idx if idx is not None else slice(None)].copy()
+
+        # fancy indexing copies already
+        return array[idx]
+
+    def get_numeric_columns(self, group_key, idx=None, col_idx=None, cache_stats=None):
+        """Column-major layout only. Returns a dict of colname to the 1d copy-on-write 
+        array of each numeric column at positions [ col_idx ] (all of them by default), 
+        read at rows [ idx ]. Each column is contiguous on disk, so slice rows are 
+        zero-copy views and pd.DataFrame(..., copy=False) does not copy them either.
+        """
+        numeric_keys = self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
+
+        if col_idx is None:
+            col_idx = range(len(numeric_keys))
+
+        return {numeric_keys[i]: self.get_group_array(
+                    '/{}/{}'.format(group_key, get_numeric_column_array_name(i)), idx=idx, cache_stats=cache_stats)
+                for i in col_idx}
+
+    def get_uuid_column(self, group_key, idx=None, cache_stats=None):
+        """The int64 uuids of the group rows at [ idx ], which are kept out of the float32 
+        numeric block and put back next to it on read."""
+
+        return self.get_group_array('/{}/{}'.format(group_key, UUID_ARRAY_NAME), idx=idx, cache_stats=cache_stats)
+
+    def get_missing_key_columns(self, group_key, idx=None, cache_stats=None):
+        """Returns a dict of colname to the datetime and str columns of the group that the 
+        pipeline needs (the [ missing_keys ] attribute), read at rows [ idx ]. Datetimes 
+        are a zero-copy datetime64[ns] view of the stored int64, and strings come back as 
+        pd.Categorical built from the stored codes.
+        """
+        missing_keys = self.f.get_node_attr('/{}'.format(group_key), key='missing_keys')
+
+        data_dict = dict()
+
+        for i, colname in enumerate(missing_keys['datetime_types']):
+            data_dict[colname] = self.get_group_array(
+                '/{}/{}'.format(group_key, get_missing_key_array_name('datetime_types', i)), idx=idx, 
+                decoder=view_int64_as_datetime, cache_stats=cache_stats)
+
+        if len(missing_keys['str_types'])>0:
+            str_categories = self.f.get_node_attr('/', key=STR_CATEGORIES_ATTR_NAME)
+
+        for i, colname in enumerate(missing_keys['str_types']):
+            data_dict[colname] = self.get_group_array(
+                '/{}/{}'.format(group_key, get_missing_key_array_name('str_types', i)), idx=idx, 
+                decoder=functools.partial(decode_codes2categorical, categories=str_categories[colname]), 
+                cache_stats=cache_stats)
+
+        return data_dict
+
+    def load_data(self, group_key, data_idx, col_idx=None, cache_stats=None):
+        """The [ data_idx ] rows of the group as a DataFrame of its numeric columns at 
+        positions [ col_idx ] (all of them by default), followed by the uuid and its 
+        datetime and str columns (see get_missing_key_columns). Group cache hits and 
+        misses are counted into the optional [ cache_stats ] dict."""
+
+        missing_key_columns = {constants.EF_UUID_NAME: self.get_uuid_column(group_key, idx=data_idx, cache_stats=cache_stats)}
+        missing_key_columns.update(self.get_missing_key_columns(group_key, idx=data_idx, cache_stats=cache_stats))
+
+        if self.get_storage_layout()=='column_major':
+
+            # one contiguous array per column, which the dataframe takes without copying
+            data_dict = self.get_numeric_columns(group_key, idx=data_idx, col_idx=col_idx, cache_stats=cache_stats)
+            data_dict.update(missing_key_columns)
+
+            return pd.DataFrame(data_dict, copy=False)
+
+        numeric_keys = self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
+
+        if col_idx is None:
+            data_colnames = numeric_keys
+        else:
+            data_colnames = [numeric_keys[i] for i in col_idx]
+
+        data_array = self.get_group_array('/{}/numeric_types'.format(group_key), idx=data_idx, 
+                                          col_idx=col_idx, cache_stats=cache_stats)
         pdf = pd.DataFrame(data_array, columns=data_colnames)
-        
-        for i in range(len(missing_keys['datetime_types'])):
-            pdf.iloc[:, i-1] = pd.to_datetime(pdf.iloc[:, i-1])
-            
-        for colname in missing_keys['str_types']:
-            tmp_array = self.f.get_array('/{}/{}'.format(group_key, colname))
-            tmp_array = tmp_array.astype(str)
-            pdf[colname] = tmp_array
-            
+
+        for colname, column in missing_key_columns.items():
+            pdf[colname] = column
+
         return pdf
 
+    def load_table(self, group_key, data_idx, col_idx=None, cache_stats=None):
+        """The same columns as load_data, as a pyarrow.Table. Arrow wraps contiguous arrays 
+        without copying, which covers the numeric columns of the column-major layout with 
+        slice folds and the datetime columns (timestamp[ns]). Str columns become dictionary 
+        arrays over the stored codes, so no object strings are built. The strided columns 
+        of the row-major layout are copied."""
+
+        missing_key_columns = {constants.EF_UUID_NAME: self.get_uuid_column(group_key, idx=data_idx, cache_stats=cache_stats)}
+        missing_key_columns.update(self.get_missing_key_columns(group_key, idx=data_idx, cache_stats=cache_stats))
+
+        if self.get_storage_layout()=='column_major':
+
+            data_dict = self.get_numeric_columns(group_key, idx=data_idx, col_idx=col_idx, cache_stats=cache_stats)
+
+        else:
+
+            numeric_keys = self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
+
+            if col_idx is None:
+                col_idx = range(len(numeric_keys))
+
+            data_array = self.get_group_array('/{}/numeric_types'.format(group_key), idx=data_idx, 
+                                              col_idx=col_idx, cache_stats=cache_stats)
+            data_dict = {numeric_keys[i]: data_array[:, j] for j, i in enumerate(col_idx)}
+
+        data_dict.update(missing_key_columns)
+
+        return pa.table({k: pa.array(v) for k, v in data_dict.items()})
+
+    def load_arrays(self, group_key, data_idx, feature_names, target_name, extra_keys, cache_stats=None):
+        """The [ data_idx ] rows of the group as an ArrayData, for the "array" pipeline mode.
+        On the row-major layout with slice folds, y, uuid and X (if the feature columns are
+        stored next to each other in the same order) are views on the memmap. The
+        column-major layout stacks the feature columns, so X is a copy there. The
+        [ extra_keys ] columns are packed into the structured extra array."""
+
+        numeric_keys = self.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
+        numeric_positions = {elem: i for i, elem in enumerate(numeric_keys)}
+        feature_positions = [numeric_positions[elem] for elem in feature_names]
+
+        if self.get_storage_layout()=='column_major':
+
+            def get_numeric_column(colname):
+                return self.get_group_array(
+                    '/{}/{}'.format(group_key, get_numeric_column_array_name(numeric_positions[colname])),
+                    idx=data_idx, cache_stats=cache_stats)
+
+            X = np.column_stack([get_numeric_column(elem) for elem in feature_names])
+
+        else:
+
+            numeric_array_filepath = '/{}/numeric_types'.format(group_key)
+
+            def get_numeric_column(colname):
+                return self.get_group_array(numeric_array_filepath, idx=data_idx,
+                                            col_idx=[numeric_positions[colname]], cache_stats=cache_stats)[:, 0]
+
+            # get_2d_idx takes sorted positions, the features are put back in order after
+            col_idx = sorted(feature_positions)
+            X = self.get_group_array(numeric_array_filepath, idx=data_idx, col_idx=col_idx, cache_stats=cache_stats)
+
+            if col_idx != feature_positions:
+                X = X[:, [col_idx.index(elem) for elem in feature_positions]]
+
+        missing_key_columns = self.get_missing_key_columns(group_key, idx=data_idx, cache_stats=cache_stats)
+        extra_columns = {elem: missing_key_columns[elem] if elem in missing_key_columns else get_numeric_column(elem)
+                         for elem in extra_keys}
+
+        return ArrayData(
+            X=X,
+            y=get_numeric_column(target_name),
+            uuid=self.get_uuid_column(group_key, idx=data_idx, cache_stats=cache_stats),
+            extra=make_extra_array(extra_columns, len(X)))
+
 
 
 
@@ -1,4 +1,13 @@
+import os
+import shutil
 
+from evaluation_framework.evaluation_engine_core.data_loader import DataLoader
+from evaluation_framework.evaluation_engine_core.store_cache import is_verified_store
+from evaluation_framework.evaluation_engine_core.store_cache import commit_store
+from evaluation_framework.utils.s3_utils import s3_upload_zip_dir
+from evaluation_framework.utils.s3_utils import s3_download_object
+from evaluation_framework.utils.s3_utils import s3_object_exists
+from evaluation_framework.utils.zip_utils import unzip_dir
 
 
 def upload_local_data(task_manager):
@@ -6,6 +15,11 @@ def upload_local_data(task_manager):
     memmap_root_dirpath = os.path.join(os.getcwd(), task_manager.memmap_root_dirpath)
     s3_url = task_manager.S3_path
     object_name = task_manager.memmap_root_S3_object_name + '.zip'
+
+    # a cached store is content addressed, the same object name holds the same store
+    if task_manager.store_key is not None and s3_object_exists(s3_url, object_name):
+        return
+
     s3_upload_zip_dir(memmap_root_dirpath, s3_url, object_name)
 
 def download_local_data(task_manager):
@@ -15,17 +29,30 @@ def download_local_data(task_manager):
     4. graph will just use the memmap dirname to read it off from the "current pos"
 
     """
-    s3_download_object(os.getcwd(), task_manager.S3_path, task_manager.memmap_root_S3_object_name + '.zip')
+    memmap_root_dirpath = os.path.join(os.getcwd(), task_manager.memmap_root_dirname)
+
+    # a node that holds a verified copy of a cached store from an earlier evaluation 
+    # skips the download
+    if task_manager.store_key is None or not is_verified_store(memmap_root_dirpath, task_manager.store_key):
+
+        s3_download_object(os.getcwd(), task_manager.S3_path, task_manager.memmap_root_S3_object_name + '.zip')
+
+        zipped_filepath = os.path.join(os.getcwd(), task_manager.memmap_root_S3_object_name + '.zip')
+
+        if task_manager.store_key is None:
+            unzip_dir(zipped_filepath, task_manager.memmap_root_dirname)
+        else:
+            build_dirpath = unzip_dir(zipped_filepath, task_manager.memmap_root_S3_object_name + '__' + task_manager.job_uuid)
+
+            if not is_verified_store(build_dirpath, task_manager.store_key):
+                raise ValueError('The downloaded store "{}" is incomplete.'.format(task_manager.memmap_root_S3_object_name))
+
+            commit_store(build_dirpath, memmap_root_dirpath, task_manager.store_key)
 
-    zipped_filepath = os.path.join(os.getcwd(), task_manager.memmap_root_S3_object_name + '.zip')
-    unzip_dir(zipped_filepath, task_manager.memmap_root_dirname)
+        os.remove(zipped_filepath)
 
-    # update memmap_map with new root_dir
-    updated_memmap_map_root_dirpath = os.path.join(os.getcwd(), task_manager.memmap_root_dirname)
-    memmap_map_filepath = os.path.join(updated_memmap_map_root_dirpath, constants.HMF_MEMMAP_MAP_NAME)
-    memmap_map = load_obj(memmap_map_filepath)
-    memmap_map['dirpath'] = updated_memmap_map_root_dirpath
-    save_obj(memmap_map, memmap_map_filepath)
+        # opening the store points its memmap_map at the new root dir
+        DataLoader(memmap_root_dirpath)
 
     if task_manager.return_predictions:
 
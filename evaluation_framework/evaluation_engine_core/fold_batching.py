@@ -0,0 +1,36 @@
+import numpy as np
+
+
+# a batch should run about this long, so the scheduler overhead of its task (a few ms)
+# is negligible next to it
+TARGET_FOLD_BATCH_SECONDS = 1.0
+# but every worker thread still gets this many batches, so the last ones do not leave
+# most of the cluster idle
+MIN_BATCHES_PER_THREAD = 4
+
+
+def get_fold_batch_size(fold_duration, num_folds, num_threads):
+    """Number of folds per task for [ num_folds ] folds taking [ fold_duration ] seconds
+    each on [ num_threads ] worker threads."""
+
+    batch_size = int(TARGET_FOLD_BATCH_SECONDS / max(fold_duration, 1e-6))
+    max_batch_size = num_folds // (num_threads * MIN_BATCHES_PER_THREAD)
+
+    return max(1, min(batch_size, max_batch_size))
+
+
+def get_fold_batches(fold_keys, batch_size):
+    """Chunks the (group_key, cv_split_index) [ fold_keys ] into batches of [ batch_size ].
+    The folds are kept in their order, so the consecutive folds of a group share a batch
+    and read the same group arrays, and the small groups are packed together."""
+
+    return [fold_keys[i:i + batch_size] for i in range(0, len(fold_keys), batch_size)]
+
+
+def get_mean_fold_duration(fold_results):
+    """Mean of the durations of the task_graph.run [ fold_results ] rows, None without any."""
+
+    if len(fold_results)==0:
+        return None
+
+    return float(np.mean([elem[6] for elem in fold_results]))
@@ -0,0 +1,66 @@
+import heapq
+
+import numpy as np
+
+
+def get_fold_work(train_sizes, test_sizes, num_features):
+    """Work units of folds, the fit scaling with the train rows times the features and
+    the predict with the test rows times the features."""
+
+    return (np.asarray(train_sizes, dtype=np.float64) + np.asarray(test_sizes, dtype=np.float64)) * (num_features + 1)
+
+
+def get_fold_costs(fold_work, fold_durations):
+    """Estimated seconds of the folds of [ fold_work ] ({fold key: work units}).
+
+    The folds in [ fold_durations ] ({fold key: seconds}, recorded by earlier runs) cost
+    what they took. The others cost their work times the seconds per work unit of the
+    recorded folds. Without any recorded fold the costs stay in work units, which still
+    orders the folds, and the second value returned is False."""
+
+    recorded_keys = [k for k in fold_work if k in fold_durations]
+    recorded_work = sum(fold_work[k] for k in recorded_keys)
+
+    if len(recorded_keys)==0 or recorded_work==0:
+        return dict(fold_work), False
+
+    seconds_per_work = sum(fold_durations[k] for k in recorded_keys) / recorded_work
+
+    return {k: fold_durations[k] if k in fold_durations else v * seconds_per_work
+            for k, v in fold_work.items()}, True
+
+
+def get_largest_first_schedule(task_costs, num_threads):
+    """Largest-first (LPT) schedule of tasks of [ task_costs ] on [ num_threads ] worker
+    threads: the costliest task starts first, each on the thread that frees up first.
+
+    Returns the task positions in start order and the makespan of that schedule."""
+
+    order = sorted(range(len(task_costs)), key=lambda i: task_costs[i], reverse=True)
+
+    thread_ends = [0.0] * max(num_threads, 1)
+
+    for i in order:
+        heapq.heapreplace(thread_ends, thread_ends[0] + task_costs[i])
+
+    return order, max(thread_ends)
+
+
+def get_group_affinity(group_sizes, worker_addresses):
+    """Maps each group of [ group_sizes ] ({group_key: rows}) to one of the
+    [ worker_addresses ], largest group first onto the worker with the fewest rows so
+    far, so that every worker gets a shard of groups of about the same size. The same
+    groups and workers always give the same mapping."""
+
+    worker_addresses = sorted(worker_addresses)
+    worker_rows = [(0, i) for i in range(len(worker_addresses))]
+
+    group_affinity = dict()
+
+    for group_key in sorted(group_sizes, key=lambda k: (-group_sizes[k], str(k))):
+
+        rows, i = heapq.heappop(worker_rows)
+        group_affinity[group_key] = worker_addresses[i]
+        heapq.heappush(worker_rows, (rows + group_sizes[group_key], i))
+
+    return group_affinity
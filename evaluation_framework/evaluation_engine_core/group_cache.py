@@ -0,0 +1,67 @@
+from collections import OrderedDict
+import threading
+
+
+class GroupCache():
+    """
+    Thread safe LRU cache of decoded group arrays, bounded by [ max_bytes ]. It lives
+    on the data loader held by each worker, so the consecutive folds of a group only
+    need to slice arrays that were already read and decoded by an earlier fold.
+
+    Anything stored must expose [ nbytes ] (numpy arrays, pd.Categorical).
+    """
+
+    def __init__(self, max_bytes):
+
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+
+    def get(self, key, load, cache_stats=None):
+        """Returns the value under [ key ], calling [ load ] on a miss. [ cache_stats ]
+        is an optional dict whose "hits" and "misses" counters are incremented as well."""
+
+        with self._lock:
+
+            if key in self.entries:
+
+                self.entries.move_to_end(key)
+                self._count('hits', cache_stats)
+
+                return self.entries[key]
+
+        # loaded outside the lock so that other groups are not held up
+        value = load()
+
+        with self._lock:
+
+            self._count('misses', cache_stats)
+
+            if key not in self.entries and value.nbytes <= self.max_bytes:
+
+                self.entries[key] = value
+                self.nbytes += value.nbytes
+
+                while self.nbytes > self.max_bytes:
+                    _, evicted_value = self.entries.popitem(last=False)
+                    self.nbytes -= evicted_value.nbytes
+
+        return value
+
+    def clear(self):
+
+        with self._lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def _count(self, counter_name, cache_stats):
+
+        setattr(self, counter_name, getattr(self, counter_name) + 1)
+
+        if cache_stats is not None:
+            cache_stats[counter_name] = cache_stats.get(counter_name, 0) + 1
@@ -9,7 +9,9 @@ class DaskClient():
         self.multithreaded = multithreaded
         self.yarn_cluster = yarn_cluster
         
-        self.futures = []
+        # {future.key: future}, in submission order. The key, unlike id(), is not reused
+        # by a later future once a released one is gone
+        self.futures = dict()
     
     def start_dask_client(self, dask_client=None,
                           local_client_n_workers=None, local_client_threads_per_worker=None,
@@ -23,7 +25,16 @@ class DaskClient():
             self.dask_client = dask_client
             return
         
-        if not self.multithreaded:
+        if self.yarn_cluster:
+            # the local and the yarn cluster run the tasks side by side
+            self.dask_client = DualClientFuture(
+                local_client_n_workers=local_client_n_workers, 
+                local_client_threads_per_worker=local_client_threads_per_worker, 
+                yarn_client_n_workers=yarn_client_n_workers, 
+                yarn_client_worker_vcores=yarn_client_worker_vcores, 
+                yarn_client_worker_memory=yarn_client_worker_memory)
+
+        elif not self.multithreaded:
             self.dask_client = ClientFuture(
                 local_client_n_workers=local_client_n_workers, 
                 local_client_threads_per_worker=local_client_threads_per_worker, 
@@ -37,11 +48,8 @@ class DaskClient():
         if self.multithreaded:
             pass
         else:
-            if self.yarn_cluster:
-                pass
-            else:
-                scattered_args = self.dask_client.scatter(*args)
-                return scattered_args
+            scattered_args = self.dask_client.scatter(*args)
+            return scattered_args
             
     def submit(self, func, *args, **kwargs):
         
@@ -51,14 +59,77 @@ class DaskClient():
         
         else:
             future = self.dask_client.submit(func, *args, **kwargs)
-            self.futures.append(future)
+            self.futures[future.key] = future
+
+            return future
             
+    def wait(self, futures=None):
+        """Blocks until every submitted task (or every one of [ futures ]) is done, failed 
+        ones included."""
+        
+        if self.multithreaded:
+            pass
+        else:
+            self.dask_client.wait(list(self.futures.values()) if futures is None else futures)
+
+    def wait_first(self, futures):
+        """Blocks until the first of [ futures ] is done."""
+
+        if self.multithreaded:
+            pass
+        else:
+            next(iter(self.dask_client.as_completed(futures)))
+
     def get_results(self):
         
         if self.multithreaded:
             pass
         else:
-            return [list(elem.result()) for elem in self.futures]
+            results = []
+
+            for elem in self.futures.values():
+
+                result = elem.result()
+
+                # a TaskGraph.run_batch task returns the list of its fold results
+                if isinstance(result, list):
+                    results.extend(list(_elem) for _elem in result)
+                else:
+                    results.append(list(result))
+
+            return results
+
+    def iter_completed(self):
+        """Yields the submitted futures in the order they finish."""
+        
+        if self.multithreaded:
+            pass
+        else:
+            yield from self.dask_client.as_completed(list(self.futures.values()))
+
+    def release(self, future):
+        """Drops [ future ], whose result the scheduler can then forget."""
+
+        self.futures.pop(future.key, None)
+        future.release()
+
+    def get_num_threads(self):
+        
+        return sum(self.dask_client.nthreads().values())
+
+    def get_worker_addresses(self):
+
+        return sorted(self.dask_client.nthreads())
+
+    def run(self, func, *args):
+        """Runs [ func ] on every worker, returns {worker address: result}."""
+
+        return self.dask_client.run(func, *args)
+
+    def submit_per_node(self, func, *args, **kwargs):
+        """Runs [ func ] once on every node of the yarn cluster."""
+
+        return self.dask_client.submit_per_node(func, *args, **kwargs)
         
     def get_dashboard_link(self):
         
@@ -1,7 +1,10 @@
-from dask.distributed import Client, LocalCluster
+from dask.distributed import Client, LocalCluster, Future
+from dask.distributed import wait
+from dask.distributed import as_completed
 from dask_yarn import YarnCluster
 from evaluation_framework.utils.decorator_utils import yarn_directory_normalizer
 
+import functools
 import threading
 import queue
 import socket
@@ -55,37 +58,68 @@ class MultiThreadTaskQueue(queue.Queue):
         self.results = []
 
 
+def get_least_loaded_client(in_flight, throughputs):
+    """Position of the client that would finish its [ in_flight ] tasks plus one more 
+    first, at its [ throughputs ] (tasks per second, or any measure proportional to it)."""
+
+    return min(range(len(in_flight)), key=lambda i: (in_flight[i] + 1) / throughputs[i])
+
+
 class DualClientFuture():
+    """Runs the tasks on the local and the YARN clusters at once. Each task goes to the 
+    cluster that would get through its queue soonest at the throughput it has shown so 
+    far (see get_throughputs), so the faster cluster gets more of them and both stay 
+    busy to the end. [ local_cluster ] and [ yarn_cluster ] can be given instead, e.g. two 
+    LocalClusters to stand in for the hybrid setup."""
     
-    def __init__(self, local_client_n_workers, local_client_threads_per_worker,
-                 yarn_client_n_workers, yarn_client_worker_vcores, yarn_client_worker_memory, verbose=False):
-        
-        host_ip = get_host_ip_address()
+    def __init__(self, local_client_n_workers=None, local_client_threads_per_worker=None,
+                 yarn_client_n_workers=None, yarn_client_worker_vcores=None, yarn_client_worker_memory=None, 
+                 verbose=False, local_cluster=None, yarn_cluster=None):
         
-        self.local_cluster = LocalCluster(
-            n_workers=local_client_n_workers,
-            threads_per_worker=local_client_threads_per_worker, 
-            processes=True, 
-            host=host_ip)
+        if local_cluster is None:
+
+            host_ip = get_host_ip_address()
+            
+            local_cluster = LocalCluster(
+                n_workers=local_client_n_workers,
+                threads_per_worker=local_client_threads_per_worker, 
+                processes=True, 
+                host=host_ip)
+
+        self.local_cluster = local_cluster
         self.local_client = Client(address=self.local_cluster, timeout='2s') 
         
-        self.yarn_cluster = YarnCluster(
-            n_workers=yarn_client_n_workers, 
-            worker_vcores=yarn_client_worker_vcores, 
-            worker_memory=yarn_client_worker_memory,
-            environment="python:///usr/bin/python3")
+        if yarn_cluster is None:
+
+            yarn_cluster = YarnCluster(
+                n_workers=yarn_client_n_workers, 
+                worker_vcores=yarn_client_worker_vcores, 
+                worker_memory=yarn_client_worker_memory,
+                environment="python:///usr/bin/python3")
+
+        self.yarn_cluster = yarn_cluster
         self.yarn_client = Client(self.yarn_cluster)
 
-        self.wait_container_resource_alloc()
+        if isinstance(self.yarn_cluster, YarnCluster):
+            self.wait_container_resource_alloc()
         
         self.local_client_n_workers = local_client_n_workers
         self.yarn_client_n_workers = yarn_client_n_workers
-        
-        self.task_counter = -1
-        self.yarn_client_n_workers = yarn_client_n_workers
 
         self.verbose = verbose
 
+        # the yarn copies of the scattered data, {key: future}
+        self.yarn_scattered = dict()
+
+        self.client_lock = threading.Lock()
+        self.in_flight = [0, 0]
+        self.completed = [0, 0]
+        # seconds each cluster had tasks in flight, and since when it has them now
+        self.busy_time = [0.0, 0.0]
+        self.busy_since = [None, None]
+
+        self._update_nthreads()
+
     def wait_container_resource_alloc(self):
 
         while True:
@@ -99,48 +133,140 @@ class DualClientFuture():
             time.sleep(1.0)
 
     def submit(self, func, *args, **kwargs):
+        """Submits to the client picked by get_least_loaded_client and returns the future 
+        right away. Tasks restricted to some [ workers ] go to the cluster of these."""
+
+        with self.client_lock:
+            client_idx = self._get_client_idx(kwargs.get('workers'))
+            self._add_in_flight(client_idx)
 
         if self.verbose==True:
-            print('total n workers: {}'.format(self.local_client_n_workers + self.yarn_client_n_workers))
+            print('in flight: {}, throughputs: {}, running on {}'.format(
+                self.in_flight, self.get_throughputs(), ['local', 'remote'][client_idx]))
+
+        try:
 
-        self.task_counter += 1
+            if client_idx==0:
+                future = self.local_client.submit(func, *args, **kwargs)
 
-        remainder = self.task_counter % (self.local_client_n_workers + self.yarn_client_n_workers)
+            else:
+                args = [self._get_yarn_future(elem) for elem in args]
+                kwargs = {k: self._get_yarn_future(v) for k, v in kwargs.items()}
 
+                func = yarn_directory_normalizer(func)
+                future = self.yarn_client.submit(func, None, *args, **kwargs)
 
+        except:
+            self._record_done(client_idx)
+            raise
 
+        future.add_done_callback(functools.partial(self._record_done, client_idx))
         
-        # if remainder <= (self.local_client_n_workers-1):
+        return future
 
-        #     if self.verbose==True:
-        #         print('remainder: {}, n_local_worker: {}, running on local'.format(remainder, self.local_client_n_workers))
+    def scatter(self, *args):
+        """Broadcasts [ args ] to the workers of both clusters, under the same keys. Returns 
+        the local futures, submit hands their yarn copies to the yarn tasks."""
 
-        #     future = self.local_client.submit(func, *args, **kwargs)
-        # else:
+        scattered_args = self.local_client.scatter(args, broadcast=True)
+        self.yarn_scattered.update(self.yarn_client.scatter(
+            {elem.key: arg for elem, arg in zip(scattered_args, args)}, broadcast=True))
 
-        #     if self.verbose==True:
-        #         print('remainder: {}, n_local_worker: {}, running on remote'.format(remainder, self.local_client_n_workers))
+        return scattered_args
 
-        #     func = yarn_directory_normalizer(func)
-        #     future = self.yarn_client.submit(func, None, *args, **kwargs)
+    def wait(self, futures):
 
+        for _ in self.as_completed(futures):
+            pass
 
-        if remainder <= (self.yarn_client_n_workers-1):
+    def as_completed(self, futures):
+        """Yields [ futures ] in the order they finish. dask's own as_completed and wait 
+        follow the futures on the loop of a single client, which cannot mix the two."""
 
-            if self.verbose==True:
-                print('remainder: {}, n_local_worker: {}, running on remote'.format(remainder, self.local_client_n_workers))
+        done_queue = queue.Queue()
 
-            func = yarn_directory_normalizer(func)
-            future = self.yarn_client.submit(func, None, *args, **kwargs)
+        for elem in futures:
+            elem.add_done_callback(done_queue.put)
 
-        else:
+        for _ in range(len(futures)):
+            yield done_queue.get()
 
-            if self.verbose==True:
-                print('remainder: {}, n_local_worker: {}, running on local'.format(remainder, self.local_client_n_workers))
+    def nthreads(self):
+        """{worker address: threads} of the workers of both clusters."""
 
-            future = self.local_client.submit(func, *args, **kwargs)
-        
-        return future.result()
+        self._update_nthreads()
+
+        with self.client_lock:
+            return {**self.local_nthreads, **self.yarn_nthreads}
+
+    def run(self, func, *args):
+
+        return {**self.local_client.run(func, *args), **self.yarn_client.run(func, *args)}
+
+    def get_throughputs(self):
+        """Tasks per second of each cluster while it had tasks to run. Until both clusters 
+        have finished a task, their thread counts stand in for it."""
+
+        with self.client_lock:
+            return self._get_throughputs()
+
+    def _get_throughputs(self):
+
+        if min(self.completed)==0:
+            return [max(elem, 1) for elem in self.client_nthreads]
+
+        now = time.time()
+        busy_time = [elem + (now - since if since is not None else 0.0) 
+                     for elem, since in zip(self.busy_time, self.busy_since)]
+
+        return [n / max(t, 1e-6) for n, t in zip(self.completed, busy_time)]
+
+    def _get_client_idx(self, workers):
+
+        if workers is not None:
+            return int(all(elem in self.yarn_workers for elem in workers))
+
+        return get_least_loaded_client(self.in_flight, self._get_throughputs())
+
+    def _get_yarn_future(self, arg):
+        """The yarn copy of [ arg ] if it is a scattered future, else [ arg ] itself."""
+
+        if isinstance(arg, Future):
+            return self.yarn_scattered.get(arg.key, arg)
+
+        return arg
+
+    def _update_nthreads(self):
+
+        local_nthreads = self.local_client.nthreads()
+        yarn_nthreads = self.yarn_client.nthreads()
+
+        # submit picks the client from these under the lock
+        with self.client_lock:
+            self.local_nthreads = local_nthreads
+            self.yarn_nthreads = yarn_nthreads
+            self.client_nthreads = [sum(local_nthreads.values()), sum(yarn_nthreads.values())]
+            self.yarn_workers = set(yarn_nthreads)
+
+    def _add_in_flight(self, client_idx):
+
+        if self.in_flight[client_idx]==0:
+            self.busy_since[client_idx] = time.time()
+
+        self.in_flight[client_idx] += 1
+
+    def _record_done(self, client_idx, future=None):
+
+        with self.client_lock:
+
+            self.in_flight[client_idx] -= 1
+
+            if future is not None and future.status=='finished':
+                self.completed[client_idx] += 1
+
+            if self.in_flight[client_idx]==0:
+                self.busy_time[client_idx] += time.time() - self.busy_since[client_idx]
+                self.busy_since[client_idx] = None
     
     def get_worker_ip_addresses(self):
         
@@ -225,6 +351,22 @@ class ClientFuture():
 
         scattered_args = self.local_client.scatter(args, broadcast=True)
         return scattered_args
+
+    def wait(self, futures):
+
+        wait(futures)
+
+    def as_completed(self, futures):
+
+        return as_completed(futures)
+
+    def nthreads(self):
+
+        return self.local_client.nthreads()
+
+    def run(self, func, *args):
+
+        return self.local_client.run(func, *args)
         
     def get_dashboard_link(self):
         
@@ -74,6 +74,10 @@ class DaskResourceConfigurer():
                 self.yarn_container_worker_vcores = yarn_container_worker_vcores
                 self.yarn_container_worker_memory = yarn_container_worker_memory
                 self.n_worker_nodes = n_worker_nodes
+
+                if use_yarn_cluster:
+                    self.use_yarn_cluster = True
+                    self._set_yarn_client_resources()
             return
 
         if use_auto_config is None:
@@ -144,51 +148,51 @@ class DaskResourceConfigurer():
 
                     self.use_yarn_cluster = True
 
+                num_physical_cores = int(INSTANCE_TYPES[instance_type]['vCPU']/2)
+                num_virtual_cores = int(INSTANCE_TYPES[instance_type]['vCPU'])
+                available_memory = int(INSTANCE_TYPES[instance_type]['Mem'] - 4)
+                # 2 GB claimed by client + 2 GB claimed by scheduler in a node
+
+                large_instance = num_physical_cores>=8
+
+                if large_instance:
+
+                    local_offset = 4
+                    self.local_client_threads_per_worker = DEFAULT_LARGE_INSTANCE_WORKER_VCORES
+                    self.local_client_n_workers = int((num_virtual_cores - 
+                                                  local_offset)/self.local_client_threads_per_worker)
+                    
+                    if use_yarn_cluster:
+
+                        yarn_offset = 2
+                        self.yarn_container_worker_vcores = DEFAULT_LARGE_INSTANCE_WORKER_VCORES
+                        self.yarn_container_n_workers = int((num_virtual_cores - 
+                                                             yarn_offset)/self.yarn_container_worker_vcores)
+                        self.yarn_container_worker_memory = str(int((available_memory - 
+                                                                1.5)/self.yarn_container_n_workers)) + ' GB'
+                        self.yarn_container_worker_memory = str(int((available_memory - 
+                                                                1.5)/self.yarn_container_n_workers)) + ' GB'
+
                 else:
-                    num_physical_cores = int(INSTANCE_TYPES[instance_type]['vCPU']/2)
-                    num_virtual_cores = int(INSTANCE_TYPES[instance_type]['vCPU'])
-                    available_memory = int(INSTANCE_TYPES[instance_type]['Mem'] - 4)
-                    # 2 GB claimed by client + 2 GB claimed by scheduler in a node
-
-                    large_instance = num_physical_cores>=8
-
-                    if large_instance:
-
-                        local_offset = 4
-                        self.local_client_threads_per_worker = DEFAULT_LARGE_INSTANCE_WORKER_VCORES
-                        self.local_client_n_workers = int((num_virtual_cores - 
-                                                      local_offset)/self.local_client_threads_per_worker)
-                        
-                        if use_yarn_cluster:
-
-                            yarn_offset = 2
-                            self.yarn_container_worker_vcores = DEFAULT_LARGE_INSTANCE_WORKER_VCORES
-                            self.yarn_container_n_workers = int((num_virtual_cores - 
-                                                                 yarn_offset)/self.yarn_container_worker_vcores)
-                            self.yarn_container_worker_memory = str(int((available_memory - 
-                                                                    1.5)/self.yarn_container_n_workers)) + ' GB'
-                            self.yarn_container_worker_memory = str(int((available_memory - 
-                                                                    1.5)/self.yarn_container_n_workers)) + ' GB'
-
-                    else:
-
-                        local_offset = 2
-                        self.local_client_threads_per_worker = DEFAULT_SMALL_INSTANCE_WORKER_VCORES
-                        self.local_client_n_workers = int(max(1, num_virtual_cores - 
-                                                         local_offset)/self.local_client_threads_per_worker)
-
-                        if use_yarn_cluster:
-
-                            yarn_offset = 2
-                            self.yarn_container_worker_vcores = DEFAULT_SMALL_INSTANCE_WORKER_VCORES
-                            self.yarn_container_n_workers = int(max(1, num_virtual_cores - 
-                                                               yarn_offset)/self.yarn_container_worker_vcores)
-                            self.yarn_container_worker_memory = str(int((available_memory - 
-                                                                    1.5)/self.yarn_container_n_workers)) + ' GB'
+
+                    local_offset = 2
+                    self.local_client_threads_per_worker = DEFAULT_SMALL_INSTANCE_WORKER_VCORES
+                    self.local_client_n_workers = int(max(1, num_virtual_cores - 
+                                                     local_offset)/self.local_client_threads_per_worker)
+
+                    if use_yarn_cluster:
+
+                        yarn_offset = 2
+                        self.yarn_container_worker_vcores = DEFAULT_SMALL_INSTANCE_WORKER_VCORES
+                        self.yarn_container_n_workers = int(max(1, num_virtual_cores - 
+                                                           yarn_offset)/self.yarn_container_worker_vcores)
+                        self.yarn_container_worker_memory = str(int((available_memory - 
+                                                                1.5)/self.yarn_container_n_workers)) + ' GB'
 
                 if use_yarn_cluster:
 
                     self.n_worker_nodes = n_worker_nodes
+                    self._set_yarn_client_resources()
                 
                 print('[ aws instance configurations ]')
                 print('instance vcores: {}'.format(INSTANCE_TYPES[instance_type]['vCPU']))
@@ -215,6 +219,10 @@ class DaskResourceConfigurer():
                 print('local_client_n_workers: {}'.format(self.local_client_n_workers))
                 print('local_client_threads_per_worker: {}'.format(self.local_client_threads_per_worker))
 
+    def _set_yarn_client_resources(self):
+        """The yarn cluster resources as DualClientFuture takes them, a container per 
+        worker on each of the worker nodes."""
 
-
-                
\ No newline at end of file
+        self.yarn_client_n_workers = self.yarn_container_n_workers * self.n_worker_nodes
+        self.yarn_client_worker_vcores = self.yarn_container_worker_vcores
+        self.yarn_client_worker_memory = self.yarn_container_worker_memory
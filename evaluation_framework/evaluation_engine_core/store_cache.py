@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import shutil
+
+from evaluation_framework.utils.pandas_utils import hash_dataframe
+from evaluation_framework.utils.fileIO_utils import hash_files
+from evaluation_framework.utils.parquet_utils import get_parquet_filepaths
+from evaluation_framework.utils.s3_utils import s3_download_object
+from evaluation_framework.utils.s3_utils import s3_object_exists
+from evaluation_framework.utils.zip_utils import unzip_dir
+from evaluation_framework import constants
+
+
+STORE_CACHE_DIRNAME = 'store_cache'
+STORE_KEY_FILENAME = '__specialEF__storeKey'
+# bump when the layout of the stored arrays changes, so that older stores are not reused
+STORE_FORMAT_VERSION = 2
+
+
+def get_store_key(evaluation_manager, appended_data=None):
+    """
+    Content hash of what the store of [ evaluation_manager ] is built from: its data, the
+    stored columns and their types, the groupby, the orderby and the storage layout. Two
+    managers with the same key build identical stores, whatever their job_uuid.
+
+    The in-memory data is hashed a chunk of rows at a time, a Parquet [ data ] by the bytes
+    of its files. After EvaluationEngine.append_data the in-memory data already holds the
+    [ appended_data ], the Parquet key is chained with the hash of [ appended_data ] instead.
+    """
+    em = evaluation_manager
+
+    if em.data_path is None:
+        data_hash = hash_dataframe(em.data, em.original_colnames)
+
+    elif appended_data is None:
+        data_hash = hash_files(get_parquet_filepaths(em.data_path))
+
+    else:
+        data_hash = hashlib.sha256((em.store_key + hash_dataframe(appended_data, em.original_colnames)).encode()).hexdigest()
+
+    schema = {
+        'version': STORE_FORMAT_VERSION,
+        'dtypes': [(k, str(em.data[k].dtype)) for k in em.original_colnames],
+        'numeric_types': em.numeric_types,
+        'missing_keys': em.missing_keys,
+        'groupby': em.groupby,
+        'orderby': em.orderby,
+        'storage_layout': em.storage_layout}
+
+    return hashlib.sha256(json.dumps([data_hash, schema], sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_store_dirname(store_key):
+
+    return os.path.join(STORE_CACHE_DIRNAME, 'store__{}'.format(store_key))
+
+
+def _get_store_filesizes(dirpath):
+    """The size of each file of the store, except the memmap_map copies (rewritten when
+    fold manifests are added) and the key file itself."""
+
+    return {filename: os.path.getsize(os.path.join(dirpath, filename))
+            for filename in sorted(os.listdir(dirpath))
+            if not filename.startswith(constants.HMF_MEMMAP_MAP_NAME) and filename != STORE_KEY_FILENAME}
+
+
+def save_store_key(dirpath, store_key):
+    """Marks the complete store at [ dirpath ] as holding [ store_key ]. Written last, so
+    that an interrupted build or download is never taken for a cached store."""
+
+    with open(os.path.join(dirpath, STORE_KEY_FILENAME), 'w') as f:
+        json.dump({'store_key': store_key, 'filesizes': _get_store_filesizes(dirpath)}, f)
+
+
+def is_verified_store(dirpath, store_key):
+    """Whether [ dirpath ] holds the complete store of [ store_key ]: its key file matches
+    and every file it lists is there with the same size."""
+
+    try:
+        with open(os.path.join(dirpath, STORE_KEY_FILENAME), 'r') as f:
+            store_key_record = json.load(f)
+
+    except (OSError, ValueError):
+        return False
+
+    if store_key_record['store_key'] != store_key:
+        return False
+
+    for filename, filesize in store_key_record['filesizes'].items():
+
+        filepath = os.path.join(dirpath, filename)
+
+        if not os.path.exists(filepath) or os.path.getsize(filepath) != filesize:
+            return False
+
+    return True
+
+
+def commit_store(build_dirpath, dirpath, store_key):
+    """Moves the store built at [ build_dirpath ] to its cache [ dirpath ]. If another
+    evaluation committed the same store first, that one is kept and the build dropped."""
+
+    save_store_key(build_dirpath, store_key)
+
+    if is_verified_store(dirpath, store_key):
+        shutil.rmtree(build_dirpath)
+        return
+
+    if os.path.exists(dirpath):
+        shutil.rmtree(dirpath)
+
+    os.makedirs(os.path.dirname(dirpath), exist_ok=True)
+    os.rename(build_dirpath, dirpath)
+
+
+def download_store(dirpath, store_key, S3_path, S3_object_name, job_uuid):
+    """Downloads and unzips the store of [ store_key ] uploaded by an earlier evaluation
+    into [ dirpath ]. False if [ S3_path ] does not have it."""
+
+    if S3_path is None or not s3_object_exists(S3_path, S3_object_name + '.zip'):
+        return False
+
+    download_dirpath = '{}__{}'.format(dirpath, job_uuid)
+
+    s3_download_object(download_dirpath, S3_path, S3_object_name + '.zip')
+
+    zipped_filepath = os.path.join(download_dirpath, S3_object_name + '.zip')
+    build_dirpath = unzip_dir(zipped_filepath, 'store')
+    os.remove(zipped_filepath)
+
+    if not is_verified_store(build_dirpath, store_key):
+        shutil.rmtree(download_dirpath)
+        return False
+
+    # the key file is rewritten by commit_store
+    commit_store(build_dirpath, dirpath, store_key)
+    shutil.rmtree(download_dirpath, ignore_errors=True)
+
+    return True
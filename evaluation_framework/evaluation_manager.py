@@ -15,6 +15,13 @@ CONFIG_SETTER_KEYS = [
 "train_window",
 "min_train_window",
 "test_window",
+"gap_window",
+"num_folds",
+"storage_layout",
+"pipeline_mode",
+"setup_mode",
+"use_store_cache",
+"trace_setup_memory",
 "user_configs",
 "local_directory_path",
 "S3_path",
@@ -33,7 +40,9 @@ METHOD_SETTER_KEYS = [
 FINAL_CONFIG_KEYS = [
 'data',
 'groupby',
-'orderby'
+'orderby',
+'storage_layout',
+'use_store_cache'
 ]
 
 
@@ -86,6 +95,10 @@ class EvaluationManager():
             
             temp_dict[k] = v
 
+        # [ data ] of a Parquet input is only its sample, the checks must scan the dataset
+        if self.data_path is not None:
+            temp_dict['data'] = self.data_path
+
         
 
         self.setup_evaluation(**temp_dict)
@@ -1,5 +1,5 @@
-from ..utils.pandas_utils import is_date_str_type
-from ..utils.pandas_utils import is_not_date_str_type
+from ..utils.pandas_utils import parse_date_str
+from ..utils.pandas_utils import get_stratified_sample
 from ..utils.pandas_utils import is_numeric_type
 from ..utils.pandas_utils import is_datetime_type
 from ..utils.pandas_utils import is_float32_type
@@ -9,6 +9,11 @@ from ..utils.pandas_utils import encode_date_sequence
 from ..utils.data_structure_utils import get_merged_list_from_dict_list_values
 from ..utils.data_structure_utils import dict_is_nested
 from ..utils.datetime_utils import check_date_format
+from ..utils.parquet_utils import is_parquet_path
+from ..utils.parquet_utils import read_parquet_head
+from ..utils.parquet_utils import iter_parquet_batches
+from ..utils.memory_utils import trace_peak_bytes
+from ..evaluation_engine_core.store_cache import get_store_dirname
 
 import inspect
 import pandas as pd
@@ -21,13 +26,22 @@ import datetime
 from evaluation_framework import constants
 
 
-ORDERED_CV_SCHEMES = ['date_rolling_window']
+ORDERED_CV_SCHEMES = ['date_rolling_window', 'date_expanding_window']
+UNORDERED_CV_SCHEMES = ['k_fold', 'binary_classification']
 CV_OPTIONAL_ARGUMENTS = ['orderby', 'train_window', 'min_train_window', 'test_window']
-OPTIONAL_ARGUMENTS = ['groupby', 'hyperparameters', 'user_configs', 'S3_path', 'user_configs', 'return_predictions']
-CV_SCHEME_OPTIONS = ['date_rolling_window', 'k_fold', 'binary_classification']
-INTERNAL_ARGUMENTS = ['prediction_records_dirname']
+OPTIONAL_ARGUMENTS = ['groupby', 'hyperparameters', 'user_configs', 'S3_path', 'user_configs', 'return_predictions',
+                      'gap_window', 'num_folds', 'storage_layout', 'pipeline_mode', 'setup_mode', 'use_store_cache',
+                      'trace_setup_memory']
+CV_SCHEME_OPTIONS = ['date_rolling_window', 'date_expanding_window', 'k_fold', 'binary_classification']
+STORAGE_LAYOUT_OPTIONS = ['row_major', 'column_major']
+PIPELINE_MODE_OPTIONS = ['dataframe', 'array', 'arrow']
+SETUP_MODE_OPTIONS = ['copy', 'inplace']
+INTERNAL_ARGUMENTS = ['prediction_records_dirname', 'data_path', 'group_keys', 'orderby_first_date', 'target_classes',
+                      'setup_peak_bytes', 'store_key']
 REQUIRED_ESTIMATOR_MEMBER_METHODS = ['fit', 'predict']
 FIT_METHOD_PARAMETERS_PARAMETER_NAME = 'parameters'
+PARQUET_SAMPLE_SIZE = 10000
+TYPE_INFERENCE_SAMPLE_SIZE = 1000
 
 
 class ConfigSetter():
@@ -41,6 +55,23 @@ class ConfigSetter():
         self.numeric_types = []
         self.original_colnames = []
 
+        # set when [ data ] is a Parquet path, see _validate_parquet_data
+        self.data_path = None
+        self.group_keys = None
+        self.orderby_first_date = None
+        self.target_classes = None
+
+        # peak extra bytes allocated while validating [ data ] and adding the helper columns, 
+        # measured with [ trace_setup_memory ] only
+        self.setup_peak_bytes = None
+
+        # content hash of the store when [ use_store_cache ], set by EvaluationEngine
+        self.store_key = None
+
+        # colname: (sample fingerprint, "str" or "date_str", the parsed dates of a "date_str") 
+        # of the object columns already inferred, kept across setups. See _infer_object_type
+        self.object_type_cache = dict()
+
         self.job_uuid = str(datetime.datetime.now()).replace(" ", '-')
         
     def set_configs(self, *, local_data_saved=False, estimator=None,
@@ -48,7 +79,8 @@ class ConfigSetter():
                     hyperparameters=None, cross_validation_scheme=None,
                     groupby=None, 
                     orderby=None, train_window=None, min_train_window=None, test_window=None,
-                    user_configs=None, local_directory_path=None, S3_path=None, 
+                    gap_window=None, num_folds=None, storage_layout=None, pipeline_mode=None, setup_mode=None,
+                    use_store_cache=None, trace_setup_memory=None, user_configs=None, local_directory_path=None, S3_path=None, 
                     return_predictions=None, **kwargs):
 
         self.local_data_saved = local_data_saved
@@ -64,6 +96,13 @@ class ConfigSetter():
         self.train_window = train_window
         self.min_train_window = min_train_window
         self.test_window = test_window 
+        self.gap_window = gap_window
+        self.num_folds = num_folds
+        self.storage_layout = storage_layout
+        self.pipeline_mode = pipeline_mode
+        self.setup_mode = setup_mode
+        self.use_store_cache = use_store_cache
+        self.trace_setup_memory = trace_setup_memory
         self.user_configs = user_configs
         self.local_directory_path = local_directory_path
         self.S3_path = S3_path
@@ -80,12 +119,17 @@ class ConfigSetter():
 
         print("\u2714 Checking configs validity...        ", end="", flush=True)
 
-        if not self.passed_arguments_validity():
-            return False
-        else:
-            print("Passed!")
+        # tracemalloc slows down every allocation, so the setup is only traced on request
+        with trace_peak_bytes(enabled=self.trace_setup_memory is True) as memory_stats:
+
+            if not self.passed_arguments_validity():
+                return False
+            else:
+                print("Passed!")
+
+            self.define_helper_columns()
 
-        self.define_helper_columns()
+        self.setup_peak_bytes = memory_stats['peak_bytes']
 
         
 
@@ -93,13 +137,11 @@ class ConfigSetter():
 
     def define_helper_columns(self):
 
-        # create key column to join the predictions
-        key_column = np.arange(len(self.data)).astype(np.float64)
+        # create key column to join the predictions. It is stored in its own int64 array 
+        # (DataLoader uuid_array), so it is not one of the float32 numeric_types
+        key_column = np.arange(len(self.data), dtype=np.int64)
         self.data[constants.EF_UUID_NAME] = key_column
 
-        # assuming data validation was done before...
-        self.numeric_types.append(constants.EF_UUID_NAME)
-
         if(self.return_predictions):
 
             self.prediction_records_dirname = 'prediction_arrays'
@@ -110,8 +152,60 @@ class ConfigSetter():
 
         if(self.orderby):
 
-            self.data[constants.EF_ORDERBY_NAME] = encode_date_sequence(self.data[self.orderby])
+            # the Parquet sample counts its days from the first date of the whole dataset, 
+            # and appended days (see prepare_appended_data) from the first date of the data
+            if self.orderby_first_date is None:
+                self.orderby_first_date = self.data[self.orderby].min()
+
+            self.data[constants.EF_ORDERBY_NAME] = encode_date_sequence(self.data[self.orderby], 
+                                                                        self.orderby_first_date)
         
+    def prepare_appended_data(self, data, uuid_offset):
+        """
+        The new rows of [ data ] for EvaluationEngine.append_data, typed like the data of 
+        the last setup and with its helper columns: the uuids continue from [ uuid_offset ], 
+        the number of rows already stored, and the days count from the same first date.
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError('The appended [ data ] must be of type <pandas.DataFrame>, instead got '
+                            '{}.'.format(type(data)))
+
+        if len(data)==0:
+            raise ValueError('The appended [ data ] is empty dataframe.')
+
+        if self.orderby is None:
+            raise ValueError('Appending [ data ] requires the [ orderby ] argument.')
+
+        if set(data.columns) != set(self.original_colnames):
+            raise ValueError('The appended [ data ] must have the columns of the evaluation data, "{}".'.format(
+                '", "'.join(self.original_colnames)))
+
+        data = data[self.original_colnames].reset_index(drop=True)
+
+        for k in self.datetime_types:
+            if not is_datetime_type(data[k]):
+
+                parsed_date_str = parse_date_str(data[k])
+
+                if parsed_date_str is None:
+                    raise TypeError('The appended [ data ] column "{}" must have either datetime dtype or '
+                                    '"YYYY-MM-DD" format.'.format(k))
+
+                data[k] = parsed_date_str
+
+        for k in self.numeric_types:
+            if k in data and not is_float32_type(data[k]):
+                data[k] = data[k].astype(np.float32)
+
+        if self.groupby==self.dummy_region_uuid:
+            data[self.dummy_region_uuid] = pd.Categorical.from_codes(
+                np.zeros(len(data), dtype=np.int8), categories=[self.dummy_region_uuid])
+
+        data[constants.EF_UUID_NAME] = np.arange(uuid_offset, uuid_offset + len(data), dtype=np.int64)
+        data[constants.EF_ORDERBY_NAME] = encode_date_sequence(data[self.orderby], self.orderby_first_date)
+
+        return data
+
     def passed_arguments_requirements(self):
         
         self.required_args = self._required_arguments()
@@ -190,7 +284,14 @@ class ConfigSetter():
         self._validate_local_directory_path()
         self._validate_s3_path()
         self._validate_estimator()
+        self._validate_setup_mode()
         self._validate_helper_columns()
+        self._validate_gap_window()
+        self._validate_num_folds()
+        self._validate_storage_layout()
+        self._validate_pipeline_mode()
+        self._validate_use_store_cache()
+        self._validate_trace_setup_memory()
 
         if not self.local_data_saved:
 
@@ -300,6 +401,27 @@ class ConfigSetter():
     def _validate_s3_path(self):
 
         self.memmap_root_S3_object_name = self.memmap_root_dirname + '__' + self.job_uuid
+
+        # update_setup keeps the cached store the data was saved to
+        if self.store_key is not None:
+            self.set_store_key(self.store_key)
+
+    def set_store_key(self, store_key):
+        """
+        Points the store paths at the cached store of [ store_key ], shared by every 
+        evaluation task under [ local_directory_path ] and under [ S3_path ]:
+
+        local_directory_path
+
+        |__ store_cache
+
+            |__ store__{store_key} (memmap_root_dirname, relative)
+        """
+        self.store_key = store_key
+
+        self.memmap_root_dirname = get_store_dirname(store_key)
+        self.memmap_root_dirpath = os.path.join(self.local_directory_path, self.memmap_root_dirname)
+        self.memmap_root_S3_object_name = os.path.basename(self.memmap_root_dirname)
         
     def _validate_estimator(self):
         
@@ -325,16 +447,130 @@ class ConfigSetter():
             if self.hyperparameters is not None:
                 warnings.warn("[ hyperparameters ] is not being used by [ estimator ].")
 
+    def _validate_gap_window(self):
+        """
+        [ gap_window ] is the number of embargoed days left out between the end of each 
+        train window and the start of its test window. It defaults to 0 (no gap).
+        """
+        if self.gap_window is None:
+            self.gap_window = 0
+
+        if isinstance(self.gap_window, bool) or not isinstance(self.gap_window, (int, np.integer)):
+            print('Failed!')
+            raise TypeError('[ gap_window ] must be an integer but instead got '
+                            '{}'.format(type(self.gap_window)))
+
+        if self.gap_window < 0:
+            print('Failed!')
+            raise ValueError('[ gap_window ] must be non-negative, instead got {}.'.format(self.gap_window))
+
+    def _validate_num_folds(self):
+        """
+        [ num_folds ] is the number of folds of the unordered schemes (k_fold and 
+        binary_classification). It defaults to 5.
+        """
+        if self.num_folds is None:
+            self.num_folds = 5
+
+        if isinstance(self.num_folds, bool) or not isinstance(self.num_folds, (int, np.integer)):
+            print('Failed!')
+            raise TypeError('[ num_folds ] must be an integer but instead got '
+                            '{}'.format(type(self.num_folds)))
+
+        if self.num_folds < 2:
+            print('Failed!')
+            raise ValueError('[ num_folds ] must be at least 2, instead got {}.'.format(self.num_folds))
+
+    def _validate_storage_layout(self):
+        """
+        [ storage_layout ] is how the numeric columns of each group are stored: "row_major" 
+        (default) as a single 2d memmap, or "column_major" as one memmap per column.
+        """
+        if self.storage_layout is None:
+            self.storage_layout = 'row_major'
+
+        if self.storage_layout not in STORAGE_LAYOUT_OPTIONS:
+            print('Failed!')
+            raise ValueError('[ storage_layout ] must be one of {}, instead got '
+                             '"{}".'.format(STORAGE_LAYOUT_OPTIONS, self.storage_layout))
+
+    def _validate_pipeline_mode(self):
+        """
+        [ pipeline_mode ] is what the user methods receive: "dataframe" (default) pandas 
+        DataFrames, "array" ArrayData tuples of numpy arrays (X, y, uuid, extra) read 
+        straight from the memmaps, or "arrow" pandas DataFrames backed by pyarrow arrays 
+        (pd.ArrowDtype columns).
+        """
+        if self.pipeline_mode is None:
+            self.pipeline_mode = 'dataframe'
+
+        if self.pipeline_mode not in PIPELINE_MODE_OPTIONS:
+            print('Failed!')
+            raise ValueError('[ pipeline_mode ] must be one of {}, instead got '
+                             '"{}".'.format(PIPELINE_MODE_OPTIONS, self.pipeline_mode))
+
+        # pd.ArrowDtype is only there from pandas 1.5 on
+        if self.pipeline_mode=='arrow' and not hasattr(pd, 'ArrowDtype'):
+            print('Failed!')
+            raise ValueError('[ pipeline_mode ] "arrow" needs pandas>=1.5, instead got pandas '
+                             '{}.'.format(pd.__version__))
+
+    def _validate_use_store_cache(self):
+        """
+        With [ use_store_cache ] the store is kept under [ local_directory_path ] (and 
+        [ S3_path ]) by a content hash of the data and its schema, and reused by any later 
+        EvaluationManager with the same data instead of being built again. 
+        See EvaluationEngine and store_cache.
+        """
+        if self.use_store_cache is None:
+            self.use_store_cache = False
+
+        if not isinstance(self.use_store_cache, bool):
+            print('Failed!')
+            raise TypeError('[ use_store_cache ] must be boolean but instead got '
+                            '{}'.format(type(self.use_store_cache)))
+
+    def _validate_trace_setup_memory(self):
+        """
+        With [ trace_setup_memory ] the peak of the memory allocated by the setup of [ data ] 
+        is traced with tracemalloc and kept as [ setup_peak_bytes ].
+        """
+        if self.trace_setup_memory is None:
+            self.trace_setup_memory = False
+
+        if not isinstance(self.trace_setup_memory, bool):
+            print('Failed!')
+            raise TypeError('[ trace_setup_memory ] must be boolean but instead got '
+                            '{}'.format(type(self.trace_setup_memory)))
+
+    def _validate_setup_mode(self):
+        """
+        [ setup_mode ] is how [ data ] is prepared: "copy" (default) works on a copy of it, 
+        leaving the user's DataFrame as it was, while "inplace" converts its types and adds 
+        the helper columns on the DataFrame itself, so that setup never holds two copies.
+        """
+        if self.setup_mode is None:
+            self.setup_mode = 'copy'
+
+        if self.setup_mode not in SETUP_MODE_OPTIONS:
+            print('Failed!')
+            raise ValueError('[ setup_mode ] must be one of {}, instead got '
+                             '"{}".'.format(SETUP_MODE_OPTIONS, self.setup_mode))
+
     def _validate_helper_columns(self):
 
-        if constants.EF_UUID_NAME in self.data:
-            self.data.drop(labels=constants.EF_UUID_NAME, axis=1, inplace=True)
-            
-        if constants.EF_ORDERBY_NAME in self.data:
-            self.data.drop(labels=constants.EF_ORDERBY_NAME, axis=1, inplace=True)
-            
-        if constants.EF_PREDICTION_NAME in self.data:
-            self.data.drop(labels=constants.EF_PREDICTION_NAME, axis=1, inplace=True)
+        if is_parquet_path(self.data):
+            return
+
+        # a "copy" setup of new data leaves them on the user's DataFrame and drops them from 
+        # its copy instead, see _validate_data
+        if self.setup_mode=='copy' and not self.local_data_saved:
+            return
+
+        # del instead of drop(inplace=True), which rebuilds the other columns
+        for colname in [constants.EF_UUID_NAME, constants.EF_ORDERBY_NAME, constants.EF_PREDICTION_NAME]:
+            if colname in self.data:
+                del self.data[colname]
         
     def _validate_target_name(self):
         
@@ -345,6 +581,13 @@ class ConfigSetter():
         if not is_float32_type(self.data[self.target_name]):
             print('Failed!')
             raise TypeError('[ target_name ] "{}" is not of type np.float32.'.format(self.target_name))
+
+        if self.cross_validation_scheme=='binary_classification':
+            if self._get_num_target_classes() > 2:
+                print('Failed!')
+                raise ValueError('[ target_name ] "{}" must have at most two classes if '
+                                 '[ cross_validation_scheme ] is specified as '
+                                 '"binary_classification".'.format(self.target_name))
             
     def _validate_feature_names(self):
             
@@ -355,11 +598,13 @@ class ConfigSetter():
         # make it into dict if it is not
         else:
             if self.groupby:
-                group_keys = self.data[self.groupby].unique()
+                group_keys = self._get_group_keys()
                 feature_names = self.feature_names
                 self.feature_names = {group_key: feature_names for group_key in group_keys}
             else:
-                self.data[self.dummy_region_uuid] = self.dummy_region_uuid
+                # a single category, one byte per row instead of an object column
+                self.data[self.dummy_region_uuid] = pd.Categorical.from_codes(
+                    np.zeros(len(self.data), dtype=np.int8), categories=[self.dummy_region_uuid])
                 self.feature_names = {self.dummy_region_uuid: self.feature_names}
             
         feature_names_list = get_merged_list_from_dict_list_values(self.feature_names)
@@ -386,17 +631,40 @@ class ConfigSetter():
                                      "dataframe at group \"{}\".".format(', '.join(unrecognized_feature_names), k))
       
     def _validate_data(self):
+
+        self.data_path = None
+        self.group_keys = None
+        self.orderby_first_date = None
+        self.target_classes = None
+
+        if is_parquet_path(self.data):
+            self._read_parquet_sample()
         
         if not isinstance(self.data, pd.DataFrame):
             print('Failed!')
-            raise TypeError('[ data ] must be of type <pandas.DataFrame>, '
-                            'instead got {}.'.format(type(self.data)))
+            raise TypeError('[ data ] must be of type <pandas.DataFrame> or the path of a Parquet '
+                            'file or dataset directory, instead got {}.'.format(type(self.data)))
         
         if len(self.data)==0:
             print('Failed!')
             raise ValueError('[ data ] is empty dataframe.')
 
-        self.data = self.data.reset_index(drop=True)
+        # left by an earlier "inplace" setup (and ingestion) of the same DataFrame
+        helper_colnames = [elem for elem in [constants.EF_UUID_NAME, constants.EF_ORDERBY_NAME, 
+                                             constants.EF_PREDICTION_NAME, self.dummy_region_uuid, 
+                                             constants.HMF_GROUPBY_NAME] if elem in self.data]
+
+        if self.setup_mode=='copy':
+            # the one copy of the data, everything after this is done in place
+            self.data = self.data.drop(columns=helper_colnames)
+            self.data.reset_index(drop=True, inplace=True)
+
+        else:
+            for colname in helper_colnames:
+                del self.data[colname]
+
+            if not self.data.index.equals(pd.RangeIndex(len(self.data))):
+                self.data.reset_index(drop=True, inplace=True)
             
         self.str_types = []
         self.date_str_types = []
@@ -408,9 +676,7 @@ class ConfigSetter():
 
         for k, v in types.items():
 
-            if v=='object' and is_not_date_str_type(self.data[k]):
-                self.str_types.append(k)
-            elif v=='object' and is_date_str_type(self.data[k]):
+            if v=='object' and self._infer_object_type(k)=='date_str':
                 self.date_str_types.append(k)
             elif v=='object':
                 # raise warning!
@@ -432,12 +698,13 @@ class ConfigSetter():
                 raise ValueError('The [ orderby ] "{}" column name'
                                  'does not exist in [ data ] dataframe.'.format(self.orderby))
 
-            if self.cross_validation_scheme=='date_rolling_window':
+            if self.cross_validation_scheme in ORDERED_CV_SCHEMES:
                 if self.orderby not in self.datetime_types and self.orderby not in self.date_str_types:
                     print('Failed!')
                     raise TypeError('[ orderby ] argument column in [ data ] dataframe must have either '
                                     'datetime dtype or "YYYY-MM-DD" format if '
-                                    '[ cross_validation_scheme ] is specified as "date_rolling_window".')
+                                    '[ cross_validation_scheme ] is specified as "{}".'.format(
+                                        self.cross_validation_scheme))
 
         if self.groupby:
             if self.groupby not in self.data.columns:
@@ -449,18 +716,112 @@ class ConfigSetter():
         while len(self.date_str_types)>0:
             # raise warning!
             k = self.date_str_types.pop()
-            self.data[k] = pd.to_datetime(self.data[k])
-            self.datetime_types.append(k)
+            parsed_date_str = self.object_type_cache[k][2]
 
-        # convert all numeric to float32
-        # for k in self.numeric_types:
-        #     # raise warning!
-        #     self.data[k] = cast_numeric2float32(self.data[k])
+            if parsed_date_str is None:
+                print('Failed!')
+                raise TypeError('[ data ] column "{}" does not have the "YYYY-MM-DD" format of a date str '
+                                'column.'.format(k))
 
-        type_dict = {elem: np.float32 for elem in self.numeric_types}
-        self.data = self.data.astype(type_dict)
+            self.data[k] = parsed_date_str
+            self.datetime_types.append(k)
+
+        # convert all numeric to float32, one column at a time rather than with a 
+        # whole-frame astype, so that at most one column is duplicated at once
+        for k in self.numeric_types:
+            if not is_float32_type(self.data[k]):
+                self.data[k] = self.data[k].astype(np.float32)
 
         self.original_colnames = self.data.columns.to_list()
+
+        if self.data_path is not None:
+            self._scan_parquet_data()
+
+    def _infer_object_type(self, colname):
+        """
+        Whether the object column [ colname ] holds "YYYY-MM-DD" dates ("date_str") or 
+        anything else ("str"). Only a stratified sample of TYPE_INFERENCE_SAMPLE_SIZE values 
+        is parsed first, so that id or name columns are ruled out without parsing them 
+        whole. A column whose sample passes is parsed whole. The verdict, and the parse that 
+        the datetime conversion then uses, are cached under the fingerprint of the sample, so 
+        a later setup of the same data neither infers nor parses the column again.
+        """
+        ser = self.data[colname]
+        sample = get_stratified_sample(ser, TYPE_INFERENCE_SAMPLE_SIZE)
+        fingerprint = (len(ser), pd.util.hash_pandas_object(sample, index=False).to_numpy().tobytes())
+
+        if colname in self.object_type_cache and self.object_type_cache[colname][0]==fingerprint:
+            return self.object_type_cache[colname][1]
+
+        object_type = 'str'
+        parsed_date_str = None
+
+        if parse_date_str(sample) is not None:
+
+            parsed_date_str = parse_date_str(ser)
+
+            if parsed_date_str is not None:
+                object_type = 'date_str'
+
+        self.object_type_cache[colname] = (fingerprint, object_type, parsed_date_str)
+
+        return object_type
+
+    def _read_parquet_sample(self):
+        """
+        [ data ] may also be the path of a Parquet file or dataset directory that does not 
+        fit in memory. The types are then validated on its first PARQUET_SAMPLE_SIZE rows, 
+        which stay as [ data ] for the method checks, and the rest is streamed by 
+        _scan_parquet_data here and by DataLoader.save_parquet_data at ingestion.
+        """
+        if not os.path.exists(self.data):
+            print('Failed!')
+            raise ValueError('[ data ] path "{}" does not exist.'.format(self.data))
+
+        self.data_path = self.data
+        self.data = read_parquet_head(self.data_path, PARQUET_SAMPLE_SIZE)
+
+    def _scan_parquet_data(self):
+        """The whole-dataset facts that the checks would otherwise take from [ data ]: the 
+        group keys, the first date and the target classes. Only those columns are read, 
+        one row group at a time."""
+
+        columns = [elem for elem in [self.groupby, self.orderby, self.target_name] 
+                   if elem is not None and elem in self.original_colnames]
+
+        group_keys = set()
+        first_dates = []
+        target_classes = set()
+
+        for batch_pdf in iter_parquet_batches(self.data_path, columns=columns):
+
+            if self.groupby in batch_pdf:
+                group_keys.update(batch_pdf[self.groupby].unique())
+
+            if self.orderby in batch_pdf:
+                first_dates.append(pd.to_datetime(batch_pdf[self.orderby]).min())
+
+            # the binary_classification check only needs to know if there are more than two
+            if self.target_name in batch_pdf and len(target_classes) <= 2:
+                target_classes.update(batch_pdf[self.target_name].unique())
+
+        self.group_keys = sorted(group_keys)
+        self.orderby_first_date = min(first_dates) if len(first_dates)>0 else None
+        self.target_classes = target_classes
+
+    def _get_group_keys(self):
+
+        if self.data_path is not None:
+            return self.group_keys
+
+        return self.data[self.groupby].unique()
+
+    def _get_num_target_classes(self):
+
+        if self.data_path is not None:
+            return len(self.target_classes)
+
+        return self.data[self.target_name].nunique()
     
     def _validate_hyperparameters(self):
         
@@ -510,7 +871,7 @@ class ConfigSetter():
                     self.hyperparameters = {self.dummy_region_uuid: self.hyperparameters}
                     
                 elif len(set(self.hyperparameters.keys())
-                         .intersection(set(self.data[self.groupby].unique()))) > 0:
+                         .intersection(set(self._get_group_keys()))) > 0:
                     
                     self._check_groupby_presence('hyperparameters')
                     self._check_groupby_contents('hyperparameters')
@@ -535,7 +896,7 @@ class ConfigSetter():
         
         d = self.__dict__[parameter_name]
         
-        if set(d.keys())!=set(self.data[self.groupby].unique()):
+        if set(d.keys())!=set(self._get_group_keys()):
             print('Failed!')
             raise ValueError('The [ groupby ] column values of [ data ] dataframe and '
                              'the group keys of [ {} ] dict do not match.'.format(parameter_name))
@@ -3,9 +3,16 @@ from ..task_graph.default_methods import default_preprocess_test_data
 from ..task_graph.default_methods import default_model_fit
 from ..task_graph.default_methods import default_model_predict
 from ..task_graph.default_methods import default_evaluate_prediction
+from ..task_graph.default_methods import default_array_model_fit
+from ..task_graph.default_methods import default_array_model_predict
+from ..task_graph.array_data import get_array_data
+
+from evaluation_framework import constants
 
 import re
 import copy
+import numpy as np
+import pandas as pd
 
 
 REQUIRED_METHOD_ARGUMENTS = ['preprocess_train_data', 'preprocess_test_data', 'evaluate_prediction']
@@ -17,6 +24,8 @@ class MethodSetter():
 	def __init__(self):
 		
 		self.num_types_needed = None
+		self.preprocess_numeric_keys = None
+		self.array_extra_keys = None
 		self.missing_keys = dict()
 		self.missing_keys['datetime_types'] = []
 		self.missing_keys['str_types'] = []
@@ -95,7 +104,28 @@ class MethodSetter():
 		# self._validate_store_prediction()
 		self._validate_evaluate_prediction()
 
-		self.num_types_needed = self._num_types_needed()
+		if self.config_setter.pipeline_mode=='array':
+
+			self.array_extra_keys = self._array_extra_keys()
+			self.preprocess_numeric_keys = [elem for elem in self.array_extra_keys 
+											if elem in self.config_setter.numeric_types]
+			self.missing_keys['datetime_types'] = [elem for elem in self.array_extra_keys 
+												   if elem in self.config_setter.datetime_types]
+			self.missing_keys['str_types'] = [elem for elem in self.array_extra_keys 
+											  if elem in self.config_setter.str_types]
+
+			if len(self.missing_keys['str_types'])>0:
+				self.num_types_needed = 3
+			elif len(self.missing_keys['datetime_types'])>0:
+				self.num_types_needed = 2
+			else:
+				self.num_types_needed = 1
+
+		else:
+
+			self.array_extra_keys = None
+			self.num_types_needed = self._num_types_needed()
+			self.preprocess_numeric_keys = self._preprocess_numeric_keys()
 
 		return True
 		
@@ -116,16 +146,24 @@ class MethodSetter():
 	
 	def _validate_model_fit(self):
 		
-		if self.model_fit is None:
+		# the default of the other pipeline mode is swapped too, e.g. after update_setup
+		if self.model_fit is None or self.model_fit in (default_model_fit, default_array_model_fit):
 			
-			self.model_fit = default_model_fit
+			if self.config_setter.pipeline_mode=='array':
+				self.model_fit = default_array_model_fit
+			else:
+				self.model_fit = default_model_fit
 			return
 	
 	def _validate_model_predict(self):
 		
-		if self.model_predict is None:
+		# the default of the other pipeline mode is swapped too, e.g. after update_setup
+		if self.model_predict is None or self.model_predict in (default_model_predict, default_array_model_predict):
 			
-			self.model_predict = default_model_predict
+			if self.config_setter.pipeline_mode=='array':
+				self.model_predict = default_array_model_predict
+			else:
+				self.model_predict = default_model_predict
 			return
 	
 	def _validate_store_prediction(self):
@@ -144,62 +182,168 @@ class MethodSetter():
 
 		self.sample_train_pdf, self.sample_test_pdf = self._get_sample_pdf(self.config_setter)
 
-		included_colnames = copy.copy(self.config_setter.numeric_types)
-		train_missing_keys, re = self.key_error_catcher(
-			self.preprocess_train_data, 
-			self.sample_train_pdf[included_colnames], 
-			self.config_setter.user_configs)
-		test_missing_keys, re = self.key_error_catcher(
-			self.preprocess_test_data, 
-			self.sample_test_pdf[included_colnames], 
-			re,
-			self.config_setter.user_configs)
-		missing_keys = train_missing_keys + test_missing_keys
-		
-		if len(missing_keys)==0:
-			return 1
+		numeric_colnames = self.config_setter.numeric_types + [constants.EF_UUID_NAME]
+		non_numeric_colnames = self.config_setter.datetime_types + self.config_setter.str_types
+		included_colnames = copy.copy(numeric_colnames)
 
-		self.missing_keys['datetime_types'] = copy.copy(missing_keys)
-		
-		if len(missing_keys)>0:
-			
-			included_colnames += self.config_setter.datetime_types
-			train_missing_keys, re = self.key_error_catcher(
-				self.preprocess_train_data, 
-				self.sample_train_pdf[included_colnames], 
-				self.config_setter.user_configs)
-			test_missing_keys, re = self.key_error_catcher(
-				self.preprocess_test_data, 
-				self.sample_test_pdf[included_colnames], 
-				re, 
-				self.config_setter.user_configs)
-			missing_keys = train_missing_keys + test_missing_keys
-			
-		if len(missing_keys)==0:
-			return 2
+		# the methods stop at the first missing column, so keep adding the missing 
+		# datetime and str columns until they run through
+		while True:
 
-		self.missing_keys['datetime_types'] = list(set(self.missing_keys['datetime_types']) - set(missing_keys))
-		self.missing_keys['str_types'] = copy.copy(missing_keys)
-			
-		if len(missing_keys)>0:
-			
-			included_colnames += self.config_setter.str_types
-			train_missing_keys, re = self.key_error_catcher(
+			missing_keys, re = self.key_error_catcher(
 				self.preprocess_train_data, 
 				self.sample_train_pdf[included_colnames], 
 				self.config_setter.user_configs)
-			test_missing_keys, re = self.key_error_catcher(
-				self.preprocess_test_data, 
-				self.sample_test_pdf[included_colnames], 
-				re, 
-				self.config_setter.user_configs)
-			missing_keys = train_missing_keys + test_missing_keys
-			
-		if len(missing_keys)==0:
+
+			if len(missing_keys)==0:
+				missing_keys, _ = self.key_error_catcher(
+					self.preprocess_test_data, 
+					self.sample_test_pdf[included_colnames], 
+					re,
+					self.config_setter.user_configs)
+
+			if len(missing_keys)==0:
+				break
+
+			if not set(missing_keys) <= set(non_numeric_colnames) - set(included_colnames):
+				raise ValueError('not included! {}'.format(missing_keys))
+
+			included_colnames += [elem for elem in dict.fromkeys(missing_keys)]
+
+		self.missing_keys['datetime_types'] = [elem for elem in included_colnames 
+											   if elem in self.config_setter.datetime_types]
+		self.missing_keys['str_types'] = [elem for elem in included_colnames 
+										  if elem in self.config_setter.str_types]
+
+		if len(self.missing_keys['str_types'])>0:
 			return 3
-		
+		elif len(self.missing_keys['datetime_types'])>0:
+			return 2
 		else:
-			raise ValueError('not included! {}'.format(missing_keys))
+			return 1
+
+	def _preprocess_numeric_keys(self):
+		"""
+		Numeric columns that the preprocess and evaluate methods read on top of the feature 
+		names, the target and the uuid. The methods are re-run on the sample data with only 
+		those columns until they stop raising KeyError on a numeric column, so that the task 
+		graph can read just these columns from the memmap.
+
+		None (all the numeric columns are read) with a custom model_fit or model_predict, 
+		which may read any column, e.g. sample weights, or when the methods fail on the 
+		sample columns for another reason than a missing numeric column but run through 
+		on all of them. What they raise on all of them is raised.
+		"""
+		if (self.model_fit is not default_model_fit or 
+			self.model_predict is not default_model_predict):
+			return None
+
+		numeric_types = self.config_setter.numeric_types
+		base_colnames = [constants.EF_UUID_NAME, self.config_setter.target_name]
+		other_colnames = self.missing_keys['datetime_types'] + self.missing_keys['str_types']
+
+		preprocess_numeric_keys = []
+
+		while True:
+
+			included_colnames = base_colnames + preprocess_numeric_keys + other_colnames
+
+			try:
+				missing_keys = self._missing_sample_keys(included_colnames)
+			except Exception:
+				# checked on all the columns below
+				missing_keys = None
+
+			if missing_keys is not None and len(missing_keys)==0:
+				return preprocess_numeric_keys
+
+			missing_keys = [elem for elem in missing_keys or [] 
+							if elem in numeric_types and elem not in included_colnames]
+
+			if len(missing_keys)==0:
+				# the restricted columns may be what makes them fail (e.g. positional iloc), 
+				# unless they fail on all of them too
+				all_colnames = base_colnames + [elem for elem in numeric_types if elem not in base_colnames] + other_colnames
+				return None if self._missing_sample_keys(all_colnames)==[] else preprocess_numeric_keys
+
+			preprocess_numeric_keys += missing_keys
+
+	def _missing_sample_keys(self, included_colnames):
+		"""The columns the methods did not find among [ included_colnames ] of the sample 
+		data, [] if they ran through. Anything else they raise is raised."""
+
+		configs = self.config_setter.user_configs
+
+		try:
+			preprocessed_train_data = self.preprocess_train_data(
+				self.sample_train_pdf[included_colnames].copy(), configs)
+			preprocessed_test_data = self.preprocess_test_data(
+				self.sample_test_pdf[included_colnames].copy(), preprocessed_train_data, configs)
+			self.evaluate_prediction(
+				preprocessed_test_data, 
+				pd.Series(np.zeros(len(preprocessed_test_data)), name=constants.EF_PREDICTION_NAME))
+
+		except KeyError as e:
+			return [elem for elem in re.findall("'([^']*)'", str(e.args[0])) + [e.args[0]]
+					if elem in self.config_setter.original_colnames]
+
+		return []
+
+	def _array_extra_keys(self):
+		"""
+		The "array" pipeline mode counterpart of _num_types_needed and _preprocess_numeric_keys. 
+		The methods are run on ArrayData samples and every column they fail to find in the 
+		extra array (KeyError, or ValueError "no field of name ...") is added to it until they 
+		run through. Those are the only columns the task graph packs into extra.
+		"""
+		self.sample_train_pdf, self.sample_test_pdf = self._get_sample_pdf(self.config_setter)
+
+		array_extra_keys = []
+
+		while True:
+
+			missing_keys = [elem for elem in self._missing_array_sample_keys(array_extra_keys) 
+							if elem not in array_extra_keys]
+
+			if len(missing_keys)==0:
+				return array_extra_keys
+
+			array_extra_keys += missing_keys
+
+	def _missing_array_sample_keys(self, array_extra_keys):
+
+		configs = self.config_setter.user_configs
+		feature_names = next(iter(self.config_setter.feature_names.values()))
+
+		def get_sample_array_data(sample_pdf):
+			return get_array_data(sample_pdf, feature_names, self.config_setter.target_name, 
+								  constants.EF_UUID_NAME, array_extra_keys)
+
+		try:
+			preprocessed_train_data = self.preprocess_train_data(
+				get_sample_array_data(self.sample_train_pdf), configs)
+			preprocessed_test_data = self.preprocess_test_data(
+				get_sample_array_data(self.sample_test_pdf), preprocessed_train_data, configs)
+			self.evaluate_prediction(
+				preprocessed_test_data, 
+				np.zeros(len(preprocessed_test_data.X)))
+
+		except (KeyError, ValueError) as e:
+
+			if isinstance(e, KeyError):
+				missing_keys = [e.args[0]]
+			else:
+				missing_keys = re.findall('^no field of name (.*)$', str(e))
+
+			missing_keys = [elem for elem in missing_keys if elem in self.config_setter.original_colnames]
+
+			# not a column lookup, a failure of the method itself
+			if len(missing_keys)==0:
+				raise
+
+			return missing_keys
+
+		return []
 
 	def _get_sample_pdf(self, config_setter):
 
@@ -227,13 +371,15 @@ class MethodSetter():
 			sample_train_pdf = sample_pdf.iloc[0:train_n]
 			sample_test_pdf = sample_pdf.iloc[train_n:]
 
-		return sample_train_pdf, sample_test_pdf
+		# the task graph hands the methods the rows of a fold with a fresh index, e.g. the 
+		# predictions are aligned with the test data on it
+		return sample_train_pdf.reset_index(drop=True), sample_test_pdf.reset_index(drop=True)
 
 	def key_error_catcher(self, f, *args, **kwargs):
 	
 		try:
-			re = f(*args, **kwargs)
-			return [], re
+			result = f(*args, **kwargs)
+			return [], result
 
 		except KeyError as e:
 
@@ -1,3 +1,4 @@
 from .cross_validation_split import DateRollingWindowSplit
+from .cross_validation_split import DateExpandingWindowSplit
 
-__all__ = ('DateRollingWindowSplit')
\ No newline at end of file
+__all__ = ('DateRollingWindowSplit', 'DateExpandingWindowSplit')
@@ -0,0 +1,40 @@
+from collections import namedtuple
+import numpy as np
+
+
+ArrayData = namedtuple('ArrayData', ['X', 'y', 'uuid', 'extra'])
+ArrayData.__doc__ = """
+What the user methods receive in the "array" pipeline mode instead of a DataFrame.
+[ X ] is the 2d float32 array of the group's feature names (in their order), [ y ] the
+target and [ uuid ] the row keys used to record the predictions. [ extra ] is a
+structured array holding the other columns that the methods were found to read
+(see MethodSetter), e.g. extra['date'].
+
+The preprocess methods return an ArrayData as well, typically through
+data._replace(X=..., y=...).
+"""
+
+
+def make_extra_array(extra_columns, length):
+    """Packs the dict of colname to 1d array (or pd.Categorical) [ extra_columns ] into a
+    structured array of [ length ] rows. Categorical columns become object fields."""
+
+    extra_columns = {k: np.asarray(v) for k, v in extra_columns.items()}
+
+    extra = np.empty(length, dtype=[(k, v.dtype) for k, v in extra_columns.items()])
+
+    for k, v in extra_columns.items():
+        extra[k] = v
+
+    return extra
+
+
+def get_array_data(pdf, feature_names, target_name, uuid_name, extra_keys):
+    """ArrayData of a DataFrame. Used on the MethodSetter sample data only, the task graph
+    reads its ArrayData from the memmaps (DataLoader.load_arrays)."""
+
+    return ArrayData(
+        X=pdf[feature_names].to_numpy(dtype=np.float32),
+        y=pdf[target_name].to_numpy(),
+        uuid=pdf[uuid_name].to_numpy(),
+        extra=make_extra_array({k: pdf[k] for k in extra_keys}, len(pdf)))
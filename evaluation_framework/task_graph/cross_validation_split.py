@@ -22,17 +22,244 @@ __all__ = ['BaseCrossValidator',
            'train_test_split',
            'check_cv',
            'BaseRollingWindowSplit',
-           'DateRollingWindowSplit']
+           'DateRollingWindowSplit',
+           'DateExpandingWindowSplit']
+
+
+FOLD_PLAN_DTYPE = np.dtype([
+    ('group', np.int64),
+    ('fold', np.int64),
+    ('train_start', np.int64),
+    ('train_stop', np.int64),
+    ('test_start', np.int64),
+    ('test_stop', np.int64),
+    ('date_start', np.int64),
+    ('date_stop', np.int64)])
 
 
 def get_cv_splitter(cross_validation_scheme, *args, **kwargs):
 
     if cross_validation_scheme=='date_rolling_window':
         return DateRollingWindowSplit(*args, **kwargs)
+    elif cross_validation_scheme=='date_expanding_window':
+        return DateExpandingWindowSplit(*args, **kwargs)
     elif cross_validation_scheme=='k_fold':
         return KFold(*args, **kwargs)
 
 
+def plan_splits(cross_validation_scheme, orderby, group_offsets, *args, **kwargs):
+    """Fold plan of all the groups at once for the ordered [ cross_validation_scheme ]. 
+    See plan_date_rolling_window_splits."""
+
+    if cross_validation_scheme=='date_rolling_window':
+        return plan_date_rolling_window_splits(orderby, group_offsets, *args, **kwargs)
+    elif cross_validation_scheme=='date_expanding_window':
+        return plan_date_expanding_window_splits(orderby, group_offsets, *args, **kwargs)
+    else:
+        raise ValueError('There is no fold planner for [ cross_validation_scheme ] '
+                         '"{}".'.format(cross_validation_scheme))
+
+
+def plan_date_rolling_window_splits(orderby, group_offsets, num_train_days, num_test_days, 
+                                    min_num_train_days, num_gap_days=0):
+    """Date rolling window folds of every group in one vectorized pass.
+
+    Parameters
+    ----------
+    orderby : 1d int array
+        The orderby (day index) arrays of all the groups concatenated, each group sorted 
+        in ascending order.
+    group_offsets : 1d int array
+        Row offsets of the groups in [ orderby ], of length n_groups + 1.
+
+    Returns
+    -------
+    fold_plan : structured array of FOLD_PLAN_DTYPE
+        One record per fold, ordered by group then fold. The row boundaries are relative 
+        to the start of the group, and [ date_start, date_stop ) is the test date range. 
+        The folds are identical to those of DateRollingWindowSplit on each group.
+    """
+    return _plan_date_window_splits(orderby, group_offsets, num_train_days, num_test_days, 
+                                    min_num_train_days, num_gap_days, anchored=False)
+
+
+def plan_date_expanding_window_splits(orderby, group_offsets, num_train_days, num_test_days, 
+                                      min_num_train_days, num_gap_days=0):
+    """Same as plan_date_rolling_window_splits, with the train windows anchored at the 
+    first day of each group (see DateExpandingWindowSplit)."""
+
+    return _plan_date_window_splits(orderby, group_offsets, num_train_days, num_test_days, 
+                                    min_num_train_days, num_gap_days, anchored=True)
+
+
+def _plan_date_window_splits(orderby, group_offsets, num_train_days, num_test_days, 
+                             min_num_train_days, num_gap_days, anchored):
+
+    orderby = np.asarray(orderby, dtype=np.int64)
+    group_offsets = np.asarray(group_offsets, dtype=np.int64)
+
+    group_sizes = np.diff(group_offsets)
+    n_groups = len(group_sizes)
+    non_empty = group_sizes > 0
+
+    if len(orderby)==0 or not non_empty.any():
+        return np.empty(0, dtype=FOLD_PLAN_DTYPE)
+
+    is_group_head = np.zeros(len(orderby), dtype=bool)
+    is_group_head[group_offsets[:-1][non_empty]] = True
+
+    if np.any((np.diff(orderby) < 0) & ~is_group_head[1:]):
+        raise ValueError('[ orderby ] array must be sorted in ascending order within each group.')
+
+    # everything below works on the first row of each (group, day), which is 
+    # usually far shorter than the rows themselves
+    is_new_day = is_group_head
+    is_new_day[1:] |= orderby[1:] != orderby[:-1]
+    day_rows = np.flatnonzero(is_new_day)
+    day_groups = np.searchsorted(group_offsets, day_rows, side='right') - 1
+
+    # shift days to start at 0 so groups can be laid side by side on a single sorted 
+    # key, with a gap wide enough that no window of one group spills into the next
+    min_date_idx = orderby.min()
+    shifted_orderby = orderby - min_date_idx
+    key_stride = shifted_orderby.max() + num_train_days + num_gap_days + num_test_days + 1
+    day_keys = day_groups * key_stride + shifted_orderby[day_rows]
+    day_rows = np.append(day_rows, len(orderby))
+
+    head_rows = np.minimum(group_offsets[:-1], len(orderby) - 1)
+    tail_rows = np.maximum(group_offsets[1:] - 1, 0)
+    first_date_idx = shifted_orderby[head_rows]
+    last_date_idx = shifted_orderby[tail_rows]
+
+    num_windows = (last_date_idx - first_date_idx - num_train_days - num_gap_days) // num_test_days + 1
+    num_windows = np.where(non_empty, np.maximum(num_windows, 0), 0)
+
+    window_group = np.repeat(np.arange(n_groups), num_windows)
+    window_offsets = np.concatenate(([0], np.cumsum(num_windows)))
+    window_rank = np.arange(window_offsets[-1]) - window_offsets[:-1][window_group]
+
+    head_date_idx = first_date_idx[window_group] + window_rank * num_test_days
+    window_base = window_group * key_stride
+
+    if anchored:
+        train_head_date_idx = first_date_idx[window_group]
+    else:
+        train_head_date_idx = head_date_idx
+
+    test_head_date_idx = head_date_idx + num_train_days + num_gap_days
+    test_tail_date_idx = test_head_date_idx + num_test_days
+
+    train_start_day = np.searchsorted(day_keys, window_base + train_head_date_idx, side='left')
+    train_stop_day = np.searchsorted(day_keys, window_base + head_date_idx + num_train_days, side='left')
+    test_start_day = np.searchsorted(day_keys, window_base + test_head_date_idx, side='left')
+    test_stop_day = np.searchsorted(day_keys, window_base + test_tail_date_idx, side='left')
+
+    num_unique_train_days = train_stop_day - train_start_day
+    valid = (num_unique_train_days >= min_num_train_days) & (test_stop_day > test_start_day)
+
+    fold_group = window_group[valid]
+    fold_group_offsets = np.concatenate(([0], np.cumsum(np.bincount(fold_group, minlength=n_groups))))
+    row_offsets = group_offsets[fold_group]
+
+    fold_plan = np.empty(int(valid.sum()), dtype=FOLD_PLAN_DTYPE)
+    fold_plan['group'] = fold_group
+    fold_plan['fold'] = np.arange(len(fold_plan)) - fold_group_offsets[:-1][fold_group]
+    fold_plan['train_start'] = day_rows[train_start_day[valid]] - row_offsets
+    fold_plan['train_stop'] = day_rows[train_stop_day[valid]] - row_offsets
+    fold_plan['test_start'] = day_rows[test_start_day[valid]] - row_offsets
+    fold_plan['test_stop'] = day_rows[test_stop_day[valid]] - row_offsets
+    fold_plan['date_start'] = test_head_date_idx[valid] + min_date_idx
+    fold_plan['date_stop'] = np.minimum(test_tail_date_idx[valid], last_date_idx[fold_group] + 1) + min_date_idx
+
+    return fold_plan
+
+
+def assign_folds(cross_validation_scheme, group_offsets, num_folds, y=None):
+    """Fold id of every row of all the groups at once for the unordered 
+    [ cross_validation_scheme ]. See assign_k_folds and assign_stratified_k_folds."""
+
+    if cross_validation_scheme=='k_fold':
+        return assign_k_folds(group_offsets, num_folds)
+    elif cross_validation_scheme=='binary_classification':
+        return assign_stratified_k_folds(y, group_offsets, num_folds)
+    else:
+        raise ValueError('There is no fold assigner for [ cross_validation_scheme ] '
+                         '"{}".'.format(cross_validation_scheme))
+
+
+def assign_k_folds(group_offsets, num_folds):
+    """Contiguous k folds of every group, laid out like sklearn KFold (no shuffle): 
+    the first n % k folds of a group of n rows get one extra row.
+
+    Parameters
+    ----------
+    group_offsets : 1d int array
+        Row offsets of the groups, of length n_groups + 1.
+
+    Returns
+    -------
+    fold_assignment : 1d int32 array
+        Test fold id of every row. The train rows of a fold are all the other rows 
+        of its group.
+    n_splits : 1d int64 array
+        Number of usable folds of each group, i.e. folds with both train and test rows. 
+        These are always folds 0 to n_splits - 1.
+    """
+    group_offsets = np.asarray(group_offsets, dtype=np.int64)
+    group_sizes = np.diff(group_offsets)
+
+    row_groups = np.repeat(np.arange(len(group_sizes)), group_sizes)
+    row_ranks = np.arange(group_offsets[-1]) - group_offsets[:-1][row_groups]
+
+    fold_size, num_larger_folds = np.divmod(group_sizes, num_folds)
+    fold_size = fold_size[row_groups]
+    num_larger_folds = num_larger_folds[row_groups]
+    larger_folds_stop = num_larger_folds * (fold_size + 1)
+
+    fold_assignment = np.where(
+        row_ranks < larger_folds_stop, 
+        row_ranks // (fold_size + 1), 
+        num_larger_folds + (row_ranks - larger_folds_stop) // np.maximum(fold_size, 1))
+
+    return _finalize_fold_assignment(fold_assignment, row_groups, group_sizes, num_folds)
+
+
+def assign_stratified_k_folds(y, group_offsets, num_folds):
+    """Stratified k folds of every group: the rows of each class of a group are dealt 
+    to the folds in turn, so that every fold keeps the class balance of the group.
+    See assign_k_folds for the returned values."""
+
+    group_offsets = np.asarray(group_offsets, dtype=np.int64)
+    group_sizes = np.diff(group_offsets)
+
+    _, y_codes = np.unique(np.asarray(y), return_inverse=True)
+    row_groups = np.repeat(np.arange(len(group_sizes)), group_sizes)
+
+    # rows of the same (group, class) become contiguous, in their original order
+    order = np.lexsort((y_codes, row_groups))
+    sorted_keys = row_groups[order] * (y_codes.max(initial=0) + 1) + y_codes[order]
+
+    is_head = np.ones(len(order), dtype=bool)
+    is_head[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    head_positions = np.flatnonzero(is_head)
+    row_ranks = np.arange(len(order)) - np.repeat(head_positions, np.diff(np.append(head_positions, len(order))))
+
+    fold_assignment = np.empty(len(order), dtype=np.int64)
+    fold_assignment[order] = row_ranks % num_folds
+
+    return _finalize_fold_assignment(fold_assignment, row_groups, group_sizes, num_folds)
+
+
+def _finalize_fold_assignment(fold_assignment, row_groups, group_sizes, num_folds):
+
+    # fold sizes never increase with the fold id, so the usable folds are a prefix
+    fold_sizes = np.bincount(row_groups * num_folds + fold_assignment, 
+                             minlength=len(group_sizes) * num_folds).reshape(-1, num_folds)
+    is_usable = (fold_sizes > 0) & (fold_sizes < group_sizes[:, None])
+
+    return fold_assignment.astype(np.int32), is_usable.sum(axis=1)
+
+
 class BaseRollingWindowSplit(metaclass=ABCMeta):
     
     def __init__(self, orderby=None, random_state=None):
@@ -57,56 +284,185 @@ class BaseRollingWindowSplit(metaclass=ABCMeta):
         
 
 class DateRollingWindowSplit(BaseRollingWindowSplit):
+    """Every [ num_test_days ] the train window of [ num_train_days ] days rolls forward, 
+    followed by [ num_gap_days ] embargoed days and the [ num_test_days ] days of test. 
+    Folds with less than [ min_num_train_days ] unique train days or no test row are skipped.
+    """
+
+    # if True the train window is anchored at the first day and only its end moves
+    anchored = False
     
     def __init__(self, num_train_days, num_test_days, min_num_train_days, orderby,
-                 random_state=None):
+                 num_gap_days=0, use_slices=False, random_state=None):
+        """
+        If [ use_slices ] is True, [ orderby ] must be sorted in ascending order (as it is
+        for every HMF group) and the folds are returned as contiguous slice objects instead
+        of index arrays, so that the memmap reads are views rather than fancy-index copies.
+        """
         super().__init__(random_state=random_state, orderby=orderby)
         self.num_train_days = num_train_days
         self.num_test_days = num_test_days
         self.min_num_train_days = min_num_train_days
-    
-    def _iter_indices(self, X, y, groups):
-        
-        n_samples = _num_samples(X)
-        indices = np.arange(n_samples)
-        head_date_idx = self.orderby.min()
-        last_date_idx = self.orderby.max()
+        self.num_gap_days = num_gap_days
+        self.use_slices = use_slices
 
-        while(head_date_idx + self.num_train_days <= last_date_idx):
+        self._fold_table = None
+        self._fold_boundaries = None
 
-            train = indices[(head_date_idx <= self.orderby) & 
-                            (self.orderby < head_date_idx + self.num_train_days)]
+    @property
+    def fold_table(self):
+        """Head date index of every valid fold. It is computed once on first access 
+        and travels with the splitter, so any fold can be looked up directly."""
 
-            test = indices[(head_date_idx + self.num_train_days <= self.orderby) & 
-                           (self.orderby < head_date_idx + self.num_train_days + self.num_test_days)]
+        if self._fold_table is None:
+            self._fold_table = self._build_fold_table()
 
-            current_head_date_idx = head_date_idx
+        return self._fold_table
 
-            head_date_idx += self.num_test_days
+    @property
+    def fold_boundaries(self):
+        """(n_splits, 4) array of train_start, train_stop, test_start, test_stop row 
+        positions for all folds. Only valid for sorted [ orderby ]."""
 
-            num_unique_days = len(np.unique(self.orderby[train]))
+        if self._fold_boundaries is None:
+            self._fold_boundaries = self._build_fold_boundaries()
 
-            if(num_unique_days<self.min_num_train_days or len(test)==0):
+        return self._fold_boundaries
 
-                continue
+    def _get_window_dates(self, head_date_idx):
+        """[ train_head, train_tail ) and [ test_head, test_tail ) date indices of the 
+        windows starting at [ head_date_idx ]."""
+
+        if self.anchored:
+            train_head_date_idx = np.full_like(head_date_idx, self.orderby.min())
+        else:
+            train_head_date_idx = head_date_idx
+
+        train_tail_date_idx = head_date_idx + self.num_train_days
+        test_head_date_idx = train_tail_date_idx + self.num_gap_days
+        test_tail_date_idx = test_head_date_idx + self.num_test_days
+
+        return train_head_date_idx, train_tail_date_idx, test_head_date_idx, test_tail_date_idx
+
+    def _build_fold_table(self):
+        """All the window heads are laid out at once, and the number of unique train days 
+        and test days of each window are read off a cumulative day presence array, so 
+        that no window needs a scan over the whole [ orderby ] array."""
+
+        if self.use_slices and np.any(np.diff(self.orderby) < 0):
+            raise ValueError('[ orderby ] array must be sorted in ascending order '
+                             'in order to use slice based folds.')
+
+        if len(self.orderby)==0:
+            return np.array([], dtype=np.int64)
+
+        first_date_idx = int(self.orderby.min())
+        last_date_idx = int(self.orderby.max())
+        num_days = last_date_idx - first_date_idx + 1
+
+        num_windows = max(0, (last_date_idx - first_date_idx - self.num_train_days - self.num_gap_days) 
+                             // self.num_test_days + 1)
+        head_date_idx = first_date_idx + self.num_test_days * np.arange(num_windows, dtype=np.int64)
+
+        day_presence = np.zeros(num_days, dtype=np.int64)
+        day_presence[self.orderby - first_date_idx] = 1
+        cum_day_presence = np.concatenate(([0], np.cumsum(day_presence)))
+
+        train_start, train_stop, test_start, test_stop = [
+            np.minimum(elem - first_date_idx, num_days) for elem in self._get_window_dates(head_date_idx)]
+
+        num_unique_train_days = cum_day_presence[train_stop] - cum_day_presence[train_start]
+        num_unique_test_days = cum_day_presence[test_stop] - cum_day_presence[test_start]
+
+        valid = (num_unique_train_days >= self.min_num_train_days) & (num_unique_test_days > 0)
+
+        return head_date_idx[valid]
+
+    def _build_fold_boundaries(self):
+
+        fold_boundaries = np.empty((len(self.fold_table), 4), dtype=np.int64)
+
+        for i, window_date_idx in enumerate(self._get_window_dates(self.fold_table)):
+            fold_boundaries[:, i] = np.searchsorted(self.orderby, window_date_idx, side='left')
+
+        return fold_boundaries
+
+    def _get_date_range_bounds(self, head_date_idx):
 
-            yield(train, test, 
-                np.arange(current_head_date_idx + self.num_train_days, 
-                    min(current_head_date_idx + self.num_train_days + self.num_test_days, last_date_idx+1)))
+        _, _, test_head_date_idx, test_tail_date_idx = self._get_window_dates(head_date_idx)
+        last_date_idx = self.orderby.max() if len(self.orderby) else 0
+
+        return test_head_date_idx, np.minimum(test_tail_date_idx, last_date_idx + 1)
+
+    def get_fold_manifest(self):
+        """(n_splits, 6) array holding, for each fold, the train_start, train_stop, 
+        test_start, test_stop row positions followed by the start and stop of its 
+        test date range. This is all that is needed to rebuild any fold, so it can be 
+        stored and looked up in place of the splitter itself."""
+
+        fold_manifest = np.empty((len(self.fold_table), 6), dtype=np.int64)
+        fold_manifest[:, 0:4] = self.fold_boundaries
+        fold_manifest[:, 4], fold_manifest[:, 5] = self._get_date_range_bounds(self.fold_table)
+
+        return fold_manifest
+
+    def get_fold_boundaries(self, cv_split_index):
+        """Returns (train_start, train_stop, test_start, test_stop) row positions of 
+        the [ cv_split_index ]th fold. Only valid for sorted [ orderby ]."""
+
+        return tuple(self.fold_boundaries[cv_split_index])
+
+    def get_fold(self, cv_split_index):
+        """Returns the (train, test, date_range) of the [ cv_split_index ]th fold 
+        without walking through the preceding folds."""
+
+        head_date_idx = self.fold_table[cv_split_index]
+
+        if self.use_slices:
+
+            train_start, train_stop, test_start, test_stop = self.get_fold_boundaries(cv_split_index)
+
+            train = slice(int(train_start), int(train_stop))
+            test = slice(int(test_start), int(test_stop))
+
+        else:
+
+            train_head_date_idx, train_tail_date_idx, test_head_date_idx, test_tail_date_idx = \
+                self._get_window_dates(head_date_idx)
+
+            indices = np.arange(len(self.orderby))
+
+            train = indices[(train_head_date_idx <= self.orderby) & 
+                            (self.orderby < train_tail_date_idx)]
+
+            test = indices[(test_head_date_idx <= self.orderby) & 
+                           (self.orderby < test_tail_date_idx)]
+
+        date_range = np.arange(*self._get_date_range_bounds(head_date_idx))
+
+        return train, test, date_range
+    
+    def _iter_indices(self, X, y, groups):
+
+        for cv_split_index in range(len(self.fold_table)):
+
+            yield self.get_fold(cv_split_index)
             
     def get_n_splits(self, X=None, y=None, groups=None):
         
-        split_cnt = 0
-        
-        for i in self._iter_indices(X=self.orderby, y=None, groups=None):
-            split_cnt+=1
-            
-        return split_cnt
+        return len(self.fold_table)
 
     def split(self, X, y=None, groups=None):
         return super().split(X, y, groups)
 
 
+class DateExpandingWindowSplit(DateRollingWindowSplit):
+    """Anchored version of DateRollingWindowSplit: every train window starts at the first 
+    day and grows by [ num_test_days ] each fold, starting from [ num_train_days ] days."""
+
+    anchored = True
+
+
 def _build_repr(self):
     # XXX This is copied from BaseEstimator's get_params
     cls = self.__class__
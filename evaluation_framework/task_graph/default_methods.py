@@ -61,5 +61,19 @@ def default_model_predict(preprocessed_test_data, trained_estimator, feature_nam
     prediction_result = preprocessed_test_data[[constants.EF_UUID_NAME, constants.EF_PREDICTION_NAME]]    
     return prediction_result
 
+def default_array_model_fit(preprocessed_train_data, hyperparameters, estimator, feature_names, target_name):
+    
+    if hyperparameters is None:
+        estimator.fit(preprocessed_train_data.X, preprocessed_train_data.y)
+    else:
+        estimator.fit(preprocessed_train_data.X, preprocessed_train_data.y, hyperparameters)
+    
+    return estimator
+
+def default_array_model_predict(preprocessed_test_data, trained_estimator, feature_names, target_name):
+    
+    # in the row order of preprocessed_test_data, the task graph keys them by its uuid
+    return trained_estimator.predict(preprocessed_test_data.X)
+
 
 
@@ -1,11 +1,11 @@
 from evaluation_framework.utils.objectIO_utils import load_obj
 from evaluation_framework.utils.memmap_utils import write_memmap
 from evaluation_framework.utils.memmap_utils import read_memmap
+from evaluation_framework.utils.data_structure_utils import get_idx_size
 from evaluation_framework import constants
 
 import HMF
 
-import copy
 import numpy as np
 import pandas as pd
 import os
@@ -23,7 +23,10 @@ class TaskGraph():
     (designable up to the data directory structure)
     """
     
-    def __init__(self, task_manager, cv, verbose=False): 
+    def __init__(self, task_manager, cv=None, verbose=False): 
+        """If [ cv ] is None, the folds are looked up from the fold manifest saved in the
+        store by the data loader, so the task graph does not need to carry any splitter 
+        (and its orderby array) to the workers."""
 
         self.task_manager = task_manager
         self.cv = cv
@@ -46,8 +49,13 @@ class TaskGraph():
 
             try:
                 
-                train_data, test_data, train_idx, test_idx, date_range = self.get_data(group_key, cv_split_index, data_loader)
-                prediction_result, evaluation_result = self.task_graph(train_data, test_data, group_key)
+                # group cache hits and misses of this attempt's reads. Like the sizes and 
+                # the duration, they are kept out of self, which the worker threads share
+                cache_stats = {'hits': 0, 'misses': 0}
+
+                train_data, test_data, train_idx, test_idx, date_range = self.get_data(group_key, cv_split_index, data_loader, cache_stats)
+                prediction_result, evaluation_result, train_data_size, test_data_size, task_duration = self.task_graph(
+                    train_data, test_data, group_key)
 
                 if self.task_manager.return_predictions:
                     self.record_predictions(group_key, cv_split_index, prediction_result, test_data, test_idx)
@@ -62,15 +70,25 @@ class TaskGraph():
 
         if not succeeded:
 
-            train_data, test_data, train_idx, test_idx, date_range = self.get_data(group_key, cv_split_index, data_loader)
-            prediction_result, evaluation_result = self.task_graph(train_data, test_data, group_key)
+            cache_stats = {'hits': 0, 'misses': 0}
+
+            train_data, test_data, train_idx, test_idx, date_range = self.get_data(group_key, cv_split_index, data_loader, cache_stats)
+            prediction_result, evaluation_result, train_data_size, test_data_size, task_duration = self.task_graph(
+                train_data, test_data, group_key)
 
             if self.task_manager.return_predictions:
                 self.record_predictions(group_key, cv_split_index, prediction_result, test_data, test_idx)
 
-        return (group_key, cv_split_index, evaluation_result, self.train_data_size, self.test_data_size, list(date_range), self.task_duration)
+        return (group_key, cv_split_index, evaluation_result, train_data_size, test_data_size, list(date_range), 
+                task_duration, cache_stats['hits'], cache_stats['misses'])
+
+    def run_batch(self, fold_keys, data_loader):
+        """Runs the (group_key, cv_split_index) [ fold_keys ] back to back in one task, and
+        returns the list of their run results."""
 
-    def get_data(self, group_key, cv_split_index, data_loader):
+        return [self.run(group_key, cv_split_index, data_loader) for group_key, cv_split_index in fold_keys]
+
+    def get_data(self, group_key, cv_split_index, data_loader, cache_stats=None):
 
 
 
@@ -85,11 +103,11 @@ class TaskGraph():
         train_idx, test_idx, date_range = self._get_cross_validation_fold_idx(memmap_map, group_key, cv_split_index, data_loader)
 
         if self.verbose:
-            print('train size: {}'.format(len(train_idx)))
-            print('test_size: {}'.format(len(test_idx)))
+            print('train size: {}'.format(get_idx_size(train_idx)))
+            print('test_size: {}'.format(get_idx_size(test_idx)))
 
-        train_data = self._read_memmap(memmap_map, group_key, train_idx, data_loader)
-        test_data = self._read_memmap(memmap_map, group_key, test_idx, data_loader)
+        train_data = self._read_memmap(memmap_map, group_key, train_idx, data_loader, cache_stats)
+        test_data = self._read_memmap(memmap_map, group_key, test_idx, data_loader, cache_stats)
 
         return train_data, test_data, train_idx, test_idx, date_range
 
@@ -105,7 +123,10 @@ class TaskGraph():
             configs)
         if self.verbose: print('Completed preprocess_train_data:', time.time() - start_time)
 
-        self.train_data_size = len(preprocessed_train_data)
+        if self.task_manager.pipeline_mode=='array':
+            train_data_size = len(preprocessed_train_data.X)
+        else:
+            train_data_size = len(preprocessed_train_data)
 
         if self.task_manager.hyperparameters is not None:
             hyperparameters = self.task_manager.hyperparameters[group_key]
@@ -136,61 +157,87 @@ class TaskGraph():
            self.task_manager.target_name)
         if self.verbose: print('Completed model_predict:', time.time() - start_time)
 
-        self.test_data_size = len(prediction_result)
+        test_data_size = len(prediction_result)
+
+        if self.task_manager.pipeline_mode=='array':
+            # the predictions come back in the row order of preprocessed_test_data, key 
+            # them by its uuid the way record_predictions stores them
+            prediction_result = np.column_stack((preprocessed_test_data.uuid, prediction_result))
+            predictions = prediction_result[:, 1]
+        else:
+            predictions = prediction_result[constants.EF_PREDICTION_NAME]
 
         if self.verbose: start_time = time.time()
         evaluation_result = self.task_manager.evaluate_prediction(
            preprocessed_test_data, 
-           prediction_result[constants.EF_PREDICTION_NAME])
+           predictions)
         if self.verbose: print('Completed evaluate_prediction:', time.time() - start_time)
 
-        self.task_duration = time.time() - task_start_time
+        task_duration = time.time() - task_start_time
 
-        return (prediction_result, evaluation_result)
+        return (prediction_result, evaluation_result, train_data_size, test_data_size, task_duration)
         
-    def _read_memmap(self, memmap_map, group_key, data_idx, data_loader):
+    def _read_memmap(self, memmap_map, group_key, data_idx, data_loader, cache_stats=None):
 
-        missing_keys = data_loader.f.get_node_attr('/{}'.format(group_key), key='missing_keys')
-        data_colnames = copy.copy(data_loader.f.get_node_attr('/{}'.format(group_key), key='numeric_keys'))
+        if self.task_manager.pipeline_mode=='array':
+            # no DataFrame at all, X, y and uuid are read as arrays (views with slice folds)
+            return data_loader.load_arrays(
+                group_key, data_idx, 
+                self.task_manager.feature_names[group_key], 
+                self.task_manager.target_name, 
+                self.task_manager.array_extra_keys, 
+                cache_stats=cache_stats)
 
-        data_arrays = [data_loader.f.get_array('/{}/numeric_types'.format(group_key), idx=data_idx)]
+        numeric_keys = data_loader.f.get_node_attr('/{}'.format(group_key), key='numeric_keys')
 
-        for colname in missing_keys['datetime_types']:
+        # only the numeric columns the pipeline reads. With slice folds this is still a 
+        # view on the memmap rather than a copy, and so are the datetime columns
+        col_idx = self._get_numeric_col_idx(group_key, numeric_keys)
 
-            tmp_array = data_loader.f.get_array('/{}/{}'.format(group_key, colname))
+        if self.task_manager.pipeline_mode=='arrow':
+            # the frame keeps the arrow buffers, strings stay dictionary encoded
+            return data_loader.load_table(group_key, data_idx, col_idx=col_idx, 
+                                          cache_stats=cache_stats).to_pandas(types_mapper=pd.ArrowDtype)
 
-            data_arrays.append(tmp_array.reshape(-1, 1))
-            data_colnames.append(colname)
-            
-        data_array = np.hstack(data_arrays)
-        pdf = pd.DataFrame(data_array, columns=data_colnames)
-        
-        for i in range(len(missing_keys['datetime_types'])):
-            pdf.iloc[:, i-1] = pd.to_datetime(pdf.iloc[:, i-1])
-            
-        for colname in missing_keys['str_types']:
+        return data_loader.load_data(group_key, data_idx, col_idx=col_idx, cache_stats=cache_stats)
+    
+    def _get_numeric_col_idx(self, group_key, numeric_keys):
+        """Positions of the feature names, the target and the columns found to be used by 
+        the preprocess methods (MethodSetter) among the stored [ numeric_keys ]. The uuid 
+        has its own array and is always read."""
 
-            tmp_array = data_loader.f.get_array('/{}/{}'.format(group_key, colname))
+        if self.task_manager.preprocess_numeric_keys is None:
+            return list(range(len(numeric_keys)))
 
-            tmp_array = tmp_array.astype(str)
-            pdf[colname] = tmp_array
+        needed_keys = set(self.task_manager.feature_names[group_key])
+        needed_keys.add(self.task_manager.target_name)
+        needed_keys.update(self.task_manager.preprocess_numeric_keys)
+
+        return [i for i, elem in enumerate(numeric_keys) if elem in needed_keys]
 
-        
-        return pdf
-    
     def _get_cross_validation_fold_idx(self, memmap_map, group_key, cv_split_index, data_loader):
 
-        
-        if self.task_manager.orderby:  # have another parameter to check orderby needs to happen...
-            # by cv scheme itself!
-            
-            # need to add random state
 
-            group_ordered_array = data_loader.f.get_array('/{}/orderby_array'.format(group_key))
+        if self.cv is not None:
+
+            # the fold table is built once on the client by get_n_splits and travels 
+            # with the cv object, so we can jump straight to the requested fold
+            train, test, date_range = self.cv.get_fold(cv_split_index)
+
+        else:
 
-            for idx, (train, test, date_range) in enumerate(self.cv.split(group_ordered_array)):
-                if idx == cv_split_index:
-                    break
+            # the unordered schemes look up their precomputed fold ids the same way, so 
+            # no worker ever shuffles or stratifies the group rows itself
+            fold_manifest_name = data_loader.get_fold_manifest_name(
+                self.task_manager.cross_validation_scheme, 
+                self.task_manager.train_window, 
+                self.task_manager.test_window,
+                self.task_manager.min_train_window,
+                self.task_manager.gap_window,
+                self.task_manager.num_folds,
+                self.task_manager.target_name)
+
+            train, test, date_range = data_loader.get_fold(group_key, fold_manifest_name, cv_split_index)
         
         return train, test, date_range
     
@@ -201,10 +248,17 @@ class TaskGraph():
 
         if self.verbose: start_time = time.time()
 
-        test_data_prediction = test_data.merge(prediction_result, on=constants.EF_UUID_NAME, how='inner')
+        if self.task_manager.pipeline_mode=='array':
+
+            # already (uuid, prediction) rows, see task_graph
+            predictions_array = prediction_result.astype(np.float64)
+
+        else:
+
+            test_data_prediction = test_data.merge(prediction_result, on=constants.EF_UUID_NAME, how='inner')
 
-        predictions_array = test_data_prediction[[constants.EF_UUID_NAME, constants.EF_PREDICTION_NAME]]
-        predictions_array = predictions_array.values.astype(np.float64)
+            predictions_array = test_data_prediction[[constants.EF_UUID_NAME, constants.EF_PREDICTION_NAME]]
+            predictions_array = predictions_array.values.astype(np.float64)
 
         filename = '__'.join((group_key, str(cv_split_index))) + '.npy'
         filepath = os.path.join(os.getcwd(), self.task_manager.prediction_records_dirname, filename)
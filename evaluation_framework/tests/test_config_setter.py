@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluation_framework.evaluation_manager_core.config_setter import ConfigSetter
+from evaluation_framework.evaluation_manager_core import config_setter as config_setter_module
+from evaluation_framework.evaluation_manager import EvaluationManager
+from evaluation_framework import constants
+
+
+class Estimator():
+
+    def fit(self, X, y):
+        pass
+
+    def predict(self, X):
+        pass
+
+    def score(self, X, y):
+        pass
+
+
+def make_data():
+
+    rng = np.random.RandomState(0)
+    data = pd.DataFrame({'date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.randint(30, size=100), unit='D'),
+                         'f1': rng.rand(100), 'f2': rng.randint(5, size=100),
+                         'target': rng.rand(100).astype(np.float32)})
+    data.index = data.index + 10
+
+    return data
+
+
+def set_configs(data, setup_mode, tmp_path, config_setter=None, **kwargs):
+
+    config_setter = config_setter or ConfigSetter()
+    config_setter.set_configs(estimator=Estimator(), data=data, target_name='target', feature_names=['f1', 'f2'],
+                              cross_validation_scheme='date_rolling_window', orderby='date', train_window=10,
+                              min_train_window=5, test_window=3, setup_mode=setup_mode, 
+                              local_directory_path=str(tmp_path), **kwargs)
+
+    return config_setter
+
+
+@pytest.mark.parametrize('setup_mode', ['copy', 'inplace'])
+def test_setup_modes_prepare_the_same_data(setup_mode, tmp_path):
+
+    data = make_data()
+    expected = set_configs(make_data(), None, tmp_path).data
+    config_setter = set_configs(data, setup_mode, tmp_path, trace_setup_memory=True)
+
+    pd.testing.assert_frame_equal(config_setter.data, expected)
+    assert config_setter.data[constants.EF_DUMMY_GROUP_COLUMN_NAME].dtype == 'category'
+    assert config_setter.setup_peak_bytes > 0
+
+    if setup_mode=='copy':
+        pd.testing.assert_frame_equal(data, make_data())
+    else:
+        assert config_setter.data is data
+
+
+def test_inplace_setup_can_be_repeated(tmp_path):
+
+    data = make_data()
+    expected = set_configs(make_data(), 'inplace', tmp_path).data
+
+    set_configs(data, 'inplace', tmp_path)
+    config_setter = set_configs(data, 'inplace', tmp_path)
+
+    pd.testing.assert_frame_equal(config_setter.data, expected)
+    assert config_setter.numeric_types == ['f1', 'f2', 'target']
+    assert config_setter.data[constants.EF_UUID_NAME].dtype == np.int64
+    # not traced by default
+    assert config_setter.setup_peak_bytes is None
+
+
+def test_copy_setup_leaves_an_inplace_prepared_frame_alone(tmp_path):
+
+    data = make_data()
+    # leaves the helper columns on [ data ]
+    set_configs(data, 'inplace', tmp_path)
+    prepared = data.copy()
+
+    config_setter = set_configs(data, 'copy', tmp_path)
+
+    pd.testing.assert_frame_equal(data, prepared)
+    assert config_setter.data is not data
+
+
+def test_object_types_are_inferred_once(monkeypatch, tmp_path):
+
+    data = make_data()
+    data['day'] = data['date'].dt.strftime('%Y-%m-%d')
+    # looks like a date column at its head only
+    data['name'] = data['day'].where(np.arange(len(data)) < 10, 'unknown')
+
+    parsed_lengths = []
+    parse_date_str = config_setter_module.parse_date_str
+
+    def counting_parse_date_str(ser):
+        parsed_lengths.append(len(ser))
+        return parse_date_str(ser)
+
+    monkeypatch.setattr(config_setter_module, 'parse_date_str', counting_parse_date_str)
+    monkeypatch.setattr(config_setter_module, 'TYPE_INFERENCE_SAMPLE_SIZE', 20)
+
+    config_setter = set_configs(data.copy(), 'copy', tmp_path)
+
+    assert 'day' in config_setter.datetime_types and config_setter.str_types == ['name']
+    np.testing.assert_array_equal(config_setter.data['day'], data['date'])
+    # both samples, then the whole "day" column, which is reused for the conversion
+    assert parsed_lengths == [20, 100, 20]
+
+    parsed_lengths.clear()
+    config_setter = set_configs(data.copy(), 'copy', tmp_path, config_setter)
+
+    # the verdicts and the parse of "day" are all cached
+    assert parsed_lengths == []
+    assert 'day' in config_setter.datetime_types and config_setter.str_types == ['name']
+    np.testing.assert_array_equal(config_setter.data['day'], data['date'])
+
+
+def test_update_setup_keeps_the_parquet_dataset(monkeypatch, tmp_path):
+
+    data = make_data().reset_index(drop=True)
+    data['group'] = np.where(np.arange(len(data)) < 50, 'a', 'b')
+    data_path = str(tmp_path / 'data.parquet')
+    data.to_parquet(data_path)
+
+    # the sample only holds group "a"
+    monkeypatch.setattr(config_setter_module, 'PARQUET_SAMPLE_SIZE', 20)
+
+    evaluation_manager = EvaluationManager()
+    evaluation_manager.setup_evaluation(
+        estimator=Estimator(), data=data_path, target_name='target', feature_names=['f1', 'f2'],
+        cross_validation_scheme='date_rolling_window', groupby='group', orderby='date', train_window=10,
+        min_train_window=5, test_window=3, local_directory_path=str(tmp_path), 
+        preprocess_train_data=None, preprocess_test_data=None, evaluate_prediction=None)
+
+    evaluation_manager.update_setup(test_window=4)
+
+    assert evaluation_manager.test_window == 4
+    assert evaluation_manager.data_path == data_path
+    assert evaluation_manager.group_keys == ['a', 'b']
+    assert evaluation_manager.orderby_first_date == data['date'].min()
+    assert len(evaluation_manager.data) == 20
+
+
+def test_arrow_pipeline_mode_needs_arrow_dtypes(monkeypatch, tmp_path):
+
+    # pandas < 1.5
+    monkeypatch.delattr(pd, 'ArrowDtype')
+
+    with pytest.raises(ValueError, match='pandas>=1.5'):
+        set_configs(make_data(), None, tmp_path, pipeline_mode='arrow')
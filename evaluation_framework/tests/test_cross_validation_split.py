@@ -0,0 +1,300 @@
+import numpy as np
+import pytest
+
+from sklearn.model_selection import KFold
+
+from evaluation_framework.task_graph.cross_validation_split import DateRollingWindowSplit
+from evaluation_framework.task_graph.cross_validation_split import DateExpandingWindowSplit
+from evaluation_framework.task_graph.cross_validation_split import plan_date_rolling_window_splits
+from evaluation_framework.task_graph.cross_validation_split import plan_date_expanding_window_splits
+from evaluation_framework.task_graph.cross_validation_split import assign_k_folds
+from evaluation_framework.task_graph.cross_validation_split import assign_stratified_k_folds
+
+
+def reference_rolling_window_folds(orderby, num_train_days, num_test_days, min_num_train_days,
+                                   num_gap_days=0, anchored=False):
+    """The original generator based enumeration, kept here as the ground truth, with 
+    the gap days and the anchored train windows added on top."""
+
+    indices = np.arange(len(orderby))
+    first_date_idx = head_date_idx = orderby.min()
+    last_date_idx = orderby.max()
+
+    folds = []
+
+    while(head_date_idx + num_train_days + num_gap_days <= last_date_idx):
+
+        train_head_date_idx = first_date_idx if anchored else head_date_idx
+        test_head_date_idx = head_date_idx + num_train_days + num_gap_days
+
+        train = indices[(train_head_date_idx <= orderby) & (orderby < head_date_idx + num_train_days)]
+        test = indices[(test_head_date_idx <= orderby) &
+                       (orderby < test_head_date_idx + num_test_days)]
+
+        head_date_idx += num_test_days
+
+        if(len(np.unique(orderby[train]))<min_num_train_days or len(test)==0):
+            continue
+
+        folds.append((train, test, np.arange(test_head_date_idx,
+            min(test_head_date_idx + num_test_days, last_date_idx+1))))
+
+    return folds
+
+
+def make_orderby(seed=0, num_days=120, start_day=3):
+
+    rng = np.random.RandomState(seed)
+    days = np.arange(start_day, start_day + num_days)
+    days = days[rng.rand(len(days)) > 0.3]  # missing days
+    counts = rng.randint(1, 4, size=len(days))
+    return np.repeat(days, counts).astype(np.int32)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('windows', [(20, 5, 10), (7, 1, 3), (30, 7, 30), (10, 3, 1), (3, 10, 2), (200, 5, 1)])
+def test_get_fold_matches_reference(seed, windows):
+
+    orderby = make_orderby(seed)
+    cv = DateRollingWindowSplit(*windows, orderby=orderby)
+    expected = reference_rolling_window_folds(orderby, *windows)
+
+    assert cv.get_n_splits() == len(expected)
+
+    for i in np.random.RandomState(seed).permutation(len(expected)):
+
+        train, test, date_range = cv.get_fold(i)
+
+        np.testing.assert_array_equal(train, expected[i][0])
+        np.testing.assert_array_equal(test, expected[i][1])
+        np.testing.assert_array_equal(date_range, expected[i][2])
+
+
+def test_split_yields_every_fold_in_order():
+
+    orderby = make_orderby()
+    cv = DateRollingWindowSplit(20, 5, 10, orderby=orderby)
+    expected = reference_rolling_window_folds(orderby, 20, 5, 10)
+
+    folds = list(cv.split(orderby))
+
+    assert len(folds) == len(expected)
+
+    for (train, test, date_range), (train_, test_, date_range_) in zip(folds, expected):
+
+        np.testing.assert_array_equal(train, train_)
+        np.testing.assert_array_equal(test, test_)
+        np.testing.assert_array_equal(date_range, date_range_)
+
+
+def test_no_folds_when_history_is_too_short():
+
+    orderby = np.arange(5, dtype=np.int32)
+    cv = DateRollingWindowSplit(10, 2, 5, orderby=orderby)
+
+    assert cv.get_n_splits() == 0
+    assert list(cv.split(orderby)) == []
+
+
+@pytest.mark.parametrize('windows', [(20, 5, 10), (7, 1, 3), (10, 3, 1)])
+def test_slice_folds_cover_the_same_rows(windows):
+
+    orderby = make_orderby(3)
+    cv = DateRollingWindowSplit(*windows, orderby=orderby, use_slices=True)
+    expected = reference_rolling_window_folds(orderby, *windows)
+
+    assert cv.get_n_splits() == len(expected)
+
+    for i in range(len(expected)):
+
+        train, test, date_range = cv.get_fold(i)
+
+        assert isinstance(train, slice) and isinstance(test, slice)
+        np.testing.assert_array_equal(np.arange(len(orderby))[train], expected[i][0])
+        np.testing.assert_array_equal(np.arange(len(orderby))[test], expected[i][1])
+        np.testing.assert_array_equal(date_range, expected[i][2])
+
+
+def test_slice_folds_require_sorted_orderby():
+
+    orderby = make_orderby()[::-1]
+    cv = DateRollingWindowSplit(20, 5, 10, orderby=orderby, use_slices=True)
+
+    with pytest.raises(ValueError):
+        cv.get_n_splits()
+
+
+def test_fold_manifest_rebuilds_every_fold():
+
+    orderby = make_orderby(4)
+    cv = DateRollingWindowSplit(20, 5, 10, orderby=orderby, use_slices=True)
+    expected = reference_rolling_window_folds(orderby, 20, 5, 10)
+
+    fold_manifest = cv.get_fold_manifest()
+
+    assert fold_manifest.shape == (len(expected), 6)
+
+    for row, (train, test, date_range) in zip(fold_manifest, expected):
+
+        np.testing.assert_array_equal(np.arange(row[0], row[1]), train)
+        np.testing.assert_array_equal(np.arange(row[2], row[3]), test)
+        np.testing.assert_array_equal(np.arange(row[4], row[5]), date_range)
+
+
+@pytest.mark.parametrize('windows', [(20, 5, 10), (7, 1, 3), (10, 3, 1), (60, 5, 1)])
+def test_multi_group_plan_matches_per_group_folds(windows):
+
+    orderby_arrays = [make_orderby(seed, num_days=40 + 30 * seed, start_day=seed * 5) 
+                      for seed in range(6)]
+    orderby_arrays.insert(2, np.array([], dtype=np.int32))  # empty group
+    group_offsets = np.concatenate(([0], np.cumsum([len(elem) for elem in orderby_arrays])))
+
+    fold_plan = plan_date_rolling_window_splits(np.concatenate(orderby_arrays), group_offsets, *windows)
+
+    for group, orderby in enumerate(orderby_arrays):
+
+        expected = reference_rolling_window_folds(orderby, *windows) if len(orderby) else []
+        group_plan = fold_plan[fold_plan['group']==group]
+
+        assert len(group_plan) == len(expected)
+        np.testing.assert_array_equal(group_plan['fold'], np.arange(len(expected)))
+
+        for row, (train, test, date_range) in zip(group_plan, expected):
+
+            np.testing.assert_array_equal(np.arange(row['train_start'], row['train_stop']), train)
+            np.testing.assert_array_equal(np.arange(row['test_start'], row['test_stop']), test)
+            np.testing.assert_array_equal(np.arange(row['date_start'], row['date_stop']), date_range)
+
+
+def test_multi_group_plan_requires_sorted_groups():
+
+    orderby = np.array([0, 1, 2, 0, 2, 1], dtype=np.int32)
+
+    with pytest.raises(ValueError):
+        plan_date_rolling_window_splits(orderby, [0, 3, 6], 1, 1, 1)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('windows', [(20, 5, 10, 3), (7, 1, 3, 1), (10, 3, 1, 0), (3, 10, 2, 7)])
+@pytest.mark.parametrize('splitter', [DateRollingWindowSplit, DateExpandingWindowSplit])
+def test_gap_and_expanding_folds_match_reference(seed, windows, splitter):
+
+    orderby = make_orderby(seed)
+    num_train_days, num_test_days, min_num_train_days, num_gap_days = windows
+    expected = reference_rolling_window_folds(orderby, num_train_days, num_test_days, min_num_train_days, 
+                                              num_gap_days, anchored=splitter.anchored)
+
+    for use_slices in [False, True]:
+
+        cv = splitter(num_train_days, num_test_days, min_num_train_days, orderby=orderby, 
+                      num_gap_days=num_gap_days, use_slices=use_slices)
+
+        assert cv.get_n_splits() == len(expected)
+
+        for i, (train_, test_, date_range_) in enumerate(expected):
+
+            train, test, date_range = cv.get_fold(i)
+
+            np.testing.assert_array_equal(np.arange(len(orderby))[train], train_)
+            np.testing.assert_array_equal(np.arange(len(orderby))[test], test_)
+            np.testing.assert_array_equal(date_range, date_range_)
+
+
+def test_gap_days_are_left_out_of_train_and_test():
+
+    orderby = np.arange(30, dtype=np.int32)
+    cv = DateRollingWindowSplit(10, 5, 10, orderby=orderby, num_gap_days=2)
+
+    train, test, date_range = cv.get_fold(0)
+
+    np.testing.assert_array_equal(train, np.arange(0, 10))
+    np.testing.assert_array_equal(test, np.arange(12, 17))
+    np.testing.assert_array_equal(date_range, np.arange(12, 17))
+
+
+def test_expanding_train_windows_start_at_the_first_day():
+
+    orderby = np.repeat(np.arange(40), 2).astype(np.int32)
+    cv = DateExpandingWindowSplit(10, 5, 10, orderby=orderby, use_slices=True)
+
+    for i in range(cv.get_n_splits()):
+
+        train, test, _ = cv.get_fold(i)
+
+        assert train == slice(0, 2 * (10 + 5 * i))
+        assert test.start == train.stop
+
+
+@pytest.mark.parametrize('planner, anchored', [(plan_date_rolling_window_splits, False), 
+                                               (plan_date_expanding_window_splits, True)])
+@pytest.mark.parametrize('windows', [(20, 5, 10, 3), (7, 1, 3, 1), (60, 5, 1, 2)])
+def test_multi_group_gap_and_expanding_plan_matches_per_group_folds(planner, anchored, windows):
+
+    orderby_arrays = [make_orderby(seed, num_days=40 + 30 * seed, start_day=seed * 5) 
+                      for seed in range(5)]
+    group_offsets = np.concatenate(([0], np.cumsum([len(elem) for elem in orderby_arrays])))
+
+    fold_plan = planner(np.concatenate(orderby_arrays), group_offsets, *windows)
+
+    for group, orderby in enumerate(orderby_arrays):
+
+        expected = reference_rolling_window_folds(orderby, *windows, anchored=anchored)
+        group_plan = fold_plan[fold_plan['group']==group]
+
+        assert len(group_plan) == len(expected)
+
+        for row, (train, test, date_range) in zip(group_plan, expected):
+
+            np.testing.assert_array_equal(np.arange(row['train_start'], row['train_stop']), train)
+            np.testing.assert_array_equal(np.arange(row['test_start'], row['test_stop']), test)
+            np.testing.assert_array_equal(np.arange(row['date_start'], row['date_stop']), date_range)
+
+
+@pytest.mark.parametrize('num_folds', [2, 3, 5])
+def test_k_fold_assignment_matches_sklearn_k_fold(num_folds):
+
+    group_sizes = [17, 5, 1, 2, 30]
+    group_offsets = np.concatenate(([0], np.cumsum(group_sizes)))
+
+    fold_assignment, n_splits = assign_k_folds(group_offsets, num_folds)
+
+    for group, group_size in enumerate(group_sizes):
+
+        group_fold_assignment = fold_assignment[group_offsets[group]:group_offsets[group + 1]]
+
+        if group_size < 2:
+            assert n_splits[group] == 0
+            continue
+
+        expected = list(KFold(min(num_folds, group_size)).split(np.zeros(group_size)))
+
+        assert n_splits[group] == len(expected)
+
+        for i, (train, test) in enumerate(expected):
+
+            np.testing.assert_array_equal(np.flatnonzero(group_fold_assignment != i), train)
+            np.testing.assert_array_equal(np.flatnonzero(group_fold_assignment == i), test)
+
+
+def test_stratified_assignment_keeps_class_balance():
+
+    rng = np.random.RandomState(0)
+    group_sizes = [40, 23, 2, 9]
+    group_offsets = np.concatenate(([0], np.cumsum(group_sizes)))
+    y = (rng.rand(group_offsets[-1]) > 0.7).astype(np.float32)
+
+    fold_assignment, n_splits = assign_stratified_k_folds(y, group_offsets, 4)
+
+    for group in range(len(group_sizes)):
+
+        group_y = y[group_offsets[group]:group_offsets[group + 1]]
+        group_fold_assignment = fold_assignment[group_offsets[group]:group_offsets[group + 1]]
+
+        for label in np.unique(group_y):
+
+            fold_counts = np.bincount(group_fold_assignment[group_y == label], minlength=4)
+            assert fold_counts.max() - fold_counts.min() <= 1
+
+        for i in range(n_splits[group]):
+
+            assert 0 < np.sum(group_fold_assignment == i) < len(group_y)
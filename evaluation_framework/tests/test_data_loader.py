@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluation_framework.evaluation_engine_core.data_loader import DataLoader
+from evaluation_framework import constants
+
+
+def test_threaded_save_data_writes_every_group(tmp_path):
+
+    rng = np.random.RandomState(0)
+    pdf = pd.DataFrame({'group': rng.choice(['a', 'b', 'c'], 200), 'x': rng.rand(200).astype(np.float32),
+                        'date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.randint(50, size=200), unit='D')})
+    pdf[constants.EF_UUID_NAME] = np.arange(200, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = (pdf['date'] - pdf['date'].min()).dt.days.astype(np.int32)
+    expected = pdf.sort_values(['group', 'date'], kind='stable')
+
+    dirpath = str(tmp_path / 'store')
+    DataLoader(dirpath, overwrite=True).save_data(
+        pdf.copy(), 'date', 'group', ['x'], {'datetime_types': [], 'str_types': []},
+        storage_layout='column_major', num_write_threads=2)
+
+    data_loader = DataLoader(dirpath)
+
+    assert data_loader.f.get_group_names() == ['a', 'b', 'c']
+
+    for group_key in ['a', 'b', 'c']:
+
+        group_pdf = expected[expected['group']==group_key]
+        uuid = data_loader.get_array('/{}/uuid_array'.format(group_key))
+
+        # the helper columns do not promote the float32 feature block
+        assert data_loader.get_array('/{}/numeric_types__0'.format(group_key)).dtype == np.float32
+        assert uuid.dtype == np.int64
+
+        np.testing.assert_array_equal(np.sort(uuid), np.sort(group_pdf[constants.EF_UUID_NAME].values))
+        np.testing.assert_array_equal(data_loader.get_array('/{}/orderby_array'.format(group_key)), 
+                                      np.sort(group_pdf[constants.EF_ORDERBY_NAME].values))
+        np.testing.assert_array_equal(data_loader.get_array('/{}/numeric_types__0'.format(group_key)), 
+                                      pdf.set_index(constants.EF_UUID_NAME)['x'].loc[uuid].values)
+
+
+def test_append_data_matches_a_full_save(tmp_path):
+
+    dates = pd.date_range('2020-01-01', periods=40)
+    pdf = pd.DataFrame({'group': np.repeat(['a', 'b'], 40), 'date': np.tile(dates, 2), 
+                        'x': np.arange(80, dtype=np.float32), 'name': np.tile(['p', 'q'], 40)})
+    # a str value that only shows up in the appended days
+    pdf.loc[pdf['date'] >= dates[35], 'name'] = 'r'
+    pdf[constants.EF_UUID_NAME] = np.arange(80, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = (pdf['date'] - dates[0]).dt.days.astype(np.int32)
+
+    save_args = ('date', 'group', ['x'], {'datetime_types': [], 'str_types': ['name']}, 
+                 'date_rolling_window', 10, 5, 5)
+
+    is_old = pdf['date'] < dates[28]
+
+    data_loader = DataLoader(str(tmp_path / 'appended'), overwrite=True)
+    data_loader.save_data(pdf[is_old].copy(), *save_args, num_write_threads=2)
+    # the new rows come in any order
+    appended_folds = data_loader.append_data(pdf[~is_old].iloc[::-1], 'group')
+
+    full_data_loader = DataLoader(str(tmp_path / 'full'), overwrite=True)
+    full_data_loader.save_data(pdf.copy(), *save_args, num_write_threads=2)
+
+    fold_manifest_name = data_loader.get_fold_manifest_name('date_rolling_window', 10, 5, 5)
+
+    # the 4th fold only tested days 25 to 27 before, the last 2 are new
+    assert appended_folds == {fold_manifest_name: {'a': [3, 4, 5], 'b': [3, 4, 5]}}
+    assert data_loader.get_appended_folds(fold_manifest_name) == {'a': [3, 4, 5], 'b': [3, 4, 5]}
+    assert data_loader.get_num_rows() == 80
+
+    np.testing.assert_array_equal(data_loader.get_array('/{}'.format(fold_manifest_name)), 
+                                  full_data_loader.get_array('/{}'.format(fold_manifest_name)))
+
+    for group_key in ['a', 'b']:
+
+        pd.testing.assert_frame_equal(data_loader.load_data(group_key, slice(None)), 
+                                      full_data_loader.load_data(group_key, slice(None)))
+
+        folds = [data_loader.get_fold(group_key, fold_manifest_name, i) for i in range(6)]
+        train_sizes, test_sizes = data_loader.get_fold_sizes(group_key, fold_manifest_name)
+
+        assert list(train_sizes) == [elem[0].stop - elem[0].start for elem in folds]
+        assert list(test_sizes) == [elem[1].stop - elem[1].start for elem in folds]
+
+    data_loader.clear_appended_folds(fold_manifest_name)
+
+    assert DataLoader(str(tmp_path / 'appended')).get_appended_folds(fold_manifest_name) is None
+
+
+def test_cached_reads_can_be_modified_in_place(tmp_path):
+
+    pdf = pd.DataFrame({'group': 'a', 'x': np.arange(20, dtype=np.float32), 
+                        'date': pd.date_range('2020-01-01', periods=20)})
+    pdf[constants.EF_UUID_NAME] = np.arange(20, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = np.arange(20, dtype=np.int32)
+
+    dirpath = str(tmp_path / 'store')
+    DataLoader(dirpath, overwrite=True).save_data(
+        pdf.copy(), 'date', 'group', ['x'], {'datetime_types': [], 'str_types': []},
+        storage_layout='column_major', num_write_threads=2)
+
+    data_loader = DataLoader(dirpath, group_cache_bytes=10**6)
+
+    for idx in [slice(5, 15), np.arange(5, 15)]:
+
+        data = data_loader.load_data('a', idx)
+        data['x'] *= 2
+
+        expected = data_loader.load_data('a', idx)
+        np.testing.assert_array_equal(expected['x'].values, np.arange(5, 15, dtype=np.float32))
+
+    assert data_loader.get_group_cache().hits > 0
+
+
+def test_stratified_folds_follow_the_target(tmp_path):
+
+    pdf = pd.DataFrame({'group': 'a', 'y1': (np.arange(40) < 10).astype(np.float32), 
+                        'y2': (np.arange(40) >= 30).astype(np.float32)})
+    pdf[constants.EF_UUID_NAME] = np.arange(40, dtype=np.int64)
+
+    data_loader = DataLoader(str(tmp_path / 'store'), overwrite=True)
+    data_loader.save_data(pdf, None, 'group', ['y1', 'y2'], {'datetime_types': [], 'str_types': []},
+                          'binary_classification', num_folds=5, target_name='y1', num_write_threads=2)
+
+    fold_manifest_name = data_loader.save_fold_manifest('binary_classification', None, None, None, 
+                                                        num_folds=5, target_name='y2')
+
+    assert fold_manifest_name != data_loader.get_fold_manifest_name('binary_classification', None, None, None, 
+                                                                    num_folds=5, target_name='y1')
+
+    # every test fold holds two of the ten positives of the new target
+    uuid = data_loader.get_uuid_column('a')
+
+    for i in range(5):
+        test_idx = data_loader.get_fold('a', fold_manifest_name, i)[1]
+        assert pdf['y2'].values[uuid[test_idx]].sum() == 2
+
+
+def test_parquet_groups_match_a_dataframe_save(tmp_path):
+
+    rng = np.random.RandomState(0)
+    # sorted as str these would be 10, 2, 33
+    pdf = pd.DataFrame({'group': rng.choice([33, 2, 10], 200), 'x': rng.rand(200).astype(np.float32),
+                        'date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.randint(50, size=200), unit='D')})
+    data_path = str(tmp_path / 'data.parquet')
+    pdf.to_parquet(data_path)
+
+    memory_pdf = pdf.copy()
+    memory_pdf[constants.EF_UUID_NAME] = np.arange(200, dtype=np.int64)
+    memory_pdf[constants.EF_ORDERBY_NAME] = (pdf['date'] - pdf['date'].min()).dt.days.astype(np.int32)
+
+    missing_keys = {'datetime_types': [], 'str_types': []}
+    DataLoader(str(tmp_path / 'memory'), overwrite=True).save_data(
+        memory_pdf, 'date', 'group', ['x'], missing_keys, num_write_threads=2)
+    DataLoader(str(tmp_path / 'parquet'), overwrite=True).save_parquet_data(
+        data_path, 'date', 'group', ['x'], missing_keys, orderby_first_date=pdf['date'].min(), batch_size=64)
+
+    memory_loader = DataLoader(str(tmp_path / 'memory'))
+    parquet_loader = DataLoader(str(tmp_path / 'parquet'))
+
+    assert parquet_loader.f.get_group_names() == memory_loader.f.get_group_names() == [2, 10, 33]
+    np.testing.assert_array_equal(parquet_loader.f.get_group_sizes(), memory_loader.f.get_group_sizes())
+
+    for group_key in [2, 10, 33]:
+        np.testing.assert_array_equal(np.sort(parquet_loader.get_array('/{}/uuid_array'.format(group_key))),
+                                      np.sort(memory_loader.get_array('/{}/uuid_array'.format(group_key))))
+
+
+def test_group_keys_cannot_contain_node_separators(tmp_path):
+
+    pdf = pd.DataFrame({'group': ['a', 'b/c'], 'x': np.float32([1, 2]), 'date': pd.to_datetime(['2020-01-01'] * 2)})
+    data_path = str(tmp_path / 'data.parquet')
+    pdf.to_parquet(data_path)
+
+    with pytest.raises(ValueError, match='b/c'):
+        DataLoader(str(tmp_path / 'parquet'), overwrite=True).save_parquet_data(
+            data_path, 'date', 'group', ['x'], {'datetime_types': [], 'str_types': []})
@@ -0,0 +1,94 @@
+import time
+
+from dask.distributed import Client
+from dask.distributed import LocalCluster
+
+from evaluation_framework.evaluation_engine_core.parallel.dask_client import DaskClient
+from evaluation_framework.evaluation_engine_core.parallel.dask_client_future import DualClientFuture
+from evaluation_framework.evaluation_engine_core.parallel.dask_client_future import get_least_loaded_client
+
+
+def add_offset(x, data):
+
+    time.sleep(0.02)
+    return x + data['offset']
+
+
+def test_tasks_go_where_they_finish_first():
+
+    assert get_least_loaded_client([0, 0], [1, 3]) == 1
+    # 4 tasks at 3/s take longer than 1 at 1/s
+    assert get_least_loaded_client([0, 3], [1, 3]) == 0
+
+    in_flight = [0, 0]
+
+    for _ in range(40):
+        in_flight[get_least_loaded_client(in_flight, [1, 3])] += 1
+
+    # split by the throughputs
+    assert in_flight == [10, 30]
+
+
+def test_both_clusters_run_the_tasks():
+
+    # a one thread cluster stands in for the local one, a three thread one for yarn
+    local_cluster = LocalCluster(n_workers=1, threads_per_worker=1, processes=False, dashboard_address=None)
+    yarn_cluster = LocalCluster(n_workers=1, threads_per_worker=3, processes=False, dashboard_address=None)
+
+    dual_client = DualClientFuture(local_cluster=local_cluster, yarn_cluster=yarn_cluster)
+
+    try:
+
+        data_scattered = dual_client.scatter({'offset': 100})[0]
+
+        futures = [dual_client.submit(add_offset, i, data_scattered, pure=False) for i in range(40)]
+        # submit does not wait for the tasks
+        assert sum(dual_client.in_flight) > 0
+
+        dual_client.wait(futures)
+        assert [elem.result() for elem in futures] == [i + 100 for i in range(40)]
+        assert dual_client.in_flight == [0, 0]
+
+        # both clusters ran some of them, the split itself depends on their timing
+        assert sum(dual_client.completed) == 40
+        assert min(dual_client.completed) > 0
+
+        assert len(dual_client.nthreads()) == 2
+
+        # scattered futures passed by keyword reach the yarn tasks too
+        futures = [dual_client.submit(add_offset, i, data=data_scattered, pure=False) for i in range(8)]
+        dual_client.wait(futures)
+        assert [elem.result() for elem in futures] == [i + 100 for i in range(8)]
+
+    finally:
+
+        dual_client.local_client.close()
+        dual_client.yarn_client.close()
+        local_cluster.close()
+        yarn_cluster.close()
+
+
+def test_released_futures_are_dropped_by_key():
+
+    cluster = LocalCluster(n_workers=1, threads_per_worker=1, processes=False, dashboard_address=None)
+    client = Client(cluster)
+
+    dask_client = DaskClient()
+    dask_client.start_dask_client(dask_client=client)
+
+    try:
+
+        futures = [dask_client.submit(add_offset, i, {'offset': 100}) for i in range(3)]
+        assert list(dask_client.futures) == [elem.key for elem in futures]
+
+        dask_client.release(futures[0])
+        # a new future may reuse the id of the released one, not its key
+        future = dask_client.submit(add_offset, 3, {'offset': 100})
+
+        assert list(dask_client.futures) == [elem.key for elem in futures[1:] + [future]]
+        assert [elem.result() for elem in dask_client.futures.values()] == [101, 102, 103]
+
+    finally:
+
+        client.close()
+        cluster.close()
@@ -0,0 +1,95 @@
+import threading
+
+from dask.distributed import Client
+from dask.distributed import LocalCluster
+from dask.distributed import as_completed
+
+from evaluation_framework.evaluation_engine import EvaluationEngine
+from evaluation_framework.evaluation_engine_core.parallel.dask_client import DaskClient
+from evaluation_framework.evaluation_engine_core.fold_batching import get_fold_batch_size
+from evaluation_framework.evaluation_engine_core.fold_batching import get_fold_batches
+
+
+def test_batch_size_follows_the_fold_duration():
+
+    # 10ms folds make batches of about a second
+    assert get_fold_batch_size(0.01, 100000, 8) == 100
+    # slow folds are run one per task
+    assert get_fold_batch_size(5.0, 100000, 8) == 1
+    # but every thread still gets a few batches
+    assert get_fold_batch_size(0.001, 320, 8) == 10
+    assert get_fold_batch_size(0.001, 10, 8) == 1
+
+
+def test_batches_keep_the_folds_of_a_group_together():
+
+    fold_keys = [('a', 0), ('a', 1), ('a', 2), ('b', 0), ('c', 0)]
+
+    assert get_fold_batches(fold_keys, 2) == [[('a', 0), ('a', 1)], [('a', 2), ('b', 0)], [('c', 0)]]
+    assert get_fold_batches(fold_keys, 10) == [fold_keys]
+
+
+# holds the pilot folds until the test lets them finish
+PILOT_GATE = threading.Event()
+
+
+class PilotTaskGraph():
+
+    def run_batch(self, fold_keys, data_loader):
+
+        if fold_keys[0][1] < 2:
+            PILOT_GATE.wait(10)
+
+        # (group_key, cv_split_index, eval_result, train_size, test_size, test_idx, duration)
+        return [(group_key, i, 0.0, 1, 1, [], 0.001) for group_key, i in fold_keys]
+
+
+class LocalClientFuture():
+    """The part of ClientFuture the engine uses, on an in-process cluster."""
+
+    def __init__(self, cluster):
+        self.local_client = Client(cluster)
+
+    def submit(self, func, *args, **kwargs):
+        return self.local_client.submit(func, *args, **kwargs)
+
+    def nthreads(self):
+        return self.local_client.nthreads()
+
+    def as_completed(self, futures):
+        return as_completed(futures)
+
+
+def test_auto_batches_are_submitted_without_waiting_for_the_pilots():
+
+    cluster = LocalCluster(n_workers=1, threads_per_worker=2, processes=False, dashboard_address=None)
+    client_future = LocalClientFuture(cluster)
+
+    evaluation_engine = EvaluationEngine(local_client_n_workers=1, local_client_threads_per_worker=2, 
+                                         use_dashboard=False, fold_batch_size='auto')
+    evaluation_engine.dask_client = DaskClient()
+    evaluation_engine.dask_client.start_dask_client(dask_client=client_future)
+    evaluation_engine.data_loader_scattered = None
+
+    try:
+
+        PILOT_GATE.clear()
+        evaluation_engine._submit_folds(PilotTaskGraph(), 'fold_manifest', [('a', i) for i in range(42)])
+
+        # only the two pilot folds are out while they run
+        assert len(evaluation_engine.run_futures) == 2
+        assert evaluation_engine.tuned_fold_batch_size is None
+
+        PILOT_GATE.set()
+        evaluation_engine._wait_fold_submission()
+
+        # the other 40 folds in batches of 40 // (2 threads * 4 batches each)
+        assert evaluation_engine.tuned_fold_batch_size == 5
+        assert len(evaluation_engine.run_futures) == 2 + 8
+        assert len(evaluation_engine.dask_client.get_results()) == 42
+
+    finally:
+
+        PILOT_GATE.set()
+        client_future.local_client.close()
+        cluster.close()
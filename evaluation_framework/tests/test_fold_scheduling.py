@@ -0,0 +1,36 @@
+import pytest
+
+from evaluation_framework.evaluation_engine_core.fold_scheduling import get_fold_costs
+from evaluation_framework.evaluation_engine_core.fold_scheduling import get_largest_first_schedule
+from evaluation_framework.evaluation_engine_core.fold_scheduling import get_group_affinity
+
+
+def test_recorded_durations_calibrate_the_other_folds():
+
+    fold_work = {('a', 0): 100.0, ('a', 1): 200.0, ('b', 0): 50.0}
+
+    fold_costs, in_seconds = get_fold_costs(fold_work, {})
+    assert (fold_costs, in_seconds) == (fold_work, False)
+
+    fold_costs, in_seconds = get_fold_costs(fold_work, {('a', 0): 2.0, ('a', 1): 3.0})
+    assert in_seconds
+    assert fold_costs[('a', 1)] == 3.0
+    assert fold_costs[('b', 0)] == pytest.approx(50.0 * 5.0 / 300.0)
+
+
+def test_largest_first_schedule():
+
+    order, makespan = get_largest_first_schedule([1, 5, 2, 4, 3], 2)
+
+    assert order == [1, 3, 4, 2, 0]
+    # 5 + 2 on one thread, 4 + 3 + 1 on the other
+    assert makespan == 8
+
+
+def test_groups_are_spread_over_the_workers_by_size():
+
+    group_sizes = {'a': 100, 'b': 60, 'c': 50, 'd': 10}
+    group_affinity = get_group_affinity(group_sizes, ['tcp://w2', 'tcp://w1'])
+
+    assert group_affinity == {'a': 'tcp://w1', 'b': 'tcp://w2', 'c': 'tcp://w2', 'd': 'tcp://w1'}
+    assert get_group_affinity(group_sizes, ['tcp://w1', 'tcp://w2']) == group_affinity
@@ -0,0 +1,45 @@
+import numpy as np
+
+from evaluation_framework.evaluation_engine_core.group_cache import GroupCache
+
+
+def test_hits_and_misses_are_counted():
+
+    cache = GroupCache(1000)
+    cache_stats = {}
+    loads = []
+
+    def load():
+        loads.append(1)
+        return np.zeros(10)
+
+    for _ in range(3):
+        cache.get('a', load, cache_stats)
+
+    assert len(loads) == 1
+    assert cache_stats == {'misses': 1, 'hits': 2}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_is_evicted_first():
+
+    cache = GroupCache(3 * 80)
+
+    for key in ['a', 'b', 'c']:
+        cache.get(key, lambda: np.zeros(10))
+
+    cache.get('a', lambda: np.zeros(10))  # a is now the most recent
+    cache.get('d', lambda: np.zeros(10))
+
+    assert list(cache.entries) == ['c', 'a', 'd']
+    assert cache.nbytes == 3 * 80
+
+
+def test_arrays_over_budget_are_not_cached():
+
+    cache = GroupCache(100)
+
+    value = cache.get('a', lambda: np.zeros(20))
+
+    assert len(value) == 20
+    assert len(cache.entries) == 0 and cache.nbytes == 0
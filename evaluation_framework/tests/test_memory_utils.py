@@ -0,0 +1,42 @@
+import tracemalloc
+
+import numpy as np
+
+from evaluation_framework.utils import memory_utils
+from evaluation_framework.utils.memory_utils import trace_peak_bytes
+
+
+def test_peak_bytes_are_traced_on_request():
+
+    with trace_peak_bytes(enabled=False) as memory_stats:
+        np.ones(2**20)
+
+    assert memory_stats['peak_bytes'] is None
+    assert not tracemalloc.is_tracing()
+
+    with trace_peak_bytes() as memory_stats:
+        np.ones(2**20)
+
+    assert memory_stats['peak_bytes'] >= 8 * 2**20
+    assert not tracemalloc.is_tracing()
+
+
+def test_peak_is_restarted_without_reset_peak(monkeypatch):
+
+    # python < 3.9
+    monkeypatch.delattr(memory_utils.tracemalloc, 'reset_peak')
+
+    tracemalloc.start()
+
+    try:
+        np.ones(2**22)
+
+        with trace_peak_bytes() as memory_stats:
+            np.ones(2**20)
+
+        # the earlier, larger array is not part of the peak
+        assert 8 * 2**20 <= memory_stats['peak_bytes'] < 8 * 2**22
+        assert tracemalloc.is_tracing()
+
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluation_framework import constants
+from evaluation_framework.evaluation_manager_core.method_setter import MethodSetter
+from evaluation_framework.utils.memmap_utils import get_2d_idx
+from evaluation_framework.task_graph.array_data import get_array_data
+from evaluation_framework.task_graph.default_methods import default_array_model_fit
+
+
+def make_config_setter():
+
+    data = pd.DataFrame(np.random.RandomState(0).rand(40, 5).astype(np.float32), 
+                        columns=['f1', 'f2', 'weight', 'unused', 'target'])
+    data['grp'] = 'a'
+    data[constants.EF_UUID_NAME] = np.arange(len(data), dtype=np.int64)
+
+    return SimpleNamespace(
+        data=data, groupby='grp', target_name='target', user_configs=dict(), 
+        numeric_types=['f1', 'f2', 'weight', 'unused', 'target'],
+        datetime_types=[], str_types=[], original_colnames=['f1', 'f2', 'weight', 'unused', 'target', 'grp'], 
+        feature_names={'a': ['f1', 'f2']}, pipeline_mode='dataframe')
+
+
+def test_preprocess_numeric_keys_only_holds_the_columns_read():
+
+    def preprocess_train_data(train_data, configs):
+        train_data['f1'] = train_data['f1'] * train_data[['f2']].values[:, 0]
+        return train_data
+
+    def evaluate_prediction(test_data, prediction):
+        return np.average(test_data['target'] - prediction, weights=test_data['weight'])
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=make_config_setter(), preprocess_train_data=preprocess_train_data, 
+                              preprocess_test_data=None, evaluate_prediction=evaluate_prediction)
+
+    assert sorted(method_setter.preprocess_numeric_keys) == ['f1', 'f2', 'weight']
+
+
+def test_default_methods_need_no_extra_numeric_keys():
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=make_config_setter(), preprocess_train_data=None, 
+                              preprocess_test_data=None, evaluate_prediction=None)
+
+    assert method_setter.preprocess_numeric_keys == []
+
+
+def test_all_numeric_keys_are_read_when_the_columns_read_are_unknown():
+
+    def model_fit(preprocessed_train_data, hyperparameters, estimator, feature_names, target_name):
+        estimator.fit(preprocessed_train_data[feature_names], preprocessed_train_data[target_name], 
+                      sample_weight=preprocessed_train_data['weight'])
+        return estimator
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=make_config_setter(), preprocess_train_data=None, 
+                              preprocess_test_data=None, model_fit=model_fit, evaluate_prediction=None)
+
+    assert method_setter.preprocess_numeric_keys is None
+
+    def preprocess_train_data(train_data, configs):
+        # positional, fails with an IndexError rather than a KeyError on fewer columns
+        train_data['f1'] = train_data['f1'] * train_data.iloc[:, 3]
+        return train_data
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=make_config_setter(), preprocess_train_data=preprocess_train_data, 
+                              preprocess_test_data=None, evaluate_prediction=None)
+
+    assert method_setter.preprocess_numeric_keys is None
+
+
+def test_2d_idx_reads_the_same_values():
+
+    array = np.arange(60).reshape(10, 6)
+
+    for idx in [slice(2, 7), np.array([0, 3, 4, 9]), None]:
+        for col_idx in [[1, 2, 3], [0, 2, 5]]:
+
+            expected = array[idx if idx is not None else slice(None)][:, col_idx]
+            np.testing.assert_array_equal(array[get_2d_idx(idx, col_idx)], expected)
+
+    assert np.shares_memory(array[get_2d_idx(slice(2, 7), [1, 2, 3])], array)
+
+
+def test_every_datetime_and_str_column_read_is_detected():
+
+    config_setter = make_config_setter()
+    config_setter.data['date'] = pd.date_range('2020-01-01', periods=len(config_setter.data))
+    config_setter.data['name'] = 'x'
+    config_setter.datetime_types = ['date']
+    config_setter.str_types = ['grp', 'name']
+    config_setter.original_colnames += ['date', 'name']
+
+    def preprocess_train_data(train_data, configs):
+        train_data['f1'] = train_data['f1'] + (train_data['name']=='x') * train_data['date'].dt.day
+        return train_data
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=config_setter, preprocess_train_data=preprocess_train_data, 
+                              preprocess_test_data=None, evaluate_prediction=None)
+
+    assert method_setter.missing_keys == {'datetime_types': ['date'], 'str_types': ['name']}
+    assert method_setter.num_types_needed == 3
+
+
+def test_array_mode_extra_keys_hold_the_columns_read():
+
+    config_setter = make_config_setter()
+    config_setter.pipeline_mode = 'array'
+    config_setter.data['date'] = pd.date_range('2020-01-01', periods=len(config_setter.data))
+    config_setter.datetime_types = ['date']
+    config_setter.original_colnames += ['date']
+
+    def preprocess_train_data(train_data, configs):
+        return train_data._replace(X=train_data.X * train_data.extra['date'].astype('M8[D]').astype(np.float32)[:, None])
+
+    def evaluate_prediction(test_data, prediction):
+        return np.average(test_data.y - prediction, weights=test_data.extra[['weight']]['weight'])
+
+    method_setter = MethodSetter()
+    method_setter.set_methods(config_setter=config_setter, preprocess_train_data=preprocess_train_data, 
+                              preprocess_test_data=None, evaluate_prediction=evaluate_prediction)
+
+    assert method_setter.array_extra_keys == ['date', 'weight']
+    assert method_setter.preprocess_numeric_keys == ['weight']
+    assert method_setter.missing_keys == {'datetime_types': ['date'], 'str_types': []}
+    assert method_setter.model_fit is default_array_model_fit
+
+
+def test_array_data_extra_fields_keep_their_dtypes():
+
+    pdf = make_config_setter().data
+    pdf['date'] = pd.date_range('2020-01-01', periods=len(pdf))
+
+    array_data = get_array_data(pdf, ['f2', 'f1'], 'target', constants.EF_UUID_NAME, ['date', 'grp', 'weight'])
+
+    np.testing.assert_array_equal(array_data.X, pdf[['f2', 'f1']].values)
+    np.testing.assert_array_equal(array_data.extra['date'], pdf['date'].values)
+    assert array_data.extra.dtype.names == ('date', 'grp', 'weight')
+    assert array_data.extra['grp'].dtype == object and array_data.extra['weight'].dtype == np.float32
+
+
+@pytest.mark.parametrize('pipeline_mode', ['dataframe', 'array'])
+def test_method_errors_are_raised_at_setup(pipeline_mode):
+
+    config_setter = make_config_setter()
+    config_setter.pipeline_mode = pipeline_mode
+
+    def preprocess_train_data(train_data, configs):
+        raise ZeroDivisionError('bug in the preprocess method')
+
+    method_setter = MethodSetter()
+
+    with pytest.raises(ZeroDivisionError, match='bug in the preprocess method'):
+        method_setter.set_methods(config_setter=config_setter, preprocess_train_data=preprocess_train_data, 
+                                  preprocess_test_data=None, evaluate_prediction=None)
+
+    def evaluate_prediction(test_data, prediction):
+        raise ValueError('bug in the evaluate method')
+
+    method_setter = MethodSetter()
+
+    with pytest.raises(ValueError, match='bug in the evaluate method'):
+        method_setter.set_methods(config_setter=config_setter, preprocess_train_data=None, 
+                                  preprocess_test_data=None, evaluate_prediction=evaluate_prediction)
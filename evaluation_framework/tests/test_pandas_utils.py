@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from evaluation_framework.utils.pandas_utils import encode_datetime2int64
+from evaluation_framework.utils.pandas_utils import view_int64_as_datetime
+from evaluation_framework.utils.pandas_utils import get_str_categories
+from evaluation_framework.utils.pandas_utils import encode_str2codes
+from evaluation_framework.utils.pandas_utils import decode_codes2categorical
+from evaluation_framework.utils.pandas_utils import hash_dataframe
+
+
+def test_datetime_round_trip_is_a_view():
+
+    ser = pd.Series([pd.Timestamp('2020-01-01'), pd.NaT, pd.Timestamp('2021-06-30 12:00')])
+
+    encoded = encode_datetime2int64(ser)
+    decoded = view_int64_as_datetime(encoded[1:])
+
+    assert encoded.dtype == np.int64
+    assert np.shares_memory(decoded, encoded)
+    np.testing.assert_array_equal(decoded, ser.values[1:])
+
+
+def test_str_codes_decode_to_categorical():
+
+    ser = pd.Series(['b', 'a', None, 'c', 'a'])
+    categories = get_str_categories(ser)
+
+    codes = encode_str2codes(ser.iloc[[3, 2, 1]], categories)
+    decoded = decode_codes2categorical(codes, categories)
+
+    assert list(categories) == ['a', 'b', 'c']
+    assert isinstance(decoded, pd.Categorical)
+    assert list(decoded.astype(object)[[0, 2]]) == ['c', 'a']
+    assert pd.isnull(decoded[1])
+
+
+def test_hash_of_the_columns_does_not_depend_on_the_chunks():
+
+    pdf = pd.DataFrame({'a': np.arange(10), 'b': list('abcdefghij'), 'c': np.arange(10, dtype=np.float32)})
+    pdf_hash = hash_dataframe(pdf[['a', 'b']])
+
+    assert hash_dataframe(pdf, ['a', 'b']) == pdf_hash
+    assert hash_dataframe(pdf, ['a', 'b'], chunk_size=3) == pdf_hash
+    assert hash_dataframe(pdf, ['a', 'c']) != pdf_hash
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from evaluation_framework.utils.parquet_utils import is_parquet_path
+from evaluation_framework.utils.parquet_utils import read_parquet_head
+from evaluation_framework.utils.parquet_utils import iter_parquet_batches
+from evaluation_framework.utils.memmap_utils import create_memmap
+from evaluation_framework.utils.memmap_utils import write_memmap_rows
+from evaluation_framework.utils.memmap_utils import read_memmap
+
+
+def test_parquet_batches_stream_every_row(tmp_path):
+
+    pdf = pd.DataFrame({'a': np.arange(100), 'b': np.arange(100) * 0.5})
+    filepath = str(tmp_path / 'data.parquet')
+    pdf.to_parquet(filepath, row_group_size=30)
+
+    batches = list(iter_parquet_batches(filepath, columns=['b'], batch_size=25))
+
+    assert is_parquet_path(filepath) and is_parquet_path(str(tmp_path))
+    assert not is_parquet_path(pdf)
+    assert all(len(batch) <= 25 and list(batch.columns) == ['b'] for batch in batches)
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), pdf[['b']])
+    pd.testing.assert_frame_equal(read_parquet_head(filepath, 10), pdf.head(10))
+
+
+def test_memmap_rows_are_written_in_place(tmp_path):
+
+    filepath = str(tmp_path / 'array')
+    array = np.arange(24, dtype=np.float32).reshape(8, 3)
+
+    create_memmap(filepath, np.float32, (8, 3))
+    write_memmap_rows(filepath, array[5:], 5)
+    write_memmap_rows(filepath, array[:5], 0)
+
+    np.testing.assert_array_equal(read_memmap(filepath, np.float32, (8, 3)), array)
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+import os
+
+import numpy as np
+import pandas as pd
+
+from evaluation_framework.evaluation_engine_core.data_loader import DataLoader
+from evaluation_framework.evaluation_manager import EvaluationManager
+from evaluation_framework.evaluation_engine import EvaluationEngine
+from evaluation_framework.evaluation_engine_core.store_cache import get_store_key
+from evaluation_framework.evaluation_engine_core.store_cache import is_verified_store
+from evaluation_framework.evaluation_engine_core.store_cache import commit_store
+from evaluation_framework import constants
+
+
+class Estimator():
+
+    def fit(self, X, y):
+        self.mean = float(np.mean(y))
+
+    def predict(self, X):
+        return np.full(len(X), self.mean)
+
+    def score(self, X, y):
+        pass
+
+
+def make_evaluation_manager(data, **kwargs):
+
+    evaluation_manager = SimpleNamespace(
+        data=data, data_path=None, original_colnames=list(data.columns), numeric_types=['x'], 
+        missing_keys={'datetime_types': [], 'str_types': []}, groupby='group', orderby='date', 
+        storage_layout='row_major', store_key=None)
+    evaluation_manager.__dict__.update(kwargs)
+
+    return evaluation_manager
+
+
+def test_store_key_is_content_addressed():
+
+    pdf = pd.DataFrame({'group': ['a', 'b'] * 5, 'x': np.arange(10, dtype=np.float32), 
+                        'date': pd.date_range('2020-01-01', periods=10)})
+    store_key = get_store_key(make_evaluation_manager(pdf))
+
+    # the helper columns are not part of the data
+    pdf_copy = pdf.copy()
+    pdf_copy[constants.EF_UUID_NAME] = np.arange(10, dtype=np.int64)
+    assert get_store_key(make_evaluation_manager(pdf_copy, original_colnames=['group', 'x', 'date'])) == store_key
+
+    pdf_copy = pdf.copy()
+    pdf_copy.loc[3, 'x'] = 0
+    assert get_store_key(make_evaluation_manager(pdf_copy)) != store_key
+    assert get_store_key(make_evaluation_manager(pdf, storage_layout='column_major')) != store_key
+    assert get_store_key(make_evaluation_manager(pdf, groupby=None)) != store_key
+
+
+def test_commit_store_verifies_and_moves_the_store(tmp_path):
+
+    pdf = pd.DataFrame({'group': ['a', 'b'] * 5, 'x': np.arange(10, dtype=np.float32), 
+                        'date': pd.date_range('2020-01-01', periods=10)})
+    pdf[constants.EF_UUID_NAME] = np.arange(10, dtype=np.int64)
+    pdf[constants.EF_ORDERBY_NAME] = np.arange(10, dtype=np.int32)
+
+    build_dirpath = str(tmp_path / 'build')
+    dirpath = str(tmp_path / 'store_cache' / 'store__key')
+
+    DataLoader(build_dirpath, overwrite=True).save_data(
+        pdf, 'date', 'group', ['x'], {'datetime_types': [], 'str_types': []}, 
+        num_write_threads=2)
+
+    assert not is_verified_store(build_dirpath, 'key')
+
+    commit_store(build_dirpath, dirpath, 'key')
+
+    assert not os.path.exists(build_dirpath)
+    assert is_verified_store(dirpath, 'key')
+    assert not is_verified_store(dirpath, 'other_key')
+
+    # the moved store reads its arrays from the new root
+    np.testing.assert_array_equal(DataLoader(dirpath).get_array('/a/numeric_types')[:, 0], [0, 2, 4, 6, 8])
+
+    with open(os.path.join(dirpath, 'a__numeric_types'), 'ab') as f:
+        f.write(b'0')
+
+    assert not is_verified_store(dirpath, 'key')
+
+
+def test_append_data_leaves_the_shared_store_alone(monkeypatch, tmp_path):
+
+    # run_evaluation moves into the task directory
+    monkeypatch.chdir(tmp_path)
+
+    rng = np.random.RandomState(0)
+    data = pd.DataFrame({'group': np.repeat(['a', 'b'], 30), 'date': np.tile(pd.date_range('2020-01-01', periods=30), 2),
+                         'x': rng.rand(60).astype(np.float32), 'target': rng.rand(60).astype(np.float32)})
+    is_old = data['date'] < '2020-01-26'
+
+    def run_evaluation():
+
+        evaluation_manager = EvaluationManager()
+        evaluation_manager.setup_evaluation(
+            estimator=Estimator(), data=data[is_old].copy(), target_name='target', feature_names=['x'], 
+            cross_validation_scheme='date_rolling_window', groupby='group', orderby='date', train_window=10, 
+            min_train_window=5, test_window=3, local_directory_path=str(tmp_path), use_store_cache=True, 
+            preprocess_train_data=None, preprocess_test_data=None, evaluate_prediction=None)
+
+        evaluation_engine = EvaluationEngine(local_client_n_workers=1, local_client_threads_per_worker=1, 
+                                             use_dashboard=False, num_write_threads=2)
+        # debug mode runs the folds in process, without a dask cluster
+        evaluation_engine.run_evaluation(evaluation_manager, debug_mode=True)
+
+        return evaluation_manager, evaluation_engine
+
+    evaluation_manager, evaluation_engine = run_evaluation()
+    other_evaluation_manager, other_evaluation_engine = run_evaluation()
+    store_dirpath = evaluation_manager.memmap_root_dirpath
+    assert other_evaluation_manager.memmap_root_dirpath == store_dirpath
+
+    # debug mode starts no dask client, there are no running folds to wait for
+    evaluation_engine.dask_client = SimpleNamespace(wait=lambda: None)
+    evaluation_engine.append_data(evaluation_manager, data[~is_old])
+
+    assert evaluation_manager.memmap_root_dirpath != store_dirpath
+    assert evaluation_engine.data_loader.get_num_rows() == 60
+
+    # the other evaluation keeps reading the store of the data it was set up with
+    assert is_verified_store(store_dirpath, other_evaluation_manager.store_key)
+    assert other_evaluation_engine.data_loader.get_num_rows() == 50
+
+    other_evaluation_manager.update_setup(test_window=4)
+    other_evaluation_engine.run_evaluation(other_evaluation_manager, debug_mode=True)
@@ -21,4 +21,11 @@ def is_nested_list(l):
         return False
     else:
         return any(isinstance(i, list) for i in l)
-        
\ No newline at end of file
+        
+
+def get_idx_size(idx):
+    
+    if isinstance(idx, slice):
+        return idx.stop - idx.start
+    else:
+        return len(idx)
@@ -1,5 +1,6 @@
 import os
 import shutil
+import hashlib
 
 
 def clean_dir(dirpath):
@@ -14,3 +15,16 @@ def clean_dir(dirpath):
 	    except Exception as e:
 	        print('Failed to delete %s. Reason: %s' % (file_path, e))
 
+
+
+def hash_files(filepaths, chunk_size=2**24):
+	"""sha256 hex digest of the bytes of [ filepaths ], in their order."""
+
+	sha = hashlib.sha256()
+
+	for filepath in filepaths:
+		with open(filepath, 'rb') as f:
+			for chunk in iter(lambda: f.read(chunk_size), b''):
+				sha.update(chunk)
+
+	return sha.hexdigest()
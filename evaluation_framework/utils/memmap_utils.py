@@ -9,9 +9,37 @@ def write_memmap(filepath, dtype, shape, array):
     writable_memmap[:] = array[:]
     del writable_memmap
 
-def read_memmap(filepath, dtype, shape, idx=None):
+def create_memmap(filepath, dtype, shape):
+    """Allocates the file of a [ shape ] memmap to be filled by write_memmap_rows, 
+    without ever holding the array in memory."""
 
-    readonly_memmap = np.memmap(filepath, dtype=dtype, mode="r", shape=shape)
+    with open(filepath, 'wb') as f:
+        f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+def write_memmap_rows(filepath, array, row_offset):
+    """Writes [ array ] over the rows of the (C ordered) memmap file starting at row 
+    [ row_offset ]. The rows are contiguous bytes, so this is a single seek and write."""
+
+    array = np.ascontiguousarray(array)
+    row_nbytes = array.itemsize * int(np.prod(array.shape[1:]))
+
+    with open(filepath, 'r+b') as f:
+        f.seek(row_offset * row_nbytes)
+        f.write(array.tobytes())
+
+def append_memmap_rows(filepath, array):
+    """Appends the rows of [ array ] at the end of the (C ordered) memmap file, so that 
+    growing a memmap costs the size of the new rows only."""
+
+    with open(filepath, 'ab') as f:
+        f.write(np.ascontiguousarray(array).tobytes())
+
+def read_memmap(filepath, dtype, shape, idx=None, mode="r"):
+    """With basic (slice) indexing the returned array is a view on the memmap, 
+    so nothing is read until it is touched. Use mode="c" for copy-on-write views
+    that can be modified without affecting the file."""
+
+    readonly_memmap = np.memmap(filepath, dtype=dtype, mode=mode, shape=shape)
 
     if idx is None:
         array = readonly_memmap[:]
@@ -24,3 +52,21 @@ def read_memmap(filepath, dtype, shape, idx=None):
     del readonly_memmap
     return array
 
+
+def get_2d_idx(idx, col_idx):
+    """Combines the row [ idx ] (None, slice or index array) with the sorted column
+    positions [ col_idx ] into a single 2d index. Contiguous columns become a slice, 
+    so slice rows keep returning a view."""
+
+    col_idx = np.asarray(col_idx, dtype=np.int64)
+
+    if idx is None:
+        idx = slice(None)
+
+    if len(col_idx)>0 and col_idx[-1] - col_idx[0] + 1 == len(col_idx):
+        return (idx, slice(int(col_idx[0]), int(col_idx[-1]) + 1))
+
+    if isinstance(idx, slice):
+        return (idx, col_idx)
+
+    return np.ix_(np.asarray(idx), col_idx)
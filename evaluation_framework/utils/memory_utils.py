@@ -0,0 +1,45 @@
+import tracemalloc
+from contextlib import contextmanager
+
+
+@contextmanager
+def trace_peak_bytes(enabled=True):
+    """Yields a dict whose "peak_bytes" is set on exit to the peak of the memory allocated
+    within the block, on top of what was already allocated before it. numpy and pandas
+    buffers are reported to tracemalloc, so this covers the DataFrame copies. Without
+    [ enabled ] nothing is traced and "peak_bytes" is None.
+
+    If tracemalloc was already tracing, its peak is reset at the start of the block. Before
+    python 3.9 there is no reset_peak, the tracing is then restarted instead, which drops
+    the traces taken so far."""
+
+    memory_stats = dict()
+
+    if not enabled:
+        memory_stats['peak_bytes'] = None
+        yield memory_stats
+        return
+
+    was_tracing = tracemalloc.is_tracing()
+
+    if not was_tracing:
+        tracemalloc.start()
+
+    elif hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
+
+    start_bytes, _ = tracemalloc.get_traced_memory()
+
+    try:
+        yield memory_stats
+
+    finally:
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        memory_stats['peak_bytes'] = max(peak_bytes - start_bytes, 0)
+
+        if not was_tracing:
+            tracemalloc.stop()
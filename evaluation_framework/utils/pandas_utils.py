@@ -1,22 +1,41 @@
 import pandas as pd
 import numpy as np
+import hashlib
+
+def parse_date_str(ser):
+    """[ ser ] parsed as "YYYY-MM-DD" dates, None if any of its values is not one."""
 
-def is_date_str_type(ser):
-    
-    try:
-        pd.to_datetime(ser, format='%Y-%m-%d', errors='raise')
-        return True
-    except:
-        return False
-    
-def is_not_date_str_type(ser):
-    
     try:
-        pd.to_datetime(ser.iloc[0:10], format='%Y-%m-%d', errors='raise')
-        return False
-    except:
-        return True
-        
+        return pd.to_datetime(ser, format='%Y-%m-%d', errors='raise')
+    except Exception:
+        return None
+
+def get_stratified_sample(ser, sample_size):
+    """At most [ sample_size ] values of [ ser ], one from each of [ sample_size ] equal 
+    strata of it, so that the whole column is represented and not just its head."""
+
+    if len(ser) <= sample_size:
+        return ser
+
+    return ser.iloc[np.linspace(0, len(ser) - 1, sample_size).astype(np.int64)]
+
+def hash_dataframe(pdf, columns=None, chunk_size=2**20):
+    """sha256 hex digest of the values, dtypes and column names of [ columns ] of [ pdf ] 
+    (all of them by default), not of its index. The rows are hashed [ chunk_size ] at a 
+    time, and the columns only selected from each chunk, so that only a chunk is ever 
+    copied."""
+
+    if columns is None:
+        columns = list(pdf.columns)
+
+    sha = hashlib.sha256()
+    sha.update(repr([(k, str(pdf[k].dtype)) for k in columns]).encode())
+
+    for i in range(0, len(pdf), chunk_size):
+        sha.update(pd.util.hash_pandas_object(pdf.iloc[i:i + chunk_size][columns], index=False).to_numpy().tobytes())
+
+    return sha.hexdigest()
+
 def is_numeric_type(ser):
     
     if ser.dtype.kind in 'biufc':
@@ -61,9 +80,35 @@ def decode_bytes2str(ndarray):
 
     return ndarray.astype(str)
 
-def encode_date_sequence(ser):
+def encode_datetime2int64(ser):
+
+    return ser.values.astype('M8[ns]').view(np.int64)
+
+def view_int64_as_datetime(ndarray):
+    """Zero-copy inverse of encode_datetime2int64."""
+
+    return ndarray.view('M8[ns]')
+
+def get_str_categories(ser):
+
+    return pd.Categorical(ser).categories.values
+
+def encode_str2codes(ser, categories):
+    """Dictionary encoding of [ ser ] against [ categories ], missing values get -1."""
+
+    return np.asarray(pd.Categorical(ser, categories=categories).codes)
+
+def decode_codes2categorical(ndarray, categories):
+
+    return pd.Categorical.from_codes(ndarray, categories=categories)
+
+def encode_date_sequence(ser, first_date=None):
+    """Days since [ first_date ], the first date of [ ser ] by default."""
+
+    if first_date is None:
+        first_date = ser.min()
     
-    return (ser - ser.min()).dt.days.astype(np.int32)
+    return (ser - first_date).dt.days.astype(np.int32)
 
 
 
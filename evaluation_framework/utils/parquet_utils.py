@@ -0,0 +1,34 @@
+import pyarrow.dataset as ds
+
+import os
+
+
+def is_parquet_path(data):
+    """Whether [ data ] is the path of a Parquet file or of a Parquet dataset directory."""
+
+    return isinstance(data, str) and (os.path.isdir(data) or data.endswith('.parquet'))
+
+
+def read_parquet_head(path, num_rows):
+    """The first [ num_rows ] rows of the Parquet file or dataset at [ path ]."""
+
+    return ds.dataset(path, format='parquet').head(num_rows).to_pandas()
+
+
+def get_parquet_filepaths(path):
+    """The sorted paths of the Parquet files of the file or dataset at [ path ]."""
+
+    return sorted(ds.dataset(path, format='parquet').files)
+
+
+def iter_parquet_batches(path, columns=None, batch_size=2**17):
+    """Streams the Parquet file or dataset at [ path ] as DataFrames of at most 
+    [ batch_size ] rows, read row group by row group, so that only one batch of 
+    [ columns ] (all of them by default) is in memory at a time."""
+
+    dataset = ds.dataset(path, format='parquet')
+
+    for record_batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+
+        if record_batch.num_rows > 0:
+            yield record_batch.to_pandas()
@@ -4,6 +4,7 @@ install_aliases()
 from urllib.parse import urlparse, urlencode
 import os
 import boto3
+import botocore
 import errno
 import shutil
 